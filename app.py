@@ -64,6 +64,25 @@ def get_icon(name: str) -> str:
     return icons.get(name, "•")
 
 
+def lazy_tabs(labels, key: str):
+    """
+    st.tabs que registra la pestaña abierta para no armar las ocultas
+    
+    Con on_change="rerun" Streamlit vuelve a ejecutar al cambiar de pestaña y
+    tab.open indica cuál está visible. Las versiones que no lo soportan
+    ejecutan todas las pestañas (ver tab_is_open).
+    """
+    try:
+        return st.tabs(labels, key=key, on_change="rerun")
+    except TypeError:
+        return st.tabs(labels)
+
+
+def tab_is_open(tab) -> bool:
+    """False sólo si Streamlit sabe que la pestaña está oculta"""
+    return getattr(tab, 'open', None) is not False
+
+
 # Configuración de la página
 st.set_page_config(
     page_title="Crypto Trading Backtester",
@@ -881,77 +900,80 @@ def show_trading_signals_chart(results, strategy_name, symbol):
         st.info(f"{get_icon('info')} Intenta cambiar el timeframe o la fuente de datos")
         
         # Tabs para diferentes vistas
-        tab1, tab2 = st.tabs(["📊 Análisis Detallado", "🎯 Vista Simple"])
+        # Cada pestaña arma su figura sólo si está abierta
+        tab1, tab2 = lazy_tabs(["📊 Análisis Detallado", "🎯 Vista Simple"], key="fallback_chart_tab")
         
         with tab1:
-            st.markdown("**Gráfico con todas las señales, indicadores y análisis de performance**")
-            
-            # Preparar indicadores si es necesario
-            indicators = {}
-            
-            # Para estrategias EMA, agregar las EMAs
-            if "EMA" in strategy_name:
-                from src.indicators.technical import TechnicalIndicators
-                tech_indicators = TechnicalIndicators()
+            if tab_is_open(tab1):
+                st.markdown("**Gráfico con todas las señales, indicadores y análisis de performance**")
                 
-                if "Triple" in strategy_name:
-                    indicators['ema_20'] = tech_indicators.ema(data['close'], period=20)
-                    indicators['ema_55'] = tech_indicators.ema(data['close'], period=55)
-                    indicators['ema_200'] = tech_indicators.ema(data['close'], period=200)
-                elif "Golden Cross" in strategy_name:
-                    indicators['ema_fast'] = tech_indicators.ema(data['close'], period=50)
-                    indicators['ema_slow'] = tech_indicators.ema(data['close'], period=200)
-            
-            # Para RSI strategy
-            elif "RSI" in strategy_name:
-                from src.indicators.technical import TechnicalIndicators
-                tech_indicators = TechnicalIndicators()
-                indicators['rsi'] = tech_indicators.rsi(data['close'], period=14)
-            
-            # Para MACD strategy
-            elif "MACD" in strategy_name:
-                from src.indicators.technical import TechnicalIndicators
-                tech_indicators = TechnicalIndicators()
-                macd_line, macd_signal, macd_histogram = tech_indicators.macd(
-                    data['close'], fast_period=12, slow_period=26, signal_period=9
-                )
-                indicators['macd'] = macd_line
-                indicators['macd_signal'] = macd_signal
-                indicators['macd_histogram'] = macd_histogram
-            
-            # Para Bollinger Bands
-            elif "Bollinger" in strategy_name:
-                from src.indicators.technical import TechnicalIndicators
-                tech_indicators = TechnicalIndicators()
-                bb_upper, bb_middle, bb_lower = tech_indicators.bollinger_bands(
-                    data['close'], period=20, std_dev=2
+                # Preparar indicadores si es necesario
+                indicators = {}
+                
+                # Para estrategias EMA, agregar las EMAs
+                if "EMA" in strategy_name:
+                    from src.indicators.technical import TechnicalIndicators
+                    tech_indicators = TechnicalIndicators()
+                    
+                    if "Triple" in strategy_name:
+                        indicators['ema_20'] = tech_indicators.ema(data['close'], period=20)
+                        indicators['ema_55'] = tech_indicators.ema(data['close'], period=55)
+                        indicators['ema_200'] = tech_indicators.ema(data['close'], period=200)
+                    elif "Golden Cross" in strategy_name:
+                        indicators['ema_fast'] = tech_indicators.ema(data['close'], period=50)
+                        indicators['ema_slow'] = tech_indicators.ema(data['close'], period=200)
+                
+                # Para RSI strategy
+                elif "RSI" in strategy_name:
+                    from src.indicators.technical import TechnicalIndicators
+                    tech_indicators = TechnicalIndicators()
+                    indicators['rsi'] = tech_indicators.rsi(data['close'], period=14)
+                
+                # Para MACD strategy
+                elif "MACD" in strategy_name:
+                    from src.indicators.technical import TechnicalIndicators
+                    tech_indicators = TechnicalIndicators()
+                    macd_line, macd_signal, macd_histogram = tech_indicators.macd(
+                        data['close'], fast_period=12, slow_period=26, signal_period=9
+                    )
+                    indicators['macd'] = macd_line
+                    indicators['macd_signal'] = macd_signal
+                    indicators['macd_histogram'] = macd_histogram
+                
+                # Para Bollinger Bands
+                elif "Bollinger" in strategy_name:
+                    from src.indicators.technical import TechnicalIndicators
+                    tech_indicators = TechnicalIndicators()
+                    bb_upper, bb_middle, bb_lower = tech_indicators.bollinger_bands(
+                        data['close'], period=20, std_dev=2
+                    )
+                    indicators['bb_upper'] = bb_upper
+                    indicators['bb_middle'] = bb_middle
+                    indicators['bb_lower'] = bb_lower
+                
+                # Generar gráfico avanzado
+                fig_advanced = chart_generator.plot_trading_signals_advanced(
+                    data=data,
+                    trades=results.trades,
+                    indicators=indicators,
+                    symbol=symbol,
+                    title=f"{strategy_name} - {symbol}"
                 )
-                indicators['bb_upper'] = bb_upper
-                indicators['bb_middle'] = bb_middle
-                indicators['bb_lower'] = bb_lower
-            
-            # Generar gráfico avanzado
-            fig_advanced = chart_generator.plot_trading_signals_advanced(
-                data=data,
-                trades=results.trades,
-                indicators=indicators,
-                symbol=symbol,
-                title=f"{strategy_name} - {symbol}"
-            )
+                
+                st.plotly_chart(fig_advanced, use_container_width=True)
             
-            st.plotly_chart(fig_advanced, use_container_width=True)
-        
         with tab2:
-            st.markdown("**Vista simplificada mostrando solo ganadores vs perdedores**")
-            
-            # Gráfico de análisis simple
-            fig_simple = chart_generator.plot_trade_analysis(
-                data=data,
-                trades=results.trades,
-                symbol=symbol
-            )
-            
-            st.plotly_chart(fig_simple, use_container_width=True)
+            if tab_is_open(tab2):
+                st.markdown("**Vista simplificada mostrando solo ganadores vs perdedores**")
+                
+                # Gráfico de análisis simple
+                fig_simple = chart_generator.plot_trade_analysis(
+                    data=data,
+                    trades=results.trades,
+                    symbol=symbol
+                )
+                
+                st.plotly_chart(fig_simple, use_container_width=True)
             
         # Estadísticas de trades
         st.markdown("### � Estadísticas de Trades")
@@ -167,8 +167,10 @@ def demo_graficos_trading():
     advanced_path = os.path.join(output_dir, f"{symbol}_advanced_signals.html")
     analysis_path = os.path.join(output_dir, f"{symbol}_trade_analysis.html")
     
-    fig_advanced.write_html(advanced_path)
-    fig_analysis.write_html(analysis_path)
+    # plotly.js se escribe una sola vez en output_dir (plotly.min.js) y los HTML lo
+    # referencian: se siguen viendo offline sin embeber ~4.8 MB en cada archivo
+    fig_advanced.write_html(advanced_path, include_plotlyjs='directory')
+    fig_analysis.write_html(analysis_path, include_plotlyjs='directory')
     
     print("✅ Gráficos generados exitosamente!")
     print(f"   📁 Gráfico avanzado: {advanced_path}")
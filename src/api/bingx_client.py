@@ -244,10 +244,12 @@ class BingXClient:
         
         return df
     
-    def _generate_synthetic_data(self, symbol: str, interval: str, 
-                               start_date: str, end_date: str) -> pd.DataFrame:
+    def _generate_synthetic_data(self, symbol: str, interval: str,
+                                 start_date: str, end_date: str,
+                                 seed: Optional[int] = 42) -> pd.DataFrame:
         """
         Genera datos sintéticos para pruebas cuando no hay API disponible
+        (reproducibles según `seed`)
         """
         print(f"🎲 Generando datos sintéticos para {symbol} ({interval})")
         
@@ -279,7 +281,7 @@ class BingXClient:
         else:
             base_price = 1.0
         
-        np.random.seed(42)  # Para resultados reproducibles
+        rng = np.random.default_rng(seed)  # Generador propio, sin estado global
         
         # Generar datos OHLC sintéticos
         data = []
@@ -287,18 +289,18 @@ class BingXClient:
         
         for i, timestamp in enumerate(date_range):
             # Tendencia ligeramente alcista con volatilidad
-            trend = np.random.normal(0.0002, 0.02)  # 0.02% tendencia, 2% volatilidad
+            trend = rng.normal(0.0002, 0.02)  # 0.02% tendencia, 2% volatilidad
             current_price *= (1 + trend)
             
             # Generar OHLC basado en el precio actual
-            volatility = abs(np.random.normal(0, 0.015))  # 1.5% volatilidad intraday
+            volatility = abs(rng.normal(0, 0.015))  # 1.5% volatilidad intraday
             
             open_price = current_price
             high_price = open_price * (1 + volatility)
             low_price = open_price * (1 - volatility)
             
             # Close price con tendencia
-            close_trend = np.random.normal(0, 0.008)  # 0.8% movimiento del close
+            close_trend = rng.normal(0, 0.008)  # 0.8% movimiento del close
             close_price = open_price * (1 + close_trend)
             
             # Asegurar que high >= max(open, close) y low <= min(open, close)
@@ -306,7 +308,7 @@ class BingXClient:
             low_price = min(low_price, open_price, close_price)
             
             # Volumen sintético
-            volume = np.random.exponential(1000) + 500  # Volumen exponencial
+            volume = rng.exponential(1000) + 500  # Volumen exponencial
             
             data.append({
                 'open': round(open_price, 4),
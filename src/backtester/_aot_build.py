@@ -0,0 +1,31 @@
+"""Compila por adelantado (AOT) el kernel de simulación de grid.
+
+Uso:
+    python -m src.backtester._aot_build
+
+Genera el módulo nativo ``src/backtester/simulate_core`` (.so/.pyd), que
+grid.py importa si existe para evitar el warmup del JIT en ejecuciones cortas.
+Requiere Numba (numba.pycc).
+"""
+
+import os
+
+from numba.pycc import CC
+
+from src.backtester.grid import _simulate_column
+
+
+_RESULT = 'Tuple((f8, f8, f8, i8))'
+_ARGS = '(b1[:], b1[:], f8, f8, f8, f8, f8, f8, f8)'
+
+cc = CC('simulate_core')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Especializaciones por dtype del precio: sin dispatch en tiempo de ejecución
+cc.export('simulate_column_f64', f'{_RESULT}(f8[:], {_ARGS[1:]}')(_simulate_column.py_func)
+cc.export('simulate_column_f32', f'{_RESULT}(f4[:], {_ARGS[1:]}')(_simulate_column.py_func)
+
+
+if __name__ == '__main__':
+    cc.compile()
+    print(f"Módulo AOT generado en {cc.output_dir}")
@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from src.api.bingx_client import BingXClient
 from src.strategies.base import BaseStrategy, SignalType, TradeSignal
 from src.backtester.metrics import BacktestResults, PerformanceMetrics, Trade
+from src.backtester.grid import simulate_grid
 from src.risk.manager import RiskManager, RiskParameters
 from src.indicators.technical import TechnicalIndicators
 
@@ -71,7 +72,50 @@ class BacktesterEngine:
         
         # Ejecutar simulación
         return self._simulate_trading(data, signals, initial_capital, risk_manager)
-    
+
+    def run_grid(self, data: pd.DataFrame, entries: np.ndarray, exits: np.ndarray,
+                 initial_capital: float = 10000,
+                 risk_params: Optional[RiskParameters] = None) -> Dict[str, np.ndarray]:
+        """
+        Ejecuta M estrategias (p. ej. un grid de parámetros) sobre los mismos datos
+
+        A diferencia de _simulate_trading, no aplica el tamaño de Kelly (kelly_mode)
+        ni el filtro should_enter_trade (max_daily_loss, max_drawdown): los
+        resultados sólo coinciden con run_backtest cuando esos parámetros quedan
+        en sus valores por defecto.
+
+        Args:
+            data: DataFrame con datos OHLCV
+            entries: Matriz booleana de entradas, shape (n_barras, M)
+            exits: Matriz booleana de salidas, shape (n_barras, M)
+            initial_capital: Capital inicial de cada estrategia
+            risk_params: Parámetros de gestión de riesgo compartidos
+
+        Returns:
+            Diccionario con arrays shape (M,): final_capital, sharpe_ratio,
+            max_drawdown_pct y total_trades
+        """
+        if risk_params is None:
+            risk_params = RiskParameters()
+
+        final_capital, sharpe, max_dd, n_trades = simulate_grid(
+            data['close'].to_numpy(), entries, exits,
+            commission=self.commission,
+            slippage=self.slippage,
+            initial_capital=initial_capital,
+            position_size=risk_params.max_position_size,
+            risk_per_trade=risk_params.risk_per_trade,
+            stop_loss_pct=risk_params.stop_loss_pct,
+            take_profit_pct=risk_params.take_profit_pct
+        )
+
+        return {
+            'final_capital': final_capital,
+            'sharpe_ratio': sharpe,
+            'max_drawdown_pct': max_dd,
+            'total_trades': n_trades
+        }
+
     def _get_historical_data(self, symbol: str, interval: str, 
                            start_date: str, end_date: str) -> pd.DataFrame:
         """Obtiene datos históricos de la API o genera datos sintéticos"""
@@ -86,9 +130,10 @@ class BacktesterEngine:
             print("No hay cliente API configurado. Generando datos sintéticos...")
             return self._generate_synthetic_data(symbol, start_date, end_date, interval)
     
-    def _generate_synthetic_data(self, symbol: str, start_date: str, 
-                               end_date: str, interval: str = "1h") -> pd.DataFrame:
-        """Genera datos sintéticos para testing"""
+    def _generate_synthetic_data(self, symbol: str, start_date: str,
+                                 end_date: str, interval: str = "1h",
+                                 seed: Optional[int] = 42) -> pd.DataFrame:
+        """Genera datos sintéticos para testing (reproducibles según `seed`)"""
         start_dt = datetime.strptime(start_date, '%Y-%m-%d')
         end_dt = datetime.strptime(end_date, '%Y-%m-%d')
         
@@ -103,7 +148,7 @@ class BacktesterEngine:
         date_range = pd.date_range(start=start_dt, end=end_dt, freq=freq)
         
         # Generar precios usando random walk con tendencia
-        np.random.seed(42)  # Para resultados reproducibles
+        rng = np.random.default_rng(seed)  # Generador propio, sin estado global
         n_periods = len(date_range)
         
         # Precio inicial
@@ -111,7 +156,7 @@ class BacktesterEngine:
         
         # Generar retornos aleatorios
         daily_vol = 0.02  # 2% volatilidad diaria
-        returns = np.random.normal(0.0005, daily_vol, n_periods)  # Ligera tendencia alcista
+        returns = rng.normal(0.0005, daily_vol, n_periods)  # Ligera tendencia alcista
         
         # Generar precios
         prices = [initial_price]
@@ -131,12 +176,12 @@ class BacktesterEngine:
             
             # High y Low basados en volatilidad intraperiodo
             intraday_vol = daily_vol * 0.5
-            high_price = max(open_price, close_price) * (1 + abs(np.random.normal(0, intraday_vol)))
-            low_price = min(open_price, close_price) * (1 - abs(np.random.normal(0, intraday_vol)))
+            high_price = max(open_price, close_price) * (1 + abs(rng.normal(0, intraday_vol)))
+            low_price = min(open_price, close_price) * (1 - abs(rng.normal(0, intraday_vol)))
             
             # Volumen aleatorio
             base_volume = 1000000
-            volume = base_volume * (0.5 + np.random.random())
+            volume = base_volume * (0.5 + rng.random())
             
             data.append({
                 'open': open_price,
@@ -155,14 +200,14 @@ class BacktesterEngine:
         print("Simulando operaciones...")
         
         capital = initial_capital
-        equity_curve = []
+        equity_curve = np.empty(len(data), dtype=np.float64)
         trades = []
         current_trade: Optional[Trade] = None
         
         # Indexar señales por timestamp para búsqueda eficiente
         signal_dict = {signal.timestamp: signal for signal in signals}
         
-        for timestamp, row in data.iterrows():
+        for i, (timestamp, row) in enumerate(data.iterrows()):
             current_price = row['close']
             
             # Verificar si hay señal en este timestamp
@@ -228,6 +273,7 @@ class BacktesterEngine:
                     
                     # Actualizar risk manager
                     risk_manager.update_daily_pnl(net_pnl)
+                    risk_manager.record_trade(net_pnl)
             
             # Verificar stop loss y take profit para trade abierto
             if current_trade is not None:
@@ -258,6 +304,7 @@ class BacktesterEngine:
                     current_trade = None
                     
                     risk_manager.update_daily_pnl(net_pnl)
+                    risk_manager.record_trade(net_pnl)
             
             # Guardar equity para curva
             current_equity = capital
@@ -266,7 +313,7 @@ class BacktesterEngine:
                 unrealized_pnl = current_trade.quantity * (current_price - current_trade.entry_price)
                 current_equity += unrealized_pnl
             
-            equity_curve.append(current_equity)
+            equity_curve[i] = current_equity
         
         # Cerrar trade abierto al final
         if current_trade is not None:
@@ -289,7 +336,7 @@ class BacktesterEngine:
             capital += net_pnl - exit_commission
         
         # Crear serie temporal de equity
-        equity_series = pd.Series(equity_curve, index=data.index)
+        equity_series = pd.Series(equity_curve, index=data.index, copy=False)
         
         # Calcular métricas
         results = PerformanceMetrics.calculate_all_metrics(
@@ -0,0 +1,217 @@
+import numpy as np
+from typing import Tuple, Union
+
+from src.utils.jit import NUMBA_AVAILABLE, njit, prange
+
+try:
+    # Kernel precompilado con `python -m src.backtester._aot_build`
+    from src.backtester import simulate_core as _aot
+except ImportError:
+    _aot = None
+
+
+ArrayLike = Union[float, np.ndarray, None]
+
+
+@njit(cache=True)
+def _simulate_column(close, entries, exits, commission, slippage, initial_capital,
+                     position_size, risk_per_trade, stop_loss_pct, take_profit_pct):
+    """Simula una sola estrategia (columna) replicando la lógica de _simulate_trading"""
+    n = close.shape[0]
+    capital = initial_capital
+    in_trade = False
+    quantity = 0.0
+    entry_price = 0.0
+    trade_commission = 0.0
+    stop_loss = np.nan
+    take_profit = np.nan
+    n_trades = 0
+
+    # Estadísticas en streaming (Welford) para Sharpe y drawdown
+    prev_equity = 0.0
+    mean = 0.0
+    m2 = 0.0
+    peak = 0.0
+    max_dd = 0.0
+    equity = initial_capital
+
+    for i in range(n):
+        price = close[i]
+
+        if entries[i] and not in_trade:
+            stop_loss = np.nan
+            take_profit = np.nan
+            if not np.isnan(stop_loss_pct):
+                stop_loss = price * (1.0 - stop_loss_pct)
+            if not np.isnan(take_profit_pct):
+                take_profit = price * (1.0 + take_profit_pct)
+
+            size = capital * position_size / price
+            if not np.isnan(stop_loss):
+                risk_per_unit = abs(price - stop_loss)
+                if risk_per_unit > 0.0:
+                    size = min(size, capital * risk_per_trade / risk_per_unit)
+
+            if size > 0.0:
+                entry_price = price * (1.0 + slippage)
+                quantity = size
+                trade_commission = quantity * entry_price * commission
+                capital -= trade_commission
+                in_trade = True
+
+        elif exits[i] and in_trade:
+            exit_price = price * (1.0 - slippage)
+            exit_commission = quantity * exit_price * commission
+            net_pnl = quantity * (exit_price - entry_price) - trade_commission - exit_commission
+            capital += net_pnl - exit_commission
+            in_trade = False
+            n_trades += 1
+
+        # Stop loss / take profit
+        if in_trade:
+            hit_sl = not np.isnan(stop_loss) and price <= stop_loss
+            hit_tp = not np.isnan(take_profit) and price >= take_profit
+            if hit_sl or hit_tp:
+                exit_price = price * (1.0 - slippage)
+                exit_commission = quantity * exit_price * commission
+                net_pnl = quantity * (exit_price - entry_price) - trade_commission - exit_commission
+                capital += net_pnl - exit_commission
+                in_trade = False
+                n_trades += 1
+
+        equity = capital
+        if in_trade:
+            equity += quantity * (price - entry_price)
+
+        # Retorno del período (el primero es 0, como pct_change().fillna(0))
+        ret = 0.0
+        if i > 0 and prev_equity != 0.0:
+            ret = equity / prev_equity - 1.0
+        delta = ret - mean
+        mean += delta / (i + 1)
+        m2 += delta * (ret - mean)
+        prev_equity = equity
+
+        if i == 0 or equity > peak:
+            peak = equity
+        if peak != 0.0:
+            dd = (peak - equity) / peak
+            if dd > max_dd:
+                max_dd = dd
+
+    # Cerrar trade abierto al final (no afecta a la curva de equity)
+    if in_trade:
+        n_trades += 1
+
+    sharpe = 0.0
+    if n > 1:
+        std = np.sqrt(m2 / (n - 1))
+        if std > 0.0:
+            sharpe = mean / std * np.sqrt(252.0)
+
+    return equity, sharpe, max_dd, n_trades
+
+
+@njit(parallel=True, cache=True)
+def _simulate_grid_kernel(close, entries, exits, commission, slippage, initial_capital,
+                          position_size, risk_per_trade, stop_loss_pct, take_profit_pct):
+    """Ejecuta las M columnas en paralelo sobre el mismo array de precios"""
+    n_strategies = entries.shape[1]
+    final_capital = np.empty(n_strategies, dtype=np.float64)
+    sharpe = np.empty(n_strategies, dtype=np.float64)
+    max_dd = np.empty(n_strategies, dtype=np.float64)
+    n_trades = np.empty(n_strategies, dtype=np.int64)
+
+    for j in prange(n_strategies):
+        fc, sr, dd, nt = _simulate_column(
+            close, entries[:, j], exits[:, j], commission, slippage, initial_capital,
+            position_size, risk_per_trade, stop_loss_pct[j], take_profit_pct[j]
+        )
+        final_capital[j] = fc
+        sharpe[j] = sr
+        max_dd[j] = dd
+        n_trades[j] = nt
+
+    return final_capital, sharpe, max_dd, n_trades
+
+
+def _simulate_grid_aot(close, entries, exits, commission, slippage, initial_capital,
+                       position_size, risk_per_trade, stop_loss_pct, take_profit_pct):
+    """Versión serie del grid usando el kernel AOT (sin coste de compilación)"""
+    simulate = _aot.simulate_column_f32 if close.dtype == np.float32 else _aot.simulate_column_f64
+    results = [
+        simulate(close, entries[:, j], exits[:, j], commission, slippage, initial_capital,
+                 position_size, risk_per_trade, stop_loss_pct[j], take_profit_pct[j])
+        for j in range(entries.shape[1])
+    ]
+    final_capital, sharpe, max_dd, n_trades = zip(*results) if results else ((), (), (), ())
+    return (np.array(final_capital, dtype=np.float64), np.array(sharpe, dtype=np.float64),
+            np.array(max_dd, dtype=np.float64), np.array(n_trades, dtype=np.int64))
+
+
+def _per_strategy(value: ArrayLike, n_strategies: int) -> np.ndarray:
+    """Convierte un parámetro escalar/None/array a un array float64 de tamaño M"""
+    if value is None:
+        return np.full(n_strategies, np.nan)
+    arr = np.asarray(value, dtype=np.float64)
+    if arr.ndim == 0:
+        return np.full(n_strategies, float(arr))
+    if arr.shape != (n_strategies,):
+        raise ValueError(f"Se esperaban {n_strategies} valores, se recibieron {arr.shape}")
+    return np.ascontiguousarray(arr)
+
+
+def simulate_grid(close: np.ndarray, entries: np.ndarray, exits: np.ndarray,
+                  commission: float = 0.001, slippage: float = 0.001,
+                  initial_capital: float = 10000, position_size: float = 0.1,
+                  risk_per_trade: float = 0.02, stop_loss_pct: ArrayLike = None,
+                  take_profit_pct: ArrayLike = None
+                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Simula M estrategias long-only sobre una misma serie de precios en una sola pasada
+
+    La contabilidad replica a BacktesterEngine._simulate_trading; además los
+    niveles de stop loss / take profit se fijan al entrar y se aplican en cada barra.
+
+    Args:
+        close: Precios de cierre, shape (N,) (float64, o float32 para ahorrar memoria)
+        entries: Señales de entrada, bool shape (N, M)
+        exits: Señales de salida, bool shape (N, M)
+        commission: Comisión por operación
+        slippage: Slippage por operación
+        initial_capital: Capital inicial de cada estrategia
+        position_size: Fracción máxima del capital por posición
+        risk_per_trade: Fracción del capital arriesgada por operación (con stop loss)
+        stop_loss_pct: Stop loss porcentual, escalar o array (M,); NaN/None lo desactiva
+        take_profit_pct: Take profit porcentual, escalar o array (M,); NaN/None lo desactiva
+
+    Returns:
+        (final_capital, sharpe_ratio, max_drawdown_pct, n_trades), cada uno shape (M,)
+    """
+    close = np.ascontiguousarray(close)
+    if close.dtype != np.float32:
+        close = close.astype(np.float64, copy=False)
+    entries = np.asarray(entries, dtype=np.bool_)
+    exits = np.asarray(exits, dtype=np.bool_)
+
+    if entries.ndim == 1:
+        entries = entries[:, None]
+    if exits.ndim == 1:
+        exits = exits[:, None]
+    if entries.shape != exits.shape:
+        raise ValueError("entries y exits deben tener la misma forma")
+    if entries.shape[0] != close.shape[0]:
+        raise ValueError("entries/exits deben tener una fila por cada precio")
+
+    n_strategies = entries.shape[1]
+    sl = _per_strategy(stop_loss_pct, n_strategies)
+    tp = _per_strategy(take_profit_pct, n_strategies)
+
+    args = (close, entries, exits, float(commission), float(slippage), float(initial_capital),
+            float(position_size), float(risk_per_trade), sl, tp)
+
+    # Sin Numba, o con una sola estrategia (donde domina el warmup del JIT),
+    # se prefiere el kernel AOT si fue compilado
+    if _aot is not None and (not NUMBA_AVAILABLE or n_strategies == 1):
+        return _simulate_grid_aot(*args)
+    return _simulate_grid_kernel(*args)
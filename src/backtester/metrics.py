@@ -3,6 +3,8 @@ from dataclasses import dataclass, field
 import pandas as pd
 import numpy as np
 
+from src.utils.compat import DATACLASS_SLOTS
+
 
 @dataclass
 class Trade:
@@ -19,9 +21,9 @@ class Trade:
     is_open: bool = True
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class BacktestResults:
-    """Resultados del backtest"""
+    """Resultados del backtest (con __slots__: atributos por offset, sin __dict__)"""
     # Métricas generales
     initial_capital: float
     final_capital: float
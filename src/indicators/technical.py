@@ -1,7 +1,356 @@
+import math
 import pandas as pd
 import numpy as np
 import ta
 
+from src.utils.jit import njit
+
+
+# Columnas generadas por add_all_indicators, en orden
+ALL_INDICATOR_COLUMNS = (
+    'sma_20', 'sma_50', 'ema_12', 'ema_26', 'rsi',
+    'macd', 'macd_signal', 'macd_histogram',
+    'bb_upper', 'bb_middle', 'bb_lower',
+    'stoch_k', 'stoch_d', 'atr', 'adx', 'volume_sma'
+)
+
+
+@njit(cache=True)
+def ewm_step(weighted, cur, old_wt, alpha):
+    """
+    Un paso de ewm(adjust=False) con la misma normalización que pandas
+
+    old_wt es el peso del valor anterior: 1 - alpha, multiplicado otra vez por
+    1 - alpha por cada NaN salteado. Todas las EMAs compiladas usan este paso
+    para coincidir bit a bit con pandas.
+    """
+    if weighted != cur:
+        return (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+    return weighted
+
+
+@njit(cache=True)
+def price_indicators_kernel(close, ema_periods, rsi_period, macd_fast, macd_slow, macd_sign,
+                            bb_period, bb_dev):
+    """
+    Recorre `close` una sola vez actualizando todas las EMAs, el RSI, el MACD y
+    las Bollinger Bands. Reproduce bit a bit TechnicalIndicators.ema (pandas
+    ewm) y los indicadores de `ta` (ewm con min_periods y rolling de pandas).
+    Requiere `close` sin NaN. Lo usan add_all_indicators y el cálculo
+    fusionado de las estrategias (src.strategies.fused_kernel).
+    """
+    n = close.shape[0]
+    n_emas = ema_periods.shape[0]
+
+    emas = np.empty((n_emas, n))
+    rsi = np.full(n, np.nan)
+    macd = np.full(n, np.nan)
+    macd_signal = np.full(n, np.nan)
+    macd_histogram = np.full(n, np.nan)
+    bb_upper = np.full(n, np.nan)
+    bb_middle = np.full(n, np.nan)
+    bb_lower = np.full(n, np.nan)
+    if n == 0:
+        return emas, rsi, macd, macd_signal, macd_histogram, bb_upper, bb_middle, bb_lower
+
+    # pandas deriva alpha de com/span: se replica la misma aritmética
+    ema_alpha = np.empty(n_emas)
+    for k in range(n_emas):
+        ema_alpha[k] = 1.0 / (1.0 + (ema_periods[k] - 1.0) / 2.0)
+    rsi_alpha = 1.0 / (1.0 + (1.0 / (1.0 / rsi_period) - 1.0))
+    fast_alpha = 1.0 / (1.0 + (macd_fast - 1.0) / 2.0)
+    slow_alpha = 1.0 / (1.0 + (macd_slow - 1.0) / 2.0)
+    sign_alpha = 1.0 / (1.0 + (macd_sign - 1.0) / 2.0)
+    macd_start = max(macd_fast, macd_slow) - 1
+
+    ema_state = np.empty(n_emas)
+    avg_up = 0.0
+    avg_down = -0.0
+    fast = close[0]
+    slow = close[0]
+    signal = np.nan
+    signal_obs = 0
+
+    # Estado de rolling mean (suma compensada de Kahan, como pandas)
+    mean_nobs = 0
+    mean_sum = 0.0
+    mean_neg = 0
+    comp_add = 0.0
+    comp_remove = 0.0
+    mean_same = 0
+    mean_prev = close[0]
+    # Estado de rolling var (Welford compensado, como pandas)
+    var_nobs = 0
+    var_mean = 0.0
+    var_ssqdm = 0.0
+    var_comp_add = 0.0
+    var_comp_remove = 0.0
+    var_same = 0
+    var_prev = close[0]
+
+    for i in range(n):
+        c = close[i]
+
+        # EMAs de las estrategias (ewm sin min_periods)
+        for k in range(n_emas):
+            if i == 0:
+                ema_state[k] = c
+            else:
+                ema_state[k] = ewm_step(ema_state[k], c, 1.0 - ema_alpha[k], ema_alpha[k])
+            emas[k, i] = ema_state[k]
+
+        # RSI de ta: ewm de subidas/bajadas (la primera diferencia cuenta como 0)
+        if i > 0:
+            diff = c - close[i - 1]
+            up = diff if diff > 0 else 0.0
+            down = -(diff if diff < 0 else 0.0)
+            avg_up = ewm_step(avg_up, up, 1.0 - rsi_alpha, rsi_alpha)
+            avg_down = ewm_step(avg_down, down, 1.0 - rsi_alpha, rsi_alpha)
+        if i >= rsi_period - 1:
+            if avg_down == 0:
+                rsi[i] = 100.0
+            else:
+                rsi[i] = 100.0 - (100.0 / (1.0 + avg_up / avg_down))
+
+        # MACD de ta: EMAs con min_periods y señal sobre la serie ya recortada
+        if i > 0:
+            fast = ewm_step(fast, c, 1.0 - fast_alpha, fast_alpha)
+            slow = ewm_step(slow, c, 1.0 - slow_alpha, slow_alpha)
+        if i >= macd_start:
+            m = fast - slow
+            macd[i] = m
+            if signal_obs == 0:
+                signal = m
+            else:
+                signal = ewm_step(signal, m, 1.0 - sign_alpha, sign_alpha)
+            signal_obs += 1
+            if signal_obs >= macd_sign:
+                macd_signal[i] = signal
+                macd_histogram[i] = m - signal
+
+        # Bollinger Bands: rolling mean / std(ddof=0) con el algoritmo de pandas
+        if i >= bb_period:
+            old = close[i - bb_period]
+            mean_nobs -= 1
+            y = -old - comp_remove
+            t = mean_sum + y
+            comp_remove = t - mean_sum - y
+            mean_sum = t
+            if math.copysign(1.0, old) < 0:
+                mean_neg -= 1
+
+            var_nobs -= 1
+            if var_nobs:
+                prev_mean = var_mean - var_comp_remove
+                y = old - var_comp_remove
+                t = y - var_mean
+                var_comp_remove = t + var_mean - y
+                var_mean = var_mean - t / var_nobs
+                var_ssqdm = var_ssqdm - (old - prev_mean) * (old - var_mean)
+            else:
+                var_mean = 0.0
+                var_ssqdm = 0.0
+
+        mean_nobs += 1
+        y = c - comp_add
+        t = mean_sum + y
+        comp_add = t - mean_sum - y
+        mean_sum = t
+        if math.copysign(1.0, c) < 0:
+            mean_neg += 1
+        if c == mean_prev:
+            mean_same += 1
+        else:
+            mean_same = 1
+        mean_prev = c
+
+        if c == var_prev:
+            var_same += 1
+        else:
+            var_same = 1
+        var_prev = c
+        var_nobs += 1
+        prev_mean = var_mean - var_comp_add
+        y = c - var_comp_add
+        t = y - var_mean
+        var_comp_add = t + var_mean - y
+        var_mean = var_mean + t / var_nobs
+        var_ssqdm = var_ssqdm + (c - prev_mean) * (c - var_mean)
+
+        if i >= bb_period - 1:
+            middle = mean_sum / mean_nobs
+            if mean_same >= mean_nobs:
+                middle = mean_prev
+            elif mean_neg == 0 and middle < 0:
+                middle = 0.0
+            elif mean_neg == mean_nobs and middle > 0:
+                middle = 0.0
+
+            variance = 0.0
+            if var_nobs > 1 and var_same < var_nobs:
+                variance = var_ssqdm / var_nobs
+            std = math.sqrt(variance) if variance >= 0 else 0.0
+
+            bb_middle[i] = middle
+            bb_upper[i] = middle + bb_dev * std
+            bb_lower[i] = middle - bb_dev * std
+
+    return emas, rsi, macd, macd_signal, macd_histogram, bb_upper, bb_middle, bb_lower
+
+
+@njit(cache=True)
+def _compute_ohlcv_indicators(high, low, close, volume):
+    """
+    Calcula en una sola pasada los indicadores de add_all_indicators que no
+    salen de price_indicators_kernel: SMAs, estocástico, ATR, ADX y SMA de volumen
+
+    Cada barra se lee una vez y alimenta el estado en streaming de todos los
+    indicadores (sumas móviles, suavizado de Wilder, deques de min/max).
+    Reproduce los resultados de las funciones de `ta` usadas por
+    TechnicalIndicators con sus parámetros por defecto. Requiere series sin
+    NaN: pandas y `ta` saltean los faltantes y este estado no.
+    """
+    n = close.shape[0]
+
+    sma_20 = np.full(n, np.nan)
+    sma_50 = np.full(n, np.nan)
+    stoch_k = np.full(n, np.nan)
+    stoch_d = np.full(n, np.nan)
+    atr = np.zeros(n)
+    adx = np.zeros(n)
+    volume_sma = np.full(n, np.nan)
+
+    # Parámetros por defecto de TechnicalIndicators
+    w_stoch = 14
+    w_stoch_d = 3
+    w_atr = 14
+    w_adx = 14
+
+    # Estado en streaming
+    sum_20 = 0.0
+    sum_50 = 0.0
+    sum_volume = 0.0
+    tr_sum = 0.0
+    atr_value = 0.0
+    trs = 0.0
+    dip = 0.0
+    din = 0.0
+    di_sum = 0.0
+    adx_value = 0.0
+
+    # Deques monótonos (índices) para mínimo de low y máximo de high
+    min_dq = np.empty(n, dtype=np.int64)
+    max_dq = np.empty(n, dtype=np.int64)
+    min_head = 0
+    min_tail = 0
+    max_head = 0
+    max_tail = 0
+
+    for i in range(n):
+        c = close[i]
+        h = high[i]
+        lo = low[i]
+
+        # Medias móviles simples
+        sum_20 += c
+        sum_50 += c
+        sum_volume += volume[i]
+        if i >= 20:
+            sum_20 -= close[i - 20]
+            sum_volume -= volume[i - 20]
+        if i >= 50:
+            sum_50 -= close[i - 50]
+        # Las sumas deslizantes acumulan error de redondeo con precios de
+        # distinta magnitud: se recalculan una vez por ventana (O(1) amortizado)
+        if i >= 19 and (i + 1) % 20 == 0:
+            sum_20 = 0.0
+            sum_volume = 0.0
+            for j in range(i - 19, i + 1):
+                sum_20 += close[j]
+                sum_volume += volume[j]
+        if i >= 49 and (i + 1) % 50 == 0:
+            sum_50 = 0.0
+            for j in range(i - 49, i + 1):
+                sum_50 += close[j]
+        if i >= 19:
+            sma_20[i] = sum_20 / 20.0
+            volume_sma[i] = sum_volume / 20.0
+        if i >= 49:
+            sma_50[i] = sum_50 / 50.0
+
+        # Estocástico
+        while min_tail > min_head and low[min_dq[min_tail - 1]] >= lo:
+            min_tail -= 1
+        min_dq[min_tail] = i
+        min_tail += 1
+        if min_dq[min_head] <= i - w_stoch:
+            min_head += 1
+        while max_tail > max_head and high[max_dq[max_tail - 1]] <= h:
+            max_tail -= 1
+        max_dq[max_tail] = i
+        max_tail += 1
+        if max_dq[max_head] <= i - w_stoch:
+            max_head += 1
+        if i >= w_stoch - 1:
+            lowest = low[min_dq[min_head]]
+            highest = high[max_dq[max_head]]
+            if highest != lowest:
+                stoch_k[i] = 100.0 * (c - lowest) / (highest - lowest)
+        if i >= w_stoch + w_stoch_d - 2:
+            stoch_d[i] = (stoch_k[i] + stoch_k[i - 1] + stoch_k[i - 2]) / w_stoch_d
+
+        # ATR
+        if i == 0:
+            true_range = h - lo
+        else:
+            prev_close = close[i - 1]
+            true_range = max(h - lo, abs(h - prev_close), abs(lo - prev_close))
+        if i < w_atr:
+            tr_sum += true_range
+            if i == w_atr - 1:
+                atr_value = tr_sum / w_atr
+        else:
+            atr_value = (atr_value * (w_atr - 1) + true_range) / w_atr
+        if i >= w_atr - 1:
+            atr[i] = atr_value
+
+        # ADX (replica la implementación de ta.trend.ADXIndicator)
+        if i > 0:
+            prev_close = close[i - 1]
+            movement = max(h, prev_close) - min(lo, prev_close)
+            up_move = h - high[i - 1]
+            down_move = low[i - 1] - lo
+            pos = up_move if (up_move > down_move and up_move > 0) else 0.0
+            neg = down_move if (down_move > up_move and down_move > 0) else 0.0
+
+            if i <= w_adx:
+                trs += movement
+                dip += pos
+                din += neg
+            else:
+                trs = trs - trs / w_adx + movement
+                dip = dip - dip / w_adx + pos
+                din = din - din / w_adx + neg
+
+            if i >= w_adx:
+                plus_di = 100.0 * dip / trs if trs != 0 else 0.0
+                minus_di = 100.0 * din / trs if trs != 0 else 0.0
+                di_total = plus_di + minus_di
+                directional_index = 0.0
+                if di_total != 0:
+                    directional_index = 100.0 * abs((plus_di - minus_di) / di_total)
+
+                if i < 2 * w_adx:
+                    di_sum += directional_index
+                    if i == 2 * w_adx - 1:
+                        adx_value = di_sum / w_adx
+                else:
+                    adx_value = (adx_value * (w_adx - 1) + directional_index) / w_adx
+                if i >= 2 * w_adx - 1:
+                    adx[i] = adx_value
+
+    return sma_20, sma_50, stoch_k, stoch_d, atr, adx, volume_sma
+
 
 class TechnicalIndicators:
     """Clase para calcular indicadores técnicos"""
@@ -87,42 +436,49 @@ class TechnicalIndicators:
     
     @classmethod
     def add_all_indicators(cls, df: pd.DataFrame) -> pd.DataFrame:
-        """Agrega todos los indicadores técnicos al DataFrame"""
-        df = df.copy()
-        
-        # Moving averages
-        df['sma_20'] = cls.sma(df['close'], 20)
-        df['sma_50'] = cls.sma(df['close'], 50)
-        df['ema_12'] = cls.ema(df['close'], 12)
-        df['ema_26'] = cls.ema(df['close'], 26)
-        
-        # RSI
-        df['rsi'] = cls.rsi(df['close'])
-        
-        # MACD
-        macd_data = cls.macd(df['close'])
-        df['macd'] = macd_data['macd']
-        df['macd_signal'] = macd_data['signal']
-        df['macd_histogram'] = macd_data['histogram']
-        
-        # Bollinger Bands
-        bb_data = cls.bollinger_bands(df['close'])
-        df['bb_upper'] = bb_data['upper']
-        df['bb_middle'] = bb_data['middle']
-        df['bb_lower'] = bb_data['lower']
-        
-        # Stochastic
-        stoch_data = cls.stochastic(df['high'], df['low'], df['close'])
-        df['stoch_k'] = stoch_data['k_percent']
-        df['stoch_d'] = stoch_data['d_percent']
-        
-        # ATR
-        df['atr'] = cls.atr(df['high'], df['low'], df['close'])
-        
-        # ADX
-        df['adx'] = cls.adx(df['high'], df['low'], df['close'])
-        
-        # Volume indicators
-        df['volume_sma'] = cls.volume_sma(df['volume'])
-        
-        return df
\ No newline at end of file
+        """
+        Agrega todos los indicadores técnicos al DataFrame (dos pasadas compiladas)
+
+        EMAs, RSI, MACD y Bollinger salen de price_indicators_kernel; SMAs,
+        estocástico, ATR, ADX y volumen, de una segunda pasada sobre OHLCV.
+        No modifica `df`: devuelve un DataFrame nuevo construido en una sola
+        asignación con las columnas originales más los indicadores. Con NaN en
+        los datos se usa el cálculo indicador por indicador, que los saltea.
+        """
+        inputs = [df[col].to_numpy(dtype=np.float64) for col in ('high', 'low', 'close', 'volume')]
+        if any(np.isnan(values).any() for values in inputs):
+            return cls._add_all_indicators_by_series(df)
+        high, low, close, volume = inputs
+        emas, rsi, macd, macd_signal, macd_histogram, bb_upper, bb_middle, bb_lower = \
+            price_indicators_kernel(close, np.array([12, 26]), 14, 12, 26, 9, 20, 2.0)
+        sma_20, sma_50, stoch_k, stoch_d, atr, adx, volume_sma = \
+            _compute_ohlcv_indicators(high, low, close, volume)
+        outputs = (sma_20, sma_50, emas[0], emas[1], rsi,
+                   macd, macd_signal, macd_histogram,
+                   bb_upper, bb_middle, bb_lower,
+                   stoch_k, stoch_d, atr, adx, volume_sma)
+
+        columns = {col: df[col].to_numpy() for col in df.columns}
+        columns.update(zip(ALL_INDICATOR_COLUMNS, outputs))
+        return pd.DataFrame(columns, index=df.index)
+
+    @classmethod
+    def _add_all_indicators_by_series(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """add_all_indicators con pandas y `ta`, para datos con NaN"""
+        close, high, low = df['close'], df['high'], df['low']
+        macd_data = cls.macd(close)
+        bb_data = cls.bollinger_bands(close)
+        stoch_data = cls.stochastic(high, low, close)
+        indicators = (
+            cls.sma(close, 20), cls.sma(close, 50), cls.ema(close, 12), cls.ema(close, 26),
+            cls.rsi(close),
+            macd_data['macd'], macd_data['signal'], macd_data['histogram'],
+            bb_data['upper'], bb_data['middle'], bb_data['lower'],
+            stoch_data['k_percent'], stoch_data['d_percent'],
+            cls.atr(high, low, close), cls.adx(high, low, close),
+            cls.volume_sma(df['volume'])
+        )
+
+        columns = {col: df[col].to_numpy() for col in df.columns}
+        columns.update(zip(ALL_INDICATOR_COLUMNS, (values.to_numpy() for values in indicators)))
+        return pd.DataFrame(columns, index=df.index)
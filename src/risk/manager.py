@@ -1,8 +1,36 @@
-from typing import Optional
+from typing import Optional, Tuple, Union
 from dataclasses import dataclass
+from enum import Enum
+import numpy as np
 
+from src.utils.compat import DATACLASS_SLOTS
 
-@dataclass
+
+# Lados codificados para operaciones vectorizadas
+SIDE_LONG = 1
+SIDE_SHORT = -1
+
+# Signo de cada lado ("long" → +1; cualquier otro valor se trata como short)
+_SIDE_SIGNS = {"long": SIDE_LONG, "short": SIDE_SHORT}
+
+# Motivos de salida devueltos por should_exit_trade_batch
+EXIT_NONE = 0
+EXIT_STOP_LOSS = 1
+EXIT_TAKE_PROFIT = 2
+
+
+class KellyMode(Enum):
+    """Fracción del criterio de Kelly a aplicar"""
+    FULL = 1.0
+    HALF = 0.5
+    QUARTER = 0.25
+    
+    def scale(self) -> float:
+        """Multiplicador sobre la fracción de Kelly completa"""
+        return self.value
+
+
+@dataclass(**DATACLASS_SLOTS)
 class RiskParameters:
     """Parámetros de gestión de riesgo"""
     max_position_size: float = 0.1  # 10% del capital por posición
@@ -11,6 +39,7 @@ class RiskParameters:
     max_daily_loss: Optional[float] = None  # Pérdida máxima diaria
     max_drawdown: Optional[float] = None  # Drawdown máximo permitido
     risk_per_trade: float = 0.02  # 2% de riesgo por operación
+    kelly_mode: Optional[KellyMode] = None  # Si se define, Kelly reemplaza a max_position_size
 
 
 class RiskManager:
@@ -20,7 +49,58 @@ class RiskManager:
         self.parameters = parameters
         self.daily_pnl = 0.0
         self.current_drawdown = 0.0
+        self._kelly_fraction: Optional[float] = None  # Se actualiza con update_kelly_stats
+        self._running_max_equity: Optional[float] = None  # Pico de equity para el drawdown
+        # Trades cerrados registrados con record_trade (estadísticas de Kelly)
+        self._wins = 0
+        self._losses = 0
+        self._win_total = 0.0
+        self._loss_total = 0.0
+        
+    def update_kelly_stats(self, win_rate: float, win_loss_ratio: float) -> float:
+        """
+        Recalcula la fracción de Kelly (f* = W - (1 - W) / R) a partir de estadísticas de trades
+        
+        El valor queda cacheado hasta la próxima llamada (p. ej. en cada rebalanceo).
+        
+        Args:
+            win_rate: Proporción de trades ganadores (0 a 1)
+            win_loss_ratio: Ganancia media / pérdida media
+            
+        Returns:
+            Fracción del capital a usar por posición (0 a 1)
+        """
+        if win_loss_ratio <= 0:
+            raise ValueError("win_loss_ratio debe ser positivo")
         
+        kelly = win_rate - (1 - win_rate) / win_loss_ratio
+        scale = self.parameters.kelly_mode.scale() if self.parameters.kelly_mode else 1.0
+        self._kelly_fraction = max(0.0, min(1.0, kelly * scale))
+        return self._kelly_fraction
+    
+    def record_trade(self, pnl: float) -> None:
+        """
+        Registra el PnL de un trade cerrado (el motor lo llama en cada cierre)
+        
+        Con kelly_mode, una vez que hay al menos un trade ganador y uno perdedor
+        se recalcula la fracción de Kelly con la tasa de aciertos y la relación
+        ganancia media / pérdida media acumuladas.
+        
+        Args:
+            pnl: PnL neto del trade
+        """
+        if pnl > 0:
+            self._wins += 1
+            self._win_total += pnl
+        elif pnl < 0:
+            self._losses += 1
+            self._loss_total -= pnl
+        
+        if self.parameters.kelly_mode is not None and self._wins and self._losses:
+            win_rate = self._wins / (self._wins + self._losses)
+            win_loss_ratio = (self._win_total / self._wins) / (self._loss_total / self._losses)
+            self.update_kelly_stats(win_rate, win_loss_ratio)
+    
     def calculate_position_size(self, capital: float, price: float, 
                               stop_loss_price: Optional[float] = None) -> float:
         """
@@ -34,8 +114,11 @@ class RiskManager:
         Returns:
             Tamaño de posición en unidades base
         """
-        # Tamaño máximo basado en porcentaje del capital
-        max_position_value = capital * self.parameters.max_position_size
+        # Tamaño máximo basado en porcentaje del capital (o en Kelly si está activo)
+        position_fraction = self.parameters.max_position_size
+        if self.parameters.kelly_mode is not None and self._kelly_fraction is not None:
+            position_fraction = self._kelly_fraction
+        max_position_value = capital * position_fraction
         max_position_size = max_position_value / price
         
         # Si hay stop loss, ajustar tamaño basado en riesgo por operación
@@ -63,18 +146,44 @@ class RiskManager:
             True si se puede entrar en la operación
         """
         # Verificar pérdida máxima diaria
-        if (self.parameters.max_daily_loss is not None and 
-            self.daily_pnl < -self.parameters.max_daily_loss):
+        if (self.parameters.max_daily_loss is not None
+                and self.daily_pnl < -self.parameters.max_daily_loss):
             return False
         
-        # Verificar drawdown máximo
+        # Verificar drawdown máximo desde el pico de equity (empezando por el capital inicial)
         if self.parameters.max_drawdown is not None:
-            current_dd = (capital - current_equity) / capital
+            if self._running_max_equity is None:
+                self._running_max_equity = capital
+            self._running_max_equity = max(self._running_max_equity, current_equity)
+            current_dd = (self._running_max_equity - current_equity) / self._running_max_equity
             if current_dd > self.parameters.max_drawdown:
                 return False
         
         return True
     
+    def should_enter_trade_batch(self, equity: np.ndarray) -> np.ndarray:
+        """
+        Versión vectorizada de should_enter_trade sobre una curva de equity
+        
+        Args:
+            equity: Equity en cada barra
+            
+        Returns:
+            Máscara bool: True donde se puede entrar en una operación
+        """
+        equity = np.asarray(equity, dtype=np.float64)
+        
+        if (self.parameters.max_daily_loss is not None
+                and self.daily_pnl < -self.parameters.max_daily_loss):
+            return np.zeros(equity.shape, dtype=bool)
+        
+        if self.parameters.max_drawdown is None:
+            return np.ones(equity.shape, dtype=bool)
+        
+        running_max = np.maximum.accumulate(equity)
+        drawdown = (running_max - equity) / running_max
+        return drawdown <= self.parameters.max_drawdown
+    
     def calculate_stop_loss(self, entry_price: float, side: str = "long") -> Optional[float]:
         """
         Calcula el precio de stop loss
@@ -89,10 +198,8 @@ class RiskManager:
         if self.parameters.stop_loss_pct is None:
             return None
         
-        if side == "long":
-            return entry_price * (1 - self.parameters.stop_loss_pct)
-        else:  # short
-            return entry_price * (1 + self.parameters.stop_loss_pct)
+        side_sign = _SIDE_SIGNS.get(side, SIDE_SHORT)
+        return entry_price * (1 - self.parameters.stop_loss_pct * side_sign)
     
     def calculate_take_profit(self, entry_price: float, side: str = "long") -> Optional[float]:
         """
@@ -108,10 +215,42 @@ class RiskManager:
         if self.parameters.take_profit_pct is None:
             return None
         
-        if side == "long":
-            return entry_price * (1 + self.parameters.take_profit_pct)
-        else:  # short
-            return entry_price * (1 - self.parameters.take_profit_pct)
+        side_sign = _SIDE_SIGNS.get(side, SIDE_SHORT)
+        return entry_price * (1 + self.parameters.take_profit_pct * side_sign)
+    
+    def calculate_stop_loss_batch(self, entry_prices: np.ndarray,
+                                  side_signs: np.ndarray) -> np.ndarray:
+        """
+        Calcula los precios de stop loss de un lote de posiciones
+        
+        Args:
+            entry_prices: Precios de entrada
+            side_signs: Lado de cada posición (SIDE_LONG / SIDE_SHORT)
+            
+        Returns:
+            Precios de stop loss (NaN si no se usa)
+        """
+        entry_prices = np.asarray(entry_prices, dtype=np.float64)
+        if self.parameters.stop_loss_pct is None:
+            return np.full(entry_prices.shape, np.nan)
+        return entry_prices * (1.0 - self.parameters.stop_loss_pct * np.asarray(side_signs))
+    
+    def calculate_take_profit_batch(self, entry_prices: np.ndarray,
+                                    side_signs: np.ndarray) -> np.ndarray:
+        """
+        Calcula los precios de take profit de un lote de posiciones
+        
+        Args:
+            entry_prices: Precios de entrada
+            side_signs: Lado de cada posición (SIDE_LONG / SIDE_SHORT)
+            
+        Returns:
+            Precios de take profit (NaN si no se usa)
+        """
+        entry_prices = np.asarray(entry_prices, dtype=np.float64)
+        if self.parameters.take_profit_pct is None:
+            return np.full(entry_prices.shape, np.nan)
+        return entry_prices * (1.0 + self.parameters.take_profit_pct * np.asarray(side_signs))
     
     def should_exit_trade(self, current_price: float, entry_price: float, 
                          side: str = "long", stop_loss: Optional[float] = None,
@@ -149,6 +288,38 @@ class RiskManager:
         
         return False, ""
     
+    def should_exit_trade_batch(self, current_prices: np.ndarray, entry_prices: np.ndarray,
+                                sides: np.ndarray,
+                                stop_loss: Union[np.ndarray, float, None] = None,
+                                take_profit: Union[np.ndarray, float, None] = None
+                                ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Versión vectorizada de should_exit_trade para un lote de posiciones
+        
+        Args:
+            current_prices: Precio actual de cada posición
+            entry_prices: Precio de entrada de cada posición
+            sides: Lado de cada posición (SIDE_LONG / SIDE_SHORT, int8)
+            stop_loss: Precios de stop loss (NaN o None = sin stop)
+            take_profit: Precios de take profit (NaN o None = sin objetivo)
+            
+        Returns:
+            (máscara de salida, código de motivo EXIT_* por posición)
+        """
+        current_prices = np.asarray(current_prices, dtype=np.float64)
+        is_long = np.asarray(sides) == SIDE_LONG
+        stop_loss = np.asarray(np.nan if stop_loss is None else stop_loss, dtype=np.float64)
+        take_profit = np.asarray(np.nan if take_profit is None else take_profit, dtype=np.float64)
+        
+        # Las comparaciones con NaN son False: niveles ausentes nunca disparan
+        hit_stop = np.where(is_long, current_prices <= stop_loss, current_prices >= stop_loss)
+        hit_target = np.where(is_long, current_prices >= take_profit, current_prices <= take_profit)
+        
+        # El stop loss tiene prioridad, como en la versión escalar
+        reasons = np.where(hit_stop, EXIT_STOP_LOSS,
+                           np.where(hit_target, EXIT_TAKE_PROFIT, EXIT_NONE)).astype(np.int8)
+        return hit_stop | hit_target, reasons
+    
     def update_daily_pnl(self, pnl: float):
         """Actualiza el PnL diario"""
         self.daily_pnl += pnl
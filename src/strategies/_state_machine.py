@@ -0,0 +1,90 @@
+"""Máquina de estados compartida para resolver señales a partir de máscaras"""
+
+import numpy as np
+from typing import Tuple
+
+from src.utils.jit import njit
+
+
+# Posiciones
+FLAT = 0
+LONG = 1
+SHORT = -1
+
+# Acciones emitidas
+ENTER_LONG = 1
+ENTER_SHORT = 2
+EXIT_LONG = 3
+EXIT_SHORT = 4
+
+
+@njit(cache=True)
+def resolve_signals(long_trigger: np.ndarray, long_ok: np.ndarray,
+                    short_trigger: np.ndarray, short_ok: np.ndarray,
+                    long_exit: np.ndarray, short_exit: np.ndarray
+                    ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Recorre las barras candidatas manteniendo la posición abierta
+
+    Reproduce la cadena if/elif de las estrategias: un disparador de entrada
+    (long_trigger/short_trigger) toma la rama aunque la confirmación
+    (long_ok/short_ok) falle; las salidas sólo se evalúan si no hubo disparador.
+
+    Args:
+        long_trigger: Barras que activan la rama de entrada LONG
+        long_ok: Confirmación para entrar LONG
+        short_trigger: Barras que activan la rama de entrada SHORT
+        short_ok: Confirmación para entrar SHORT
+        long_exit: Condición de salida de una posición LONG
+        short_exit: Condición de salida de una posición SHORT
+
+    Returns:
+        (índices, acciones) de las señales emitidas, en orden cronológico
+    """
+    candidates = np.flatnonzero(long_trigger | short_trigger | long_exit | short_exit)
+
+    # Como máximo una señal por barra candidata
+    indices = np.empty(len(candidates), dtype=np.int64)
+    actions = np.empty(len(candidates), dtype=np.int8)
+    count = 0
+    position = FLAT
+
+    for i in candidates:
+        if position != LONG and long_trigger[i]:
+            if long_ok[i]:
+                indices[count] = i
+                actions[count] = ENTER_LONG
+                count += 1
+                position = LONG
+        elif position != SHORT and short_trigger[i]:
+            if short_ok[i]:
+                indices[count] = i
+                actions[count] = ENTER_SHORT
+                count += 1
+                position = SHORT
+        elif position == LONG:
+            if long_exit[i]:
+                indices[count] = i
+                actions[count] = EXIT_LONG
+                count += 1
+                position = FLAT
+        elif position == SHORT:
+            if short_exit[i]:
+                indices[count] = i
+                actions[count] = EXIT_SHORT
+                count += 1
+                position = FLAT
+
+    return indices[:count], actions[:count]
+
+
+def positions_before(indices: np.ndarray, actions: np.ndarray,
+                     bars: np.ndarray) -> np.ndarray:
+    """Posición (FLAT/LONG/SHORT) vigente al comienzo de cada barra de `bars`"""
+    if len(indices) == 0:
+        return np.full(len(bars), FLAT, dtype=np.int8)
+
+    state_after = np.where(actions == ENTER_LONG, LONG,
+                           np.where(actions == ENTER_SHORT, SHORT, FLAT)).astype(np.int8)
+    last_event = np.searchsorted(indices, bars, side='left') - 1
+    return np.where(last_event >= 0, state_after[np.maximum(last_event, 0)], FLAT)
@@ -1,9 +1,57 @@
+import hashlib
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
-from enum import Enum
+from enum import Enum, IntEnum
+import numpy as np
 import pandas as pd
 
+from src.utils.compat import DATACLASS_SLOTS
+
+if TYPE_CHECKING:
+    from .signal_buffer import SignalBuffer
+
+
+# Columnas mínimas que toda estrategia necesita
+_REQUIRED_OHLCV = frozenset({'open', 'high', 'low', 'close', 'volume'})
+
+# Caché LRU de indicadores compartida entre estrategias (barridos de parámetros)
+INDICATOR_CACHE_SIZE = 64
+_indicator_cache: "OrderedDict[Tuple, Any]" = OrderedDict()
+
+
+def _indicator_key(data: pd.DataFrame, name: str, params: Tuple) -> Tuple:
+    """Clave de caché: longitud y hash blake2b de los cierres, nombre y parámetros"""
+    close = np.ascontiguousarray(data['close'].to_numpy(dtype=np.float64))
+    digest = hashlib.blake2b(memoryview(close).cast('B'), digest_size=16).digest()
+    return ((len(close), digest), name, params)
+
+
+def cache_indicator(data: pd.DataFrame, name: str, params: Tuple, result: Any) -> Any:
+    """
+    Guarda un indicador ya calculado en la caché compartida de estrategias
+    
+    Args:
+        data: DataFrame con la columna 'close' sobre la que se calculó
+        name: Nombre del indicador ('ema', 'rsi', 'macd', 'bollinger')
+        params: Parámetros con los que lo consulta la estrategia
+        result: Array o dict de arrays (se marcan de sólo lectura)
+        
+    Returns:
+        El mismo result
+    """
+    for array in (result.values() if isinstance(result, dict) else (result,)):
+        if isinstance(array, np.ndarray):
+            array.flags.writeable = False
+    
+    key = _indicator_key(data, name, params)
+    _indicator_cache[key] = result
+    _indicator_cache.move_to_end(key)
+    if len(_indicator_cache) > INDICATOR_CACHE_SIZE:
+        _indicator_cache.popitem(last=False)
+    return result
+
 
 class SignalType(Enum):
     """Tipos de señales de trading"""
@@ -12,25 +60,95 @@ class SignalType(Enum):
     HOLD = "hold"
 
 
-@dataclass
+class ReasonCode(IntEnum):
+    """Motivos de señal; el texto se formatea sólo cuando se consulta"""
+    CUSTOM = 0
+    EMA_BULL_CROSS = 1
+    EMA_BEAR_CROSS = 2
+    EMA_EXIT_LONG = 3
+    EMA_EXIT_SHORT = 4
+    GOLDEN_CROSS = 5
+    DEATH_CROSS = 6
+    RSI_OVERSOLD = 7
+    RSI_OVERBOUGHT = 8
+    MACD_BULL_CROSS = 9
+    MACD_BEAR_CROSS = 10
+    BB_LOWER_TOUCH = 11
+    BB_UPPER_TOUCH = 12
+
+
+_REASON_TEMPLATES = {
+    ReasonCode.CUSTOM: "",
+    ReasonCode.EMA_BULL_CROSS: "EMA bullish cross: Fast>{:.2f}, Med>{:.2f}, Slow>{:.2f}",
+    ReasonCode.EMA_BEAR_CROSS: "EMA bearish cross: Fast<{:.2f}, Med<{:.2f}, Slow<{:.2f}",
+    ReasonCode.EMA_EXIT_LONG: "EMA trend reversal - Exit LONG",
+    ReasonCode.EMA_EXIT_SHORT: "EMA trend reversal - Exit SHORT",
+    ReasonCode.GOLDEN_CROSS: "Golden Cross: EMA{} > EMA{}",
+    ReasonCode.DEATH_CROSS: "Death Cross: EMA{} < EMA{}",
+    ReasonCode.RSI_OVERSOLD: "RSI oversold: {:.2f} < {}",
+    ReasonCode.RSI_OVERBOUGHT: "RSI overbought: {:.2f} > {}",
+    ReasonCode.MACD_BULL_CROSS: "MACD bullish crossover",
+    ReasonCode.MACD_BEAR_CROSS: "MACD bearish crossover",
+    ReasonCode.BB_LOWER_TOUCH: "Price touched lower Bollinger Band",
+    ReasonCode.BB_UPPER_TOUCH: "Price touched upper Bollinger Band",
+}
+
+
+@dataclass(init=False, **DATACLASS_SLOTS)
 class TradeSignal:
     """Señal de trading"""
     timestamp: pd.Timestamp
     signal_type: SignalType
     price: float
     confidence: float = 1.0  # 0.0 a 1.0
-    reason: str = ""
+    _reason: str = ""  # Texto libre; las estrategias usan reason_code
     stop_loss: Optional[float] = None
     take_profit: Optional[float] = None
+    reason_code: ReasonCode = ReasonCode.CUSTOM
+    reason_args: Tuple = ()
+    
+    def __init__(self, timestamp: pd.Timestamp, signal_type: SignalType, price: float,
+                 confidence: float = 1.0, reason: str = "",
+                 stop_loss: Optional[float] = None, take_profit: Optional[float] = None,
+                 reason_code: ReasonCode = ReasonCode.CUSTOM, reason_args: Tuple = ()):
+        self.timestamp = timestamp
+        self.signal_type = signal_type
+        self.price = price
+        self.confidence = confidence
+        self._reason = reason
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.reason_code = reason_code
+        self.reason_args = reason_args
+    
+    @property
+    def reason(self) -> str:
+        """Motivo de la señal; sin texto libre se formatea a partir de reason_code"""
+        return self.reason_text
+    
+    @reason.setter
+    def reason(self, value: str) -> None:
+        self._reason = value
+    
+    @property
+    def reason_text(self) -> str:
+        """Motivo legible de la señal (formateado bajo demanda)"""
+        if self._reason or self.reason_code == ReasonCode.CUSTOM:
+            return self._reason
+        return _REASON_TEMPLATES[self.reason_code].format(*self.reason_args)
 
 
 class BaseStrategy(ABC):
     """Clase base para estrategias de trading"""
     
+    # Las subclases que necesiten columnas extra pueden ampliar este conjunto
+    _REQUIRED_COLUMNS = _REQUIRED_OHLCV
+    
     def __init__(self, symbol: str, **kwargs):
         self.symbol = symbol
         self.parameters = kwargs
         self.signals: List[TradeSignal] = []
+        self.signal_buffer: Optional['SignalBuffer'] = None
         
     @abstractmethod
     def generate_signals(self, data: pd.DataFrame) -> List[TradeSignal]:
@@ -54,27 +172,74 @@ class BaseStrategy(ABC):
         """Retorna los parámetros de la estrategia"""
         return self.parameters.copy()
     
+    def _cached_indicator(self, data: pd.DataFrame, name: str, params: Tuple,
+                          compute: Callable[[], Any]) -> Any:
+        """
+        Devuelve un indicador calculado sobre data['close'], reutilizándolo entre llamadas
+        
+        La clave combina la longitud de los precios y un hash de su contenido,
+        de modo que el mismo DataFrame reutiliza el cálculo en cada combinación
+        de parámetros y una serie distinta (o modificada en el lugar) nunca
+        recibe un resultado ajeno.
+        
+        Args:
+            data: DataFrame con la columna 'close'
+            name: Nombre del indicador
+            params: Parámetros que determinan el cálculo (períodos, etc.)
+            compute: Función que calcula el indicador si no está en caché
+            
+        Returns:
+            Resultado de compute() (arrays de sólo lectura)
+        """
+        key = _indicator_key(data, name, params)
+        if key in _indicator_cache:
+            _indicator_cache.move_to_end(key)
+            return _indicator_cache[key]
+        
+        return cache_indicator(data, name, params, compute())
+    
     def validate_data(self, data: pd.DataFrame) -> bool:
         """Valida que los datos tengan las columnas necesarias"""
-        required_columns = ['open', 'high', 'low', 'close', 'volume']
-        return all(col in data.columns for col in required_columns)
+        return self._REQUIRED_COLUMNS.issubset(data.columns)
     
     def filter_signals_by_time(self, start_time: pd.Timestamp, 
                               end_time: pd.Timestamp) -> List[TradeSignal]:
         """Filtra señales por rango de tiempo"""
+        buffer = self.signal_buffer
+        if buffer is not None and buffer.is_datetime and len(buffer) == len(self.signals):
+            lo, hi = buffer.time_range(start_time, end_time)
+            return self.signals[lo:hi]
+        
         return [
             signal for signal in self.signals 
             if start_time <= signal.timestamp <= end_time
         ]
     
+    def _store_signals(self, buffer: 'SignalBuffer') -> List[TradeSignal]:
+        """Guarda el buffer columnar y su lista equivalente de TradeSignal"""
+        self.signal_buffer = buffer
+        self.signals = buffer.to_trade_signals()
+        return self.signals
+    
     def get_signal_summary(self) -> Dict:
         """Retorna un resumen de las señales generadas"""
-        buy_signals = [s for s in self.signals if s.signal_type == SignalType.BUY]
-        sell_signals = [s for s in self.signals if s.signal_type == SignalType.SELL]
+        if self.signal_buffer is not None and len(self.signal_buffer) == len(self.signals):
+            return self.signal_buffer.summary()
+        
+        # Una sola pasada; los miembros de un Enum son únicos, basta con `is`
+        buy_signals = sell_signals = 0
+        confidence_sum = 0.0
+        for signal in self.signals:
+            signal_type = signal.signal_type
+            if signal_type is SignalType.BUY:
+                buy_signals += 1
+            elif signal_type is SignalType.SELL:
+                sell_signals += 1
+            confidence_sum += signal.confidence
         
         return {
             'total_signals': len(self.signals),
-            'buy_signals': len(buy_signals),
-            'sell_signals': len(sell_signals),
-            'avg_confidence': sum(s.confidence for s in self.signals) / len(self.signals) if self.signals else 0
+            'buy_signals': buy_signals,
+            'sell_signals': sell_signals,
+            'avg_confidence': confidence_sum / len(self.signals) if self.signals else 0
         }
\ No newline at end of file
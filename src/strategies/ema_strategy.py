@@ -1,8 +1,92 @@
 import pandas as pd
 import numpy as np
-from typing import List
-from .base import BaseStrategy, TradeSignal, SignalType
-from src.indicators.technical import TechnicalIndicators
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+from .base import BaseStrategy, TradeSignal, ReasonCode
+from ._state_machine import (FLAT, LONG, SHORT, ENTER_LONG, ENTER_SHORT, EXIT_LONG,
+                             EXIT_SHORT, resolve_signals, positions_before)
+from .signal_buffer import SignalBuffer
+from src.indicators.technical import TechnicalIndicators, ewm_step
+from src.utils.jit import njit
+
+
+def _ema_array(strategy: BaseStrategy, data: pd.DataFrame, period: int) -> np.ndarray:
+    """EMA del cierre como array, compartida vía la caché de indicadores"""
+    return strategy._cached_indicator(
+        data, 'ema', (period,),
+        lambda: TechnicalIndicators.ema(data['close'], period).to_numpy(dtype=float)
+    )
+
+
+@lru_cache(maxsize=32)
+def _make_ema_kernel(periods: Tuple[int, ...]) -> Callable:
+    """
+    Genera y compila un kernel que calcula las EMAs de `periods` en una pasada
+
+    Los coeficientes de cada período se escriben como literales en el código
+    fuente, de modo que el compilador los trata como constantes. Se usan los
+    mismos valores y la misma recurrencia que pandas (alpha = 1 / (1 + com),
+    ignore_na=False: un NaN repite el valor anterior y aumenta el peso del
+    siguiente cierre), por lo que el resultado es idéntico a
+    TechnicalIndicators.ema. Cada combinación de períodos se compila una vez y
+    se comparte entre instancias.
+    """
+    outs = ', '.join(f'out{k}' for k in range(len(periods)))
+    lines = ['def kernel(close):',
+             '    n = close.shape[0]']
+    lines += [f'    out{k} = np.empty(n)' for k in range(len(periods))]
+    lines += ['    if n == 0:',
+              f'        return ({outs},)']
+    for k in range(len(periods)):
+        lines += [f'    w{k} = close[0]',
+                  f'    old{k} = 1.0',
+                  f'    out{k}[0] = w{k}']
+    lines += ['    for i in range(1, n):',
+              '        cur = close[i]',
+              '        observed = cur == cur']
+    for k, period in enumerate(periods):
+        alpha = 1.0 / (1.0 + (period - 1) / 2.0)
+        decay = 1.0 - alpha
+        lines += [f'        if w{k} == w{k}:',
+                  f'            old{k} *= {decay!r}',
+                  '            if observed:',
+                  f'                w{k} = ewm_step(w{k}, cur, old{k}, {alpha!r})',
+                  f'                old{k} = 1.0',
+                  '        elif observed:',
+                  f'            w{k} = cur',
+                  f'        out{k}[i] = w{k}']
+    lines.append(f'    return ({outs},)')
+
+    namespace = {'np': np, 'ewm_step': ewm_step}
+    exec('\n'.join(lines), namespace)
+    return njit(namespace['kernel'])
+
+
+def _ema_arrays(strategy: BaseStrategy, data: pd.DataFrame, periods: Tuple[int, ...],
+                kernel: Optional[Callable] = None) -> List[np.ndarray]:
+    """EMAs de `periods`; con kernel especializado se calculan todas en una pasada"""
+    if kernel is None:
+        return [_ema_array(strategy, data, period) for period in periods]
+
+    computed = {}
+
+    def compute(period: int) -> np.ndarray:
+        if not computed:
+            close = np.ascontiguousarray(data['close'].to_numpy(dtype=float))
+            computed.update(zip(periods, kernel(close)))
+        return computed[period]
+
+    return [strategy._cached_indicator(data, 'ema', (period,),
+                                       lambda period=period: compute(period))
+            for period in periods]
+
+
+def _slope(values: np.ndarray, periods: int) -> np.ndarray:
+    """Variación relativa en `periods` barras (equivale a pct_change), NaN al inicio"""
+    slope = np.empty_like(values)
+    slope[:periods] = np.nan
+    slope[periods:] = values[periods:] / values[:-periods] - 1.0
+    return slope
 
 
 class EMAStrategy(BaseStrategy):
@@ -30,7 +114,8 @@ class EMAStrategy(BaseStrategy):
                  allow_longs: bool = True, allow_shorts: bool = False,
                  trend_filter: bool = True, confirmation_candles: int = 2,
                  volume_filter: bool = False, min_ema_distance: float = 0.005,
-                 exit_on_cross: bool = True, trailing_stop: bool = False, **kwargs):
+                 exit_on_cross: bool = True, trailing_stop: bool = False,
+                 specialize: bool = False, **kwargs):
         super().__init__(symbol, **kwargs)
         self.fast_ema = fast_ema
         self.medium_ema = medium_ema
@@ -45,6 +130,10 @@ class EMAStrategy(BaseStrategy):
         self.exit_on_cross = exit_on_cross  # Salir en cruce contrario
         self.trailing_stop = trailing_stop  # Usar trailing stop
         
+        # Kernel con los períodos fijos como constantes (walk-forward con muchos
+        # datos); compilar cuesta ~0.5 s por combinación, por eso es opcional
+        self._kernel = _make_ema_kernel((fast_ema, medium_ema, slow_ema)) if specialize else None
+        
         # Sistema de debug mejorado
         self.debug_info = []
         
@@ -53,173 +142,114 @@ class EMAStrategy(BaseStrategy):
         if not self.validate_data(data):
             raise ValueError("Datos inválidos: faltan columnas OHLCV")
         
-        # Calcular EMAs
-        data['ema_fast'] = TechnicalIndicators.ema(data['close'], self.fast_ema)
-        data['ema_medium'] = TechnicalIndicators.ema(data['close'], self.medium_ema)
-        data['ema_slow'] = TechnicalIndicators.ema(data['close'], self.slow_ema)
+        # Calcular EMAs (arrays locales, sin modificar el DataFrame)
+        close = data['close'].to_numpy(dtype=float)
+        ef, em, es = _ema_arrays(self, data, (self.fast_ema, self.medium_ema, self.slow_ema),
+                                 self._kernel)
+        n = len(close)
         
-        # Calcular pendientes de EMAs (fuerza de tendencia)
-        data['ema_fast_slope'] = data['ema_fast'].pct_change(5)  # Pendiente en 5 períodos
-        data['ema_medium_slope'] = data['ema_medium'].pct_change(5)
-        data['ema_slow_slope'] = data['ema_slow'].pct_change(10)  # Pendiente más lenta
+        # Pendientes de EMAs en 5 períodos (fuerza de tendencia)
+        efs = _slope(ef, 5)
+        ems = _slope(em, 5)
         
-        signals = []
-        position = None  # None, 'long', 'short'
+        # Barras analizables: desde max(slow, 10) y con las tres EMAs disponibles
+        valid = ~(np.isnan(ef) | np.isnan(em) | np.isnan(es))
+        valid[:max(self.slow_ema, 10)] = False
         
-        for i in range(max(self.slow_ema, 10), len(data)):
-            current = data.iloc[i]
-            previous = data.iloc[i-1]
-            
-            # Verificar que tenemos todos los datos
-            if (pd.isna(current['ema_fast']) or pd.isna(current['ema_medium']) or 
-                pd.isna(current['ema_slow'])):
-                continue
-            
-            timestamp = data.index[i]
-            current_price = current['close']
-            
-            # Evaluar condiciones de tendencia
-            bullish_alignment = (current['ema_fast'] > current['ema_medium'] > current['ema_slow'])
-            bearish_alignment = (current['ema_fast'] < current['ema_medium'] < current['ema_slow'])
-            
-            # Evaluar fuerza de tendencia
-            strong_bullish_trend = (current['ema_fast_slope'] > self.min_trend_strength and
-                                   current['ema_medium_slope'] > 0)
-            strong_bearish_trend = (current['ema_fast_slope'] < -self.min_trend_strength and
-                                   current['ema_medium_slope'] < 0)
-            
-            # Detectar cruces de precio con EMA rápida
-            price_cross_above_fast = (previous['close'] <= previous['ema_fast'] and 
-                                     current_price > current['ema_fast'])
-            price_cross_below_fast = (previous['close'] >= previous['ema_fast'] and 
-                                     current_price < current['ema_fast'])
-            
-            # Debug: Registrar información de análisis cada 20 barras
-            if i % 20 == 0 or price_cross_above_fast or price_cross_below_fast:
-                debug_entry = {
-                    'type': 'analysis',
-                    'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                    'price': current_price,
-                    'ema_fast': current['ema_fast'],
-                    'ema_medium': current['ema_medium'],
-                    'ema_slow': current['ema_slow'],
-                    'bullish': bullish_alignment,
-                    'bearish': bearish_alignment,
-                    'position': position,
-                    'price_cross_above': price_cross_above_fast,
-                    'price_cross_below': price_cross_below_fast,
-                    'strong_bull_trend': strong_bullish_trend,
-                    'strong_bear_trend': strong_bearish_trend
-                }
-                if price_cross_above_fast or price_cross_below_fast:
-                    debug_entry['cross_info'] = f"Precio cruzó {'ARRIBA' if price_cross_above_fast else 'ABAJO'} de EMA rápida"
-                    
-                self.debug_info.append(debug_entry)
-            
-            # SEÑALES LONG
-            if (self.allow_longs and position != 'long' and price_cross_above_fast):
-                # Condiciones para entrada LONG
-                trend_ok = True
-                if self.trend_filter:
-                    trend_ok = bullish_alignment
-                
-                if trend_ok and strong_bullish_trend:
-                    # Calcular confianza basada en alineación y fuerza de tendencia
-                    alignment_score = 0.6 if bullish_alignment else 0.3
-                    strength_score = min(current['ema_fast_slope'] / self.min_trend_strength * 0.4, 0.4)
-                    confidence = min(alignment_score + strength_score, 1.0)
-                    
-                    signal = TradeSignal(
-                        timestamp=timestamp,
-                        signal_type=SignalType.BUY,
-                        price=current_price,
-                        confidence=confidence,
-                        reason=f"EMA bullish cross: Fast>{self.fast_ema:.2f}, Med>{self.medium_ema:.2f}, Slow>{self.slow_ema:.2f}"
-                    )
-                    signals.append(signal)
-                    position = 'long'
-                    
-                    # Debug: Registrar la señal
-                    self.debug_info.append({
-                        'type': 'signal',
-                        'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                        'signal_type': 'BUY',
-                        'price': current_price,
-                        'confidence': confidence,
-                        'reason': signal.reason,
-                        'alignment_score': alignment_score,
-                        'strength_score': strength_score
-                    })
-            
-            # SEÑALES SHORT
-            elif (self.allow_shorts and position != 'short' and price_cross_below_fast):
-                # Condiciones para entrada SHORT
-                trend_ok = True
-                if self.trend_filter:
-                    trend_ok = bearish_alignment
-                
-                if trend_ok and strong_bearish_trend:
-                    # Calcular confianza
-                    alignment_score = 0.6 if bearish_alignment else 0.3
-                    strength_score = min(abs(current['ema_fast_slope']) / self.min_trend_strength * 0.4, 0.4)
-                    confidence = min(alignment_score + strength_score, 1.0)
-                    
-                    signal = TradeSignal(
-                        timestamp=timestamp,
-                        signal_type=SignalType.SELL,
-                        price=current_price,
-                        confidence=confidence,
-                        reason=f"EMA bearish cross: Fast<{self.fast_ema:.2f}, Med<{self.medium_ema:.2f}, Slow<{self.slow_ema:.2f}"
-                    )
-                    signals.append(signal)
-                    position = 'short'
-                    
-                    # Debug: Registrar la señal
-                    self.debug_info.append({
-                        'type': 'signal',
-                        'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                        'signal_type': 'SELL',
-                        'price': current_price,
-                        'confidence': confidence,
-                        'reason': signal.reason,
-                        'alignment_score': alignment_score,
-                        'strength_score': strength_score
-                    })
-            
-            # SALIDAS
-            elif position == 'long':
-                # Salida LONG: precio cruza por debajo de EMA media o cambio de tendencia
-                exit_condition = (price_cross_below_fast and current['ema_fast_slope'] < 0) or \
-                               (self.trend_filter and not bullish_alignment and current['ema_fast'] < current['ema_medium'])
-                
-                if exit_condition:
-                    signal = TradeSignal(
-                        timestamp=timestamp,
-                        signal_type=SignalType.SELL,
-                        price=current_price,
-                        confidence=0.8,
-                        reason="EMA trend reversal - Exit LONG"
-                    )
-                    signals.append(signal)
-                    position = None
+        # Condiciones de tendencia
+        bullish_alignment = (ef > em) & (em > es)
+        bearish_alignment = (ef < em) & (em < es)
+        
+        # Fuerza de tendencia
+        strong_bullish_trend = (efs > self.min_trend_strength) & (ems > 0)
+        strong_bearish_trend = (efs < -self.min_trend_strength) & (ems < 0)
+        
+        # Cruces de precio con EMA rápida (la barra 0 no tiene anterior)
+        prev_close = np.roll(close, 1)
+        prev_ef = np.roll(ef, 1)
+        price_cross_above_fast = (prev_close <= prev_ef) & (close > ef) & valid
+        price_cross_below_fast = (prev_close >= prev_ef) & (close < ef) & valid
+        price_cross_above_fast[:1] = False
+        price_cross_below_fast[:1] = False
+        
+        # Entradas: el cruce activa la rama aunque la confirmación falle
+        long_trigger = price_cross_above_fast if self.allow_longs else np.zeros(n, dtype=bool)
+        short_trigger = price_cross_below_fast if self.allow_shorts else np.zeros(n, dtype=bool)
+        long_ok = strong_bullish_trend & (bullish_alignment if self.trend_filter else True)
+        short_ok = strong_bearish_trend & (bearish_alignment if self.trend_filter else True)
+        
+        # Salidas por cruce contrario o cambio de tendencia
+        long_exit = (price_cross_below_fast & (efs < 0)) | \
+                    (valid & self.trend_filter & ~bullish_alignment & (ef < em))
+        short_exit = (price_cross_above_fast & (efs > 0)) | \
+                     (valid & self.trend_filter & ~bearish_alignment & (ef > em))
+        
+        indices, actions = resolve_signals(long_trigger, long_ok, short_trigger, short_ok,
+                                           long_exit, short_exit)
+        
+        # Confianza de las entradas según alineación y fuerza de tendencia; salidas fijas
+        is_long = actions == ENTER_LONG
+        is_entry = is_long | (actions == ENTER_SHORT)
+        aligned = np.where(is_long, bullish_alignment[indices], bearish_alignment[indices])
+        alignment_score = np.where(aligned, 0.6, 0.3)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            trend_strength = np.where(is_long, efs[indices], np.abs(efs[indices]))
+            strength_score = np.minimum(trend_strength / self.min_trend_strength * 0.4, 0.4)
+        confidences = np.where(is_entry, np.minimum(alignment_score + strength_score, 1.0), 0.8)
+        
+        periods = (self.fast_ema, self.medium_ema, self.slow_ema)
+        buffer = SignalBuffer.from_actions(
+            data.index, indices, actions, close,
+            reasons={ENTER_LONG: ReasonCode.EMA_BULL_CROSS, ENTER_SHORT: ReasonCode.EMA_BEAR_CROSS,
+                     EXIT_LONG: ReasonCode.EMA_EXIT_LONG, EXIT_SHORT: ReasonCode.EMA_EXIT_SHORT},
+            confidences=confidences,
+            reason_args=[periods] * len(indices)
+        )
+        signals = self._store_signals(buffer)
+        
+        signal_debug = {}
+        for k in np.flatnonzero(is_entry).tolist():
+            signal = signals[k]
+            signal_debug[int(indices[k])] = {
+                'type': 'signal',
+                'timestamp': signal.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                'signal_type': signal.signal_type.name,
+                'price': float(signal.price),
+                'confidence': signal.confidence,
+                'reason': signal.reason_text,
+                'alignment_score': float(alignment_score[k]),
+                'strength_score': float(strength_score[k])
+            }
+        
+        # Debug: análisis cada 20 barras y en cada cruce, seguido de la señal si la hubo
+        crossed = price_cross_above_fast | price_cross_below_fast
+        analysis_bars = np.flatnonzero(valid & ((np.arange(n) % 20 == 0) | crossed))
+        positions = positions_before(indices, actions, analysis_bars)
+        position_names = {FLAT: None, LONG: 'long', SHORT: 'short'}
+        for i, pos in zip(analysis_bars.tolist(), positions.tolist()):
+            debug_entry = {
+                'type': 'analysis',
+                'timestamp': data.index[i].strftime('%Y-%m-%d %H:%M:%S'),
+                'price': float(close[i]),
+                'ema_fast': float(ef[i]),
+                'ema_medium': float(em[i]),
+                'ema_slow': float(es[i]),
+                'bullish': bool(bullish_alignment[i]),
+                'bearish': bool(bearish_alignment[i]),
+                'position': position_names[pos],
+                'price_cross_above': bool(price_cross_above_fast[i]),
+                'price_cross_below': bool(price_cross_below_fast[i]),
+                'strong_bull_trend': bool(strong_bullish_trend[i]),
+                'strong_bear_trend': bool(strong_bearish_trend[i])
+            }
+            if crossed[i]:
+                direction = 'ARRIBA' if price_cross_above_fast[i] else 'ABAJO'
+                debug_entry['cross_info'] = f"Precio cruzó {direction} de EMA rápida"
             
-            elif position == 'short':
-                # Salida SHORT: precio cruza por encima de EMA media o cambio de tendencia
-                exit_condition = (price_cross_above_fast and current['ema_fast_slope'] > 0) or \
-                               (self.trend_filter and not bearish_alignment and current['ema_fast'] > current['ema_medium'])
-                
-                if exit_condition:
-                    signal = TradeSignal(
-                        timestamp=timestamp,
-                        signal_type=SignalType.SELL,
-                        price=current_price,
-                        confidence=0.8,
-                        reason="EMA trend reversal - Exit SHORT"
-                    )
-                    signals.append(signal)
-                    position = None
+            self.debug_info.append(debug_entry)
+            if i in signal_debug:
+                self.debug_info.append(signal_debug[i])
         
-        self.signals = signals
         return signals
     
     def get_strategy_name(self) -> str:
@@ -248,55 +278,31 @@ class EMAGoldenCrossStrategy(BaseStrategy):
         if not self.validate_data(data):
             raise ValueError("Datos inválidos: faltan columnas OHLCV")
         
-        # Calcular EMAs
-        data['ema_fast'] = TechnicalIndicators.ema(data['close'], self.fast_ema)
-        data['ema_slow'] = TechnicalIndicators.ema(data['close'], self.slow_ema)
+        # Calcular EMAs (arrays locales, sin modificar el DataFrame)
+        close = data['close'].to_numpy(dtype=float)
+        ef = _ema_array(self, data, self.fast_ema)
+        es = _ema_array(self, data, self.slow_ema)
         
-        signals = []
-        position = None
+        valid = ~(np.isnan(ef) | np.isnan(es))
+        valid[:1] = False
+        prev_ef = np.roll(ef, 1)
+        prev_es = np.roll(es, 1)
         
-        for i in range(1, len(data)):
-            current = data.iloc[i]
-            previous = data.iloc[i-1]
-            
-            if pd.isna(current['ema_fast']) or pd.isna(current['ema_slow']):
-                continue
-            
-            timestamp = data.index[i]
-            current_price = current['close']
-            
-            # Golden Cross (EMA rápida cruza por encima de lenta)
-            if (previous['ema_fast'] <= previous['ema_slow'] and 
-                current['ema_fast'] > current['ema_slow'] and 
-                position != 'long'):
-                
-                signal = TradeSignal(
-                    timestamp=timestamp,
-                    signal_type=SignalType.BUY,
-                    price=current_price,
-                    confidence=0.8,
-                    reason=f"Golden Cross: EMA{self.fast_ema} > EMA{self.slow_ema}"
-                )
-                signals.append(signal)
-                position = 'long'
-            
-            # Death Cross (EMA rápida cruza por debajo de lenta)
-            elif (previous['ema_fast'] >= previous['ema_slow'] and 
-                  current['ema_fast'] < current['ema_slow'] and 
-                  position == 'long'):
-                
-                signal = TradeSignal(
-                    timestamp=timestamp,
-                    signal_type=SignalType.SELL,
-                    price=current_price,
-                    confidence=0.8,
-                    reason=f"Death Cross: EMA{self.fast_ema} < EMA{self.slow_ema}"
-                )
-                signals.append(signal)
-                position = None
+        # Golden Cross / Death Cross
+        golden_cross = valid & (prev_ef <= prev_es) & (ef > es)
+        death_cross = valid & (prev_ef >= prev_es) & (ef < es)
+        no_shorts = np.zeros(len(close), dtype=bool)
         
-        self.signals = signals
-        return signals
+        indices, actions = resolve_signals(golden_cross, golden_cross, no_shorts, no_shorts,
+                                           death_cross, no_shorts)
+        
+        buffer = SignalBuffer.from_actions(
+            data.index, indices, actions, close,
+            reasons={ENTER_LONG: ReasonCode.GOLDEN_CROSS, EXIT_LONG: ReasonCode.DEATH_CROSS},
+            confidences=0.8,
+            reason_args=[(self.fast_ema, self.slow_ema)] * len(indices)
+        )
+        return self._store_signals(buffer)
     
     def get_strategy_name(self) -> str:
         return f"EMA Golden Cross ({self.fast_ema}/{self.slow_ema})"
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Cálculo fusionado de los indicadores de todas las estrategias en una pasada"""
+
+from typing import Iterable, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.indicators.technical import price_indicators_kernel
+from .base import BaseStrategy, cache_indicator
+
+
+class FusedIndicators(NamedTuple):
+    """Indicadores calculados por compute_all"""
+    emas: np.ndarray  # shape (K, N), una fila por período de ema_periods
+    rsi: np.ndarray
+    macd: np.ndarray
+    macd_signal: np.ndarray
+    macd_histogram: np.ndarray
+    bb_upper: np.ndarray
+    bb_middle: np.ndarray
+    bb_lower: np.ndarray
+
+
+def compute_all(close: np.ndarray, ema_periods: Sequence[int] = (20, 55, 200),
+                rsi_period: int = 14, macd_params: Tuple[int, int, int] = (12, 26, 9),
+                bb_params: Tuple[int, float] = (20, 2.0)) -> FusedIndicators:
+    """
+    Calcula en una sola pasada los indicadores que usan las estrategias
+
+    Args:
+        close: Precios de cierre, shape (N,), sin NaN
+        ema_periods: Períodos de EMA (TechnicalIndicators.ema)
+        rsi_period: Período del RSI
+        macd_params: (rápido, lento, señal) del MACD
+        bb_params: (período, desviaciones) de las Bollinger Bands
+
+    Returns:
+        FusedIndicators con un array por indicador
+
+    Raises:
+        ValueError: Si `close` tiene NaN (pandas y `ta` los saltean, el kernel no)
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    if np.isnan(close).any():
+        raise ValueError("compute_all requiere precios de cierre sin NaN")
+    fast, slow, sign = macd_params
+    bb_period, bb_dev = bb_params
+    return FusedIndicators(*price_indicators_kernel(
+        close, np.asarray(ema_periods, dtype=np.int64), int(rsi_period),
+        int(fast), int(slow), int(sign), int(bb_period), float(bb_dev)
+    ))
+
+
+def prime_indicator_cache(data: pd.DataFrame,
+                          strategies: Iterable[BaseStrategy]) -> Optional[FusedIndicators]:
+    """
+    Precalcula con compute_all los indicadores de un conjunto de estrategias
+
+    Los resultados se guardan en la caché de indicadores con las mismas claves
+    que usa cada estrategia, de modo que sus generate_signals sólo construyen
+    máscaras. Pensado para ensambles que operan sobre el mismo símbolo.
+    Si el cierre tiene NaN no se precalcula nada: cada estrategia calcula sus
+    indicadores con pandas, que saltea los faltantes.
+
+    Args:
+        data: DataFrame OHLCV compartido por las estrategias
+        strategies: Estrategias que se ejecutarán sobre `data`
+
+    Returns:
+        FusedIndicators calculados, o None si no se precalculó
+    """
+    close = data['close'].to_numpy(dtype=np.float64)
+    if np.isnan(close).any():
+        return None
+
+    ema_periods = set()
+    rsi_period = 14
+    macd_params = (12, 26, 9)
+    bb_params = (20, 2.0)
+
+    # Sólo se admite un juego de RSI/MACD/BB por pasada; EMAs, todas las pedidas
+    for strategy in strategies:
+        for attr in ('fast_ema', 'medium_ema', 'slow_ema'):
+            if isinstance(getattr(strategy, attr, None), int):
+                ema_periods.add(getattr(strategy, attr))
+        if hasattr(strategy, 'rsi_period'):
+            rsi_period = strategy.rsi_period
+        if hasattr(strategy, 'signal_period'):
+            macd_params = (strategy.fast_period, strategy.slow_period, strategy.signal_period)
+        if hasattr(strategy, 'bb_period'):
+            bb_params = (strategy.bb_period, strategy.bb_std)
+
+    ema_periods = sorted(ema_periods)
+    result = compute_all(close, ema_periods, rsi_period, macd_params, bb_params)
+
+    for period, ema in zip(ema_periods, result.emas):
+        cache_indicator(data, 'ema', (period,), ema.copy())
+    cache_indicator(data, 'rsi', (rsi_period,), result.rsi)
+    cache_indicator(data, 'macd', macd_params, {
+        'macd': result.macd, 'signal': result.macd_signal, 'histogram': result.macd_histogram
+    })
+    cache_indicator(data, 'bollinger', bb_params, {
+        'upper': result.bb_upper, 'middle': result.bb_middle, 'lower': result.bb_lower
+    })
+    return result
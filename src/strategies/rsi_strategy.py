@@ -1,6 +1,9 @@
 import pandas as pd
+import numpy as np
 from typing import List
-from .base import BaseStrategy, TradeSignal, SignalType
+from .base import BaseStrategy, TradeSignal, ReasonCode
+from ._state_machine import ENTER_LONG, EXIT_LONG, resolve_signals
+from .signal_buffer import SignalBuffer
 from src.indicators.technical import TechnicalIndicators
 
 
@@ -25,61 +28,50 @@ class RSIStrategy(BaseStrategy):
         if not self.validate_data(data):
             raise ValueError("Datos inválidos: faltan columnas OHLCV")
         
-        # Calcular RSI si no está presente
-        if 'rsi' not in data.columns:
-            data['rsi'] = TechnicalIndicators.rsi(data['close'], self.rsi_period)
-        
-        signals = []
-        position = None  # None, 'long', 'short'
-        
-        for i in range(1, len(data)):
-            current_rsi = data.iloc[i]['rsi']
-            previous_rsi = data.iloc[i-1]['rsi']
-            current_price = data.iloc[i]['close']
-            timestamp = data.index[i]
-            
-            # Skip si RSI es NaN
-            if pd.isna(current_rsi) or pd.isna(previous_rsi):
-                continue
-            
-            # Señal de compra: RSI cruza desde abajo el umbral de compra
-            if (previous_rsi >= self.buy_threshold and 
-                current_rsi < self.buy_threshold and 
-                position != 'long'):
-                
-                confidence = (self.buy_threshold - current_rsi) / self.buy_threshold
-                confidence = max(0.1, min(1.0, confidence))
-                
-                signal = TradeSignal(
-                    timestamp=timestamp,
-                    signal_type=SignalType.BUY,
-                    price=current_price,
-                    confidence=confidence,
-                    reason=f"RSI oversold: {current_rsi:.2f} < {self.buy_threshold}"
-                )
-                signals.append(signal)
-                position = 'long'
-            
-            # Señal de venta: RSI cruza desde arriba el umbral de venta
-            elif (previous_rsi <= self.sell_threshold and 
-                  current_rsi > self.sell_threshold and 
-                  position == 'long'):
-                
-                confidence = (current_rsi - self.sell_threshold) / (100 - self.sell_threshold)
-                confidence = max(0.1, min(1.0, confidence))
-                
-                signal = TradeSignal(
-                    timestamp=timestamp,
-                    signal_type=SignalType.SELL,
-                    price=current_price,
-                    confidence=confidence,
-                    reason=f"RSI overbought: {current_rsi:.2f} > {self.sell_threshold}"
-                )
-                signals.append(signal)
-                position = None
-        
-        self.signals = signals
-        return signals
+        # Usar el RSI presente en los datos o calcularlo (sin modificar el DataFrame)
+        if 'rsi' in data.columns:
+            rsi = data['rsi'].to_numpy(dtype=float)
+        else:
+            rsi = self._cached_indicator(
+                data, 'rsi', (self.rsi_period,),
+                lambda: TechnicalIndicators.rsi(
+                    data['close'], self.rsi_period
+                ).to_numpy(dtype=float)
+            )
+        
+        close = data['close'].to_numpy(dtype=float)
+        idx = data.index
+        
+        previous_rsi = np.roll(rsi, 1)
+        valid = ~(np.isnan(rsi) | np.isnan(previous_rsi))
+        valid[:1] = False
+        
+        # Compra: RSI cruza hacia abajo el umbral de compra; venta: cruza hacia arriba el de venta
+        buy_cross = valid & (previous_rsi >= self.buy_threshold) & (rsi < self.buy_threshold)
+        sell_cross = valid & (previous_rsi <= self.sell_threshold) & (rsi > self.sell_threshold)
+        no_shorts = np.zeros(len(rsi), dtype=bool)
+        
+        indices, actions = resolve_signals(buy_cross, buy_cross, no_shorts, no_shorts,
+                                           sell_cross, no_shorts)
+        
+        # Confianza según la distancia del RSI al umbral cruzado
+        is_buy = actions == ENTER_LONG
+        signal_rsi = rsi[indices]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidences = np.where(
+                is_buy,
+                (self.buy_threshold - signal_rsi) / self.buy_threshold,
+                (signal_rsi - self.sell_threshold) / (100 - self.sell_threshold)
+            )
+        
+        buffer = SignalBuffer.from_actions(
+            idx, indices, actions, close,
+            reasons={ENTER_LONG: ReasonCode.RSI_OVERSOLD, EXIT_LONG: ReasonCode.RSI_OVERBOUGHT},
+            confidences=np.clip(confidences, 0.1, 1.0),
+            reason_args=[(value, self.buy_threshold if buy else self.sell_threshold)
+                         for value, buy in zip(signal_rsi.tolist(), is_buy.tolist())]
+        )
+        return self._store_signals(buffer)
     
     def get_strategy_name(self) -> str:
         return f"RSI Strategy (period={self.rsi_period}, buy<{self.buy_threshold}, sell>{self.sell_threshold})"
@@ -106,61 +98,45 @@ class MACDStrategy(BaseStrategy):
         if not self.validate_data(data):
             raise ValueError("Datos inválidos: faltan columnas OHLCV")
         
-        # Calcular MACD si no está presente
-        if 'macd' not in data.columns:
-            macd_data = TechnicalIndicators.macd(
-                data['close'], self.fast_period, self.slow_period, self.signal_period
+        # Usar el MACD presente en los datos o calcularlo (sin modificar el DataFrame)
+        if 'macd' in data.columns:
+            macd = data['macd'].to_numpy(dtype=float)
+            macd_signal = data['macd_signal'].to_numpy(dtype=float)
+        else:
+            macd_data = self._cached_indicator(
+                data, 'macd', (self.fast_period, self.slow_period, self.signal_period),
+                lambda: {
+                    key: series.to_numpy(dtype=float)
+                    for key, series in TechnicalIndicators.macd(
+                        data['close'], self.fast_period, self.slow_period, self.signal_period
+                    ).items()
+                }
             )
-            data['macd'] = macd_data['macd']
-            data['macd_signal'] = macd_data['signal']
-            data['macd_histogram'] = macd_data['histogram']
-        
-        signals = []
-        position = None
-        
-        for i in range(1, len(data)):
-            current_macd = data.iloc[i]['macd']
-            current_signal = data.iloc[i]['macd_signal']
-            previous_macd = data.iloc[i-1]['macd']
-            previous_signal = data.iloc[i-1]['macd_signal']
-            current_price = data.iloc[i]['close']
-            timestamp = data.index[i]
-            
-            if pd.isna(current_macd) or pd.isna(current_signal):
-                continue
-            
-            # Señal de compra: MACD cruza por encima de la señal
-            if (previous_macd <= previous_signal and 
-                current_macd > current_signal and 
-                position != 'long'):
-                
-                signal = TradeSignal(
-                    timestamp=timestamp,
-                    signal_type=SignalType.BUY,
-                    price=current_price,
-                    confidence=0.8,
-                    reason="MACD bullish crossover"
-                )
-                signals.append(signal)
-                position = 'long'
-            
-            # Señal de venta: MACD cruza por debajo de la señal
-            elif (previous_macd >= previous_signal and 
-                  current_macd < current_signal and 
-                  position == 'long'):
-                
-                signal = TradeSignal(
-                    timestamp=timestamp,
-                    signal_type=SignalType.SELL,
-                    price=current_price,
-                    confidence=0.8,
-                    reason="MACD bearish crossover"
-                )
-                signals.append(signal)
-                position = None
-        
-        self.signals = signals
-        return signals
+            macd = macd_data['macd']
+            macd_signal = macd_data['signal']
+        
+        close = data['close'].to_numpy(dtype=float)
+        idx = data.index
+        
+        previous_macd = np.roll(macd, 1)
+        previous_signal = np.roll(macd_signal, 1)
+        valid = ~(np.isnan(macd) | np.isnan(macd_signal))
+        valid[:1] = False
+        
+        # Cruces de MACD sobre/bajo la línea de señal
+        bullish_cross = valid & (previous_macd <= previous_signal) & (macd > macd_signal)
+        bearish_cross = valid & (previous_macd >= previous_signal) & (macd < macd_signal)
+        no_shorts = np.zeros(len(macd), dtype=bool)
+        
+        indices, actions = resolve_signals(bullish_cross, bullish_cross, no_shorts, no_shorts,
+                                           bearish_cross, no_shorts)
+        
+        buffer = SignalBuffer.from_actions(
+            idx, indices, actions, close,
+            reasons={ENTER_LONG: ReasonCode.MACD_BULL_CROSS, EXIT_LONG: ReasonCode.MACD_BEAR_CROSS},
+            confidences=0.8
+        )
+        return self._store_signals(buffer)
     
     def get_strategy_name(self) -> str:
         return f"MACD Strategy ({self.fast_period},{self.slow_period},{self.signal_period})"
@@ -185,62 +161,44 @@ class BollingerBandsStrategy(BaseStrategy):
         if not self.validate_data(data):
             raise ValueError("Datos inválidos: faltan columnas OHLCV")
         
-        # Calcular Bollinger Bands si no están presentes
-        if 'bb_lower' not in data.columns:
-            bb_data = TechnicalIndicators.bollinger_bands(
-                data['close'], self.bb_period, self.bb_std
+        # Usar las Bollinger Bands presentes en los datos o calcularlas (sin modificar el DataFrame)
+        if 'bb_lower' in data.columns:
+            lower = data['bb_lower'].to_numpy(dtype=float)
+            upper = data['bb_upper'].to_numpy(dtype=float)
+        else:
+            bb_data = self._cached_indicator(
+                data, 'bollinger', (self.bb_period, self.bb_std),
+                lambda: {
+                    key: series.to_numpy(dtype=float)
+                    for key, series in TechnicalIndicators.bollinger_bands(
+                        data['close'], self.bb_period, self.bb_std
+                    ).items()
+                }
             )
-            data['bb_upper'] = bb_data['upper']
-            data['bb_middle'] = bb_data['middle']
-            data['bb_lower'] = bb_data['lower']
-        
-        signals = []
-        position = None
-        
-        for i in range(1, len(data)):
-            current_price = data.iloc[i]['close']
-            previous_price = data.iloc[i-1]['close']
-            current_lower = data.iloc[i]['bb_lower']
-            current_upper = data.iloc[i]['bb_upper']
-            previous_lower = data.iloc[i-1]['bb_lower']
-            previous_upper = data.iloc[i-1]['bb_upper']
-            timestamp = data.index[i]
-            
-            if pd.isna(current_lower) or pd.isna(current_upper):
-                continue
-            
-            # Señal de compra: precio toca banda inferior
-            if (previous_price > previous_lower and 
-                current_price <= current_lower and 
-                position != 'long'):
-                
-                signal = TradeSignal(
-                    timestamp=timestamp,
-                    signal_type=SignalType.BUY,
-                    price=current_price,
-                    confidence=0.7,
-                    reason="Price touched lower Bollinger Band"
-                )
-                signals.append(signal)
-                position = 'long'
-            
-            # Señal de venta: precio toca banda superior
-            elif (previous_price < previous_upper and 
-                  current_price >= current_upper and 
-                  position == 'long'):
-                
-                signal = TradeSignal(
-                    timestamp=timestamp,
-                    signal_type=SignalType.SELL,
-                    price=current_price,
-                    confidence=0.7,
-                    reason="Price touched upper Bollinger Band"
-                )
-                signals.append(signal)
-                position = None
-        
-        self.signals = signals
-        return signals
+            lower = bb_data['lower']
+            upper = bb_data['upper']
+        
+        close = data['close'].to_numpy(dtype=float)
+        idx = data.index
+        
+        valid = ~(np.isnan(lower) | np.isnan(upper))
+        valid[:1] = False
+        prev_close = np.roll(close, 1)
+        
+        # Toques de banda inferior (compra) y superior (venta)
+        touch_lower = valid & (prev_close > np.roll(lower, 1)) & (close <= lower)
+        touch_upper = valid & (prev_close < np.roll(upper, 1)) & (close >= upper)
+        no_shorts = np.zeros(len(close), dtype=bool)
+        
+        indices, actions = resolve_signals(touch_lower, touch_lower, no_shorts, no_shorts,
+                                           touch_upper, no_shorts)
+        
+        buffer = SignalBuffer.from_actions(
+            idx, indices, actions, close,
+            reasons={ENTER_LONG: ReasonCode.BB_LOWER_TOUCH, EXIT_LONG: ReasonCode.BB_UPPER_TOUCH},
+            confidences=0.7
+        )
+        return self._store_signals(buffer)
     
     def get_strategy_name(self) -> str:
         return f"Bollinger Bands Strategy (period={self.bb_period}, std={self.bb_std})"
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""Buffer columnar (Struct-of-Arrays) de señales de trading"""
+
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ._state_machine import ENTER_LONG
+from .base import ReasonCode, SignalType, TradeSignal
+
+
+# Códigos de lado (índices para np.bincount)
+SIDE_BUY = 0
+SIDE_SELL = 1
+SIDE_HOLD = 2
+
+_SIDE_TYPES = (SignalType.BUY, SignalType.SELL, SignalType.HOLD)
+
+# Miembros de ReasonCode indexados por valor (evita ReasonCode(code) por señal)
+_REASON_CODES = {code.value: code for code in ReasonCode}
+
+
+@dataclass
+class SignalBuffer:
+    """Señales como arrays paralelos en lugar de una lista de TradeSignal"""
+    timestamps: np.ndarray  # int64, ns desde epoch (UTC) si is_datetime
+    sides: np.ndarray  # int8, SIDE_*
+    prices: np.ndarray  # float64 (los mismos valores que los cierres)
+    confidences: np.ndarray  # float64
+    reason_codes: np.ndarray  # int16, valores de ReasonCode
+    reason_args: List[Tuple] = field(default_factory=list)  # Vacío si no hay argumentos
+    tz: Optional[Any] = None  # Zona horaria del índice original
+    is_datetime: bool = True  # False si el índice no era temporal (valores tal cual)
+
+    @classmethod
+    def from_actions(cls, index: pd.Index, indices: np.ndarray, actions: np.ndarray,
+                     prices: np.ndarray, reasons: Dict[int, ReasonCode], confidences,
+                     reason_args: List[Tuple] = None) -> 'SignalBuffer':
+        """
+        Construye el buffer a partir de la salida de resolve_signals
+
+        Args:
+            index: Índice temporal de los datos
+            indices: Barras con señal
+            actions: Acción emitida en cada barra (ENTER_LONG, EXIT_LONG, ...)
+            prices: Precios de cierre de todas las barras
+            reasons: Código de motivo para cada acción
+            confidences: Confianza por señal (array) o común a todas (escalar)
+            reason_args: Argumentos de formato por señal
+        """
+        reason_lookup = np.zeros(max(reasons) + 1, dtype=np.int16)
+        for action, code in reasons.items():
+            reason_lookup[action] = code
+
+        timestamps = index[indices]
+        is_datetime = isinstance(timestamps, pd.DatetimeIndex)
+
+        return cls(
+            timestamps=timestamps.as_unit('ns').asi8 if is_datetime else timestamps.to_numpy(),
+            sides=np.where(actions == ENTER_LONG, SIDE_BUY, SIDE_SELL).astype(np.int8),
+            prices=np.asarray(prices, dtype=np.float64)[indices],
+            confidences=np.broadcast_to(np.asarray(confidences, dtype=np.float64),
+                                        indices.shape).copy(),
+            reason_codes=reason_lookup[actions],
+            reason_args=reason_args or [],
+            tz=timestamps.tz if is_datetime else None,
+            is_datetime=is_datetime
+        )
+
+    def __len__(self) -> int:
+        return len(self.sides)
+
+    def summary(self) -> Dict:
+        """Resumen equivalente a BaseStrategy.get_signal_summary"""
+        counts = np.bincount(self.sides, minlength=3)
+        return {
+            'total_signals': len(self),
+            'buy_signals': int(counts[SIDE_BUY]),
+            'sell_signals': int(counts[SIDE_SELL]),
+            'avg_confidence': float(self.confidences.mean()) if len(self) else 0
+        }
+
+    def slice(self, lo: int, hi: int) -> 'SignalBuffer':
+        """Sub-buffer con las señales lo..hi-1 (vistas, sin copiar los arrays)"""
+        return SignalBuffer(
+            timestamps=self.timestamps[lo:hi],
+            sides=self.sides[lo:hi],
+            prices=self.prices[lo:hi],
+            confidences=self.confidences[lo:hi],
+            reason_codes=self.reason_codes[lo:hi],
+            reason_args=self.reason_args[lo:hi],
+            tz=self.tz,
+            is_datetime=self.is_datetime
+        )
+
+    def time_range(self, start_time: pd.Timestamp, end_time: pd.Timestamp) -> Tuple[int, int]:
+        """
+        Posiciones [lo, hi) de las señales con start_time <= timestamp <= end_time
+
+        Búsqueda binaria sobre los timestamps int64 (ordenados como el índice
+        original); los extremos deben tener la misma zona horaria que las señales.
+        """
+        start_time, end_time = pd.Timestamp(start_time), pd.Timestamp(end_time)
+        for bound in (start_time, end_time):
+            if (bound.tz is None) != (self.tz is None):
+                raise TypeError("No se pueden comparar timestamps con y sin zona horaria")
+        lo = int(np.searchsorted(self.timestamps, start_time.value, side='left'))
+        hi = int(np.searchsorted(self.timestamps, end_time.value, side='right'))
+        return lo, max(lo, hi)
+
+    def timestamp_index(self) -> pd.Index:
+        """Reconstruye los timestamps como índice de pandas (con su zona horaria)"""
+        if not self.is_datetime:
+            return pd.Index(self.timestamps)
+        index = pd.DatetimeIndex(self.timestamps.view('M8[ns]'))
+        return index.tz_localize('UTC').tz_convert(self.tz) if self.tz is not None else index
+
+    def to_trade_signals(self) -> List[TradeSignal]:
+        """Convierte el buffer a la lista de TradeSignal que esperan el motor y la app"""
+        reason_args = self.reason_args or repeat(())
+        reason_codes = [_REASON_CODES[code] for code in self.reason_codes.tolist()]
+        return [
+            TradeSignal(
+                timestamp=timestamp,
+                signal_type=_SIDE_TYPES[side],
+                price=price,
+                confidence=confidence,
+                reason_code=code,
+                reason_args=args
+            )
+            for timestamp, side, price, confidence, code, args in zip(
+                self.timestamp_index(), self.sides.tolist(), self.prices.tolist(),
+                self.confidences.tolist(), reason_codes, reason_args
+            )
+        ]
@@ -0,0 +1,84 @@
+"""Barridos de parámetros de estrategias ejecutados en paralelo"""
+
+import numpy as np
+from typing import Tuple
+
+from src.indicators.technical import ewm_step
+from src.utils.jit import njit, prange
+from ._state_machine import ENTER_LONG, EXIT_LONG, resolve_signals
+
+
+@njit(cache=True)
+def _ema(close, span):
+    """EMA idéntica a Series.ewm(span=span, adjust=False).mean() para datos sin NaN"""
+    alpha = 2.0 / (span + 1.0)
+    old_wt_factor = 1.0 - alpha
+    out = np.empty_like(close)
+    if close.shape[0] == 0:
+        return out
+
+    weighted = close[0]
+    out[0] = weighted
+    for i in range(1, close.shape[0]):
+        weighted = ewm_step(weighted, close[i], old_wt_factor, alpha)
+        out[i] = weighted
+    return out
+
+
+@njit(cache=True)
+def _golden_cross_column(close, fast, slow, entries, exits):
+    """Resuelve las señales de un par (fast, slow) y las marca en entries/exits"""
+    n = close.shape[0]
+    ema_fast = _ema(close, fast)
+    ema_slow = _ema(close, slow)
+
+    golden_cross = np.zeros(n, dtype=np.bool_)
+    death_cross = np.zeros(n, dtype=np.bool_)
+    for i in range(1, n):
+        golden_cross[i] = ema_fast[i - 1] <= ema_slow[i - 1] and ema_fast[i] > ema_slow[i]
+        death_cross[i] = ema_fast[i - 1] >= ema_slow[i - 1] and ema_fast[i] < ema_slow[i]
+
+    no_shorts = np.zeros(n, dtype=np.bool_)
+    indices, actions = resolve_signals(golden_cross, golden_cross, no_shorts, no_shorts,
+                                       death_cross, no_shorts)
+    for k in range(indices.shape[0]):
+        if actions[k] == ENTER_LONG:
+            entries[indices[k]] = True
+        elif actions[k] == EXIT_LONG:
+            exits[indices[k]] = True
+
+
+@njit(parallel=True, cache=True)
+def _sweep_ema_kernel(close, fast_grid, slow_grid, entries, exits):
+    """Reparte las combinaciones entre núcleos; cada una escribe sólo su columna"""
+    for k in prange(fast_grid.shape[0]):
+        _golden_cross_column(close, fast_grid[k], slow_grid[k], entries[:, k], exits[:, k])
+
+
+def sweep_ema(close: np.ndarray, fast_grid: np.ndarray,
+              slow_grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Genera las señales de EMAGoldenCrossStrategy para K combinaciones de períodos
+
+    El resultado alimenta directamente a BacktesterEngine.run_grid, de modo que
+    un barrido completo se resuelve sin llamar a generate_signals por combinación.
+
+    Args:
+        close: Precios de cierre, shape (N,), sin NaN
+        fast_grid: Períodos de la EMA rápida, shape (K,)
+        slow_grid: Períodos de la EMA lenta, shape (K,)
+
+    Returns:
+        (entries, exits): arrays bool shape (N, K) con las barras de compra y venta
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    fast_grid = np.asarray(fast_grid, dtype=np.int64)
+    slow_grid = np.asarray(slow_grid, dtype=np.int64)
+    if fast_grid.shape != slow_grid.shape or fast_grid.ndim != 1:
+        raise ValueError("fast_grid y slow_grid deben ser arrays 1D del mismo tamaño")
+
+    # Orden Fortran: cada columna es contigua para su hilo
+    entries = np.zeros((close.shape[0], fast_grid.shape[0]), dtype=np.bool_, order='F')
+    exits = np.zeros((close.shape[0], fast_grid.shape[0]), dtype=np.bool_, order='F')
+    _sweep_ema_kernel(close, fast_grid, slow_grid, entries, exits)
+    return entries, exits
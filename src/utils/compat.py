@@ -0,0 +1,6 @@
+"""Compatibilidad entre versiones de Python."""
+
+import sys
+
+# __slots__ en dataclasses requiere Python 3.10+; en 3.9 se usa __dict__
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
@@ -0,0 +1,21 @@
+"""Compatibilidad opcional con Numba.
+
+Si Numba está instalado los kernels numéricos se compilan con ``njit``;
+si no, los decoradores son no-ops y el código corre como Python puro.
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - depende del entorno
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Decorador no-op que imita la firma de ``numba.njit``"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
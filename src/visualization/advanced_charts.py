@@ -1,88 +1,289 @@
+import hashlib
+import json
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+
 import plotly.graph_objects as go
 import plotly.subplots as sp
 import pandas as pd
 import numpy as np
 from typing import List, Optional, Dict, Tuple, Any
-from plotly.offline import plot
 from datetime import datetime, timedelta
 
 from src.backtester.metrics import BacktestResults, Trade
 from src.strategies.base import TradeSignal, SignalType
+from src.utils.helpers import rolling_mean_nb
+
+
+_OHLC = ('open', 'high', 'low', 'close')
+
+# Hover de cada vela (fecha y OHLC), formateado por plotly.js en el navegador
+_CANDLE_HOVERTEMPLATE = ('📅 %{x|%Y-%m-%d %H:%M:%S}<br>🔓 Open: $%{open:,.4f}<br>'
+                         '⬆️ High: $%{high:,.4f}<br>⬇️ Low: $%{low:,.4f}<br>'
+                         '🔒 Close: $%{close:,.4f}<extra></extra>')
+
+
+# Marcadores de señales: (clave de color/marcador, nombre, etiqueta del hover)
+_SIGNAL_MARKERS = (
+    ('long_entry', '🚀 Long Entry', '🟢 LONG ENTRY'),
+    ('long_exit', '🔻 Long Exit', '🔴 LONG EXIT'),
+    ('short_entry', '🔻 Short Entry', '🔴 SHORT ENTRY'),
+    ('short_exit', '🚀 Short Exit', '🟢 SHORT EXIT'),
+)
+_LONG_ENTRY, _SHORT_ENTRY = 0, 2  # La salida de cada lado es la categoría siguiente
+
+# Cualquiera de estas claves activa el subplot de MACD
+_MACD_KEYS = frozenset({'macd', 'macd_signal', 'macd_histogram'})
+
+
+# Caché LRU de figuras base (velas, volumen y niveles) por contenido de los datos
+BASE_FIGURE_CACHE_SIZE = 4
+_base_figure_cache: "OrderedDict[Tuple, go.Figure]" = OrderedDict()
+
+# Desde este número de puntos las líneas se dibujan con WebGL (mismo umbral que plotly.express)
+WEBGL_MIN_POINTS = 1000
+
+
+def data_fingerprint(data: pd.DataFrame) -> Tuple:
+    """Hash del índice y de las columnas OHLCV que se dibujan (no de su dirección en memoria)"""
+    columns = [column for column in _OHLC + ('volume',) if column in data.columns]
+    row_hashes = pd.util.hash_pandas_object(data[columns], index=True).to_numpy()
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16).digest()
+    # El hash del índice ignora la zona horaria y el de los valores su dtype
+    return digest, str(data.index.dtype), tuple(data[columns].dtypes.astype(str))
+
+
+def _pick_colors(mask: np.ndarray, color_true: str, color_false: str) -> List[str]:
+    """Lista de colores según una máscara booleana (las barras comparten los mismos str)"""
+    palette = np.array([color_false, color_true], dtype=object)
+    return palette[mask.view(np.int8)].tolist()
+
+
+def compact_floats(values: Any, decimals: int = 4) -> np.ndarray:
+    """
+    Serie numérica como float32 si su error no se aprecia en el hover
+    
+    plotly serializa los arrays de NumPy en binario (bdata), así que float32
+    ocupa la mitad que float64. Sólo se reduce cuando el error de redondeo
+    no supera 0.05 unidades del último decimal mostrado; precios altos
+    con 4 decimales (BTC ~ 65000) no caben en float32 y se mantienen en float64.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    # Fuera de rango da inf (error inf, se descarta); NaN e inf se conservan en float32
+    with np.errstate(over='ignore', invalid='ignore'):
+        compact = values.astype(np.float32)
+        max_error = np.fmax.reduce(np.abs(compact - values), initial=0.0)
+    return compact if max_error <= 0.05 * 10.0 ** -decimals else values
+
+
+def downsample_ohlcv(data: pd.DataFrame, max_candles: int) -> pd.DataFrame:
+    """
+    Agrega las velas en max_candles grupos consecutivos de igual tamaño (M4)
+    
+    Cada grupo conserva la apertura de su primera vela, el máximo, el mínimo y el
+    cierre de la última (el volumen se suma): a zoom completo el gráfico se ve igual
+    mientras max_candles no sea menor que su ancho en píxeles.
+    """
+    if max_candles < 1:
+        raise ValueError("max_candles debe ser al menos 1")
+    
+    starts = np.unique(np.linspace(0, len(data), max_candles, endpoint=False).astype(np.intp))
+    ends = np.append(starts[1:], len(data)) - 1
+    columns = {
+        'open': data['open'].to_numpy()[starts],
+        'high': np.fmax.reduceat(data['high'].to_numpy(), starts),
+        'low': np.fmin.reduceat(data['low'].to_numpy(), starts),
+        'close': data['close'].to_numpy()[ends],
+    }
+    if 'volume' in data.columns:
+        columns['volume'] = np.add.reduceat(data['volume'].to_numpy(), starts)
+    return pd.DataFrame(columns, index=data.index[starts])
+
+
+def line_trace_class(n_points: int) -> type:
+    """go.Scattergl para series largas (un único dibujo WebGL) y go.Scatter para el resto"""
+    return go.Scattergl if n_points > WEBGL_MIN_POINTS else go.Scatter
+
+
+def _subplot_axes(row: int) -> Dict[str, str]:
+    """Ejes de la fila `row` en una grilla de make_subplots de una columna"""
+    suffix = str(row) if row > 1 else ''
+    return {'xaxis': 'x' + suffix, 'yaxis': 'y' + suffix}
+
+
+def subplot_axes(fig: go.Figure, row: int, col: int) -> Dict[str, str]:
+    """Referencias de ejes ('x2', 'y2', ...) de la celda (row, col) de un make_subplots"""
+    subplot = fig.get_subplot(row, col)
+    # El ancla de cada eje es el eje opuesto de la misma celda
+    return {'xaxis': subplot.yaxis.anchor, 'yaxis': subplot.xaxis.anchor}
+
+
+def with_traces(fig: go.Figure, traces: List) -> go.Figure:
+    """
+    Copia de fig con las trazas agregadas al final, sin revalidarlas
+    
+    add_trace valida cada traza elemento a elemento (con 100k barras, sólo las
+    listas de colores cuestan segundos); las trazas de este módulo se arman con
+    valores conocidos y llevan sus ejes de subplot, así que se agregan de una vez.
+    """
+    return go.Figure({'data': fig.data + tuple(traces), 'layout': fig.layout,
+                      '_grid_str': fig._grid_str, '_grid_ref': fig._grid_ref}, _validate=False)
+
+
+def with_annotations(fig: go.Figure, annotations: List[Dict]) -> go.Figure:
+    """
+    Copia de fig con las anotaciones agregadas al layout, sin revalidarlas
+
+    Igual que con with_traces: update_layout valida cada anotación (unos 0.2 ms
+    por cada una, segundos con miles de señales) aunque se armen con valores conocidos.
+    """
+    layout = fig.layout.to_plotly_json()
+    layout['annotations'] = list(layout.get('annotations', ())) + list(annotations)
+    return go.Figure({'data': fig.data, 'layout': layout,
+                      '_grid_str': fig._grid_str, '_grid_ref': fig._grid_ref}, _validate=False)
+
+
+@lru_cache(maxsize=32)
+def _figure_skeleton(titles: Tuple[str, ...], heights: Tuple[float, ...], title: str,
+                     text_color: str, background: str, paper: str,
+                     layout_json: str) -> go.Figure:
+    """
+    Subplots y tema de una topología (filas, títulos, alturas) y estilo dados
+    
+    Los barridos repiten la misma combinación de indicadores con datos distintos:
+    make_subplots y el tema se arman una vez por combinación y se copian.
+    layout_json es el layout_config de la configuración serializado, de modo que
+    forma parte de la clave. No se modifica: _create_figure_structure entrega copias.
+    """
+    # El layout lo arma este módulo con valores conocidos: sus updates no se
+    # validan (las trazas se agregan con with_traces)
+    fig = go.Figure(sp.make_subplots(
+        rows=len(titles),
+        cols=1,
+        subplot_titles=titles,
+        vertical_spacing=0.03,
+        row_heights=heights,
+        shared_xaxes=True
+    ), _validate=False)
+    
+    # Configurar tema base
+    fig.update_layout(
+        title=dict(
+            text=title,
+            x=0.5,
+            font=dict(size=22, weight='bold', color=text_color)
+        ),
+        plot_bgcolor=background,
+        paper_bgcolor=paper,
+        **json.loads(layout_json)
+    )
+    
+    return fig
+
+
+def _freeze(value: Any) -> Any:
+    """Copia de sólo lectura de dicts anidados (MappingProxyType en cada nivel)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Copia mutable (dicts planos, como los espera plotly) de una estructura congelada"""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    return value
+
+
+def _hex_to_rgba(hex_color: str, alpha: float) -> str:
+    """Convierte '#RRGGBB' a 'rgba(r, g, b, alpha)'"""
+    return (f"rgba({int(hex_color[1:3], 16)}, {int(hex_color[3:5], 16)}, "
+            f"{int(hex_color[5:7], 16)}, {alpha})")
 
 
 class ChartConfig:
     """Configuración avanzada para gráficos de trading"""
     
+    __slots__ = ('colors', 'layout_config', 'markers')
+    
+    # Colores del tema claro profesional (cada instancia recibe su copia en colors)
+    DEFAULT_COLORS = {
+        'background': '#FFFFFF',
+        'paper': '#FAFAFA', 
+        'text': '#2E2E2E',
+        'grid': '#E0E0E0',
+        'candle_up': '#00C896',
+        'candle_down': '#FF4B4B',
+        'volume_up': 'rgba(0, 200, 150, 0.6)',
+        'volume_down': 'rgba(255, 75, 75, 0.6)',
+        'long_entry': '#00C853',
+        'long_exit': '#2E7D32',
+        'short_entry': '#D32F2F',
+        'short_exit': '#F57C00',
+        'profit_line': '#2E7D32',
+        'loss_line': '#D32F2F',
+        'ema_fast': '#FF9800',
+        'ema_slow': '#2196F3',
+        'ema_trend': '#E91E63',
+        'rsi': '#9C27B0',
+        'macd': '#FF5722',
+        'macd_signal': '#3F51B5',
+        'macd_hist': '#4CAF50',
+        'bb': '#673AB7',
+        'support': '#FFC107',
+        'resistance': '#F44336'
+    }
+    # Variantes con transparencia, calculadas una vez
+    DEFAULT_COLORS['bb_fill'] = _hex_to_rgba(DEFAULT_COLORS['bb'], 0.1)
+    
+    # Configuración de layout por defecto (congelada en todos sus niveles; cada
+    # instancia recibe su copia mutable en layout_config)
+    DEFAULT_LAYOUT_CONFIG = _freeze({
+        'height': 900,
+        'margin': dict(l=80, r=80, t=100, b=80),
+        'font': dict(family="Roboto, Arial, sans-serif", size=12, color=DEFAULT_COLORS['text']),
+        'hovermode': 'x unified',
+        'dragmode': 'zoom',
+        'showlegend': True,
+        'legend': dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5,
+            bgcolor="rgba(255,255,255,0.95)",
+            bordercolor="rgba(46,46,46,0.2)",
+            borderwidth=1,
+            font=dict(size=11)
+        ),
+        'xaxis': dict(
+            gridcolor=DEFAULT_COLORS['grid'],
+            gridwidth=1,
+            showgrid=True,
+            zeroline=False,
+            rangeslider=dict(visible=False)
+        ),
+        'yaxis': dict(
+            gridcolor=DEFAULT_COLORS['grid'],
+            gridwidth=1,
+            showgrid=True,
+            zeroline=False
+        )
+    })
+    
+    # Configuración de marcadores por defecto (congelada; cada instancia recibe su copia en markers)
+    DEFAULT_MARKERS = _freeze({
+        'long_entry': dict(symbol='triangle-up', size=20, line=dict(width=3, color='#2E7D32')),
+        'long_exit': dict(symbol='triangle-down', size=16, line=dict(width=2, color='#1B5E20')),
+        'short_entry': dict(symbol='triangle-down', size=20, line=dict(width=3, color='#C62828')),
+        'short_exit': dict(symbol='triangle-up', size=16, line=dict(width=2, color='#E65100'))
+    })
+    
     def __init__(self):
-        # Colores del tema claro profesional
-        self.colors = {
-            'background': '#FFFFFF',
-            'paper': '#FAFAFA', 
-            'text': '#2E2E2E',
-            'grid': '#E0E0E0',
-            'candle_up': '#00C896',
-            'candle_down': '#FF4B4B',
-            'volume_up': 'rgba(0, 200, 150, 0.6)',
-            'volume_down': 'rgba(255, 75, 75, 0.6)',
-            'long_entry': '#00C853',
-            'long_exit': '#2E7D32',
-            'short_entry': '#D32F2F',
-            'short_exit': '#F57C00',
-            'profit_line': '#2E7D32',
-            'loss_line': '#D32F2F',
-            'ema_fast': '#FF9800',
-            'ema_slow': '#2196F3',
-            'ema_trend': '#E91E63',
-            'rsi': '#9C27B0',
-            'macd': '#FF5722',
-            'macd_signal': '#3F51B5',
-            'macd_hist': '#4CAF50',
-            'bb': '#673AB7',
-            'support': '#FFC107',
-            'resistance': '#F44336'
-        }
-        
-        # Configuración de layout
-        self.layout_config = {
-            'height': 900,
-            'margin': dict(l=80, r=80, t=100, b=80),
-            'font': dict(family="Roboto, Arial, sans-serif", size=12, color=self.colors['text']),
-            'hovermode': 'x unified',
-            'dragmode': 'zoom',
-            'showlegend': True,
-            'legend': dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="center",
-                x=0.5,
-                bgcolor="rgba(255,255,255,0.95)",
-                bordercolor="rgba(46,46,46,0.2)",
-                borderwidth=1,
-                font=dict(size=11)
-            ),
-            'xaxis': dict(
-                gridcolor=self.colors['grid'],
-                gridwidth=1,
-                showgrid=True,
-                zeroline=False,
-                rangeslider=dict(visible=False)
-            ),
-            'yaxis': dict(
-                gridcolor=self.colors['grid'],
-                gridwidth=1,
-                showgrid=True,
-                zeroline=False
-            )
-        }
-        
-        # Configuración de marcadores
-        self.markers = {
-            'long_entry': dict(symbol='triangle-up', size=20, line=dict(width=3, color='#2E7D32')),
-            'long_exit': dict(symbol='triangle-down', size=16, line=dict(width=2, color='#1B5E20')),
-            'short_entry': dict(symbol='triangle-down', size=20, line=dict(width=3, color='#C62828')),
-            'short_exit': dict(symbol='triangle-up', size=16, line=dict(width=2, color='#E65100'))
-        }
+        self.colors = dict(self.DEFAULT_COLORS)
+        self.layout_config = _thaw(self.DEFAULT_LAYOUT_CONFIG)
+        self.markers = _thaw(self.DEFAULT_MARKERS)
 
 
 class AdvancedChartGenerator:
@@ -91,16 +292,17 @@ class AdvancedChartGenerator:
     def __init__(self, config: Optional[ChartConfig] = None):
         self.config = config or ChartConfig()
     
-    def create_professional_trading_chart(self, 
-                                        data: pd.DataFrame, 
-                                        trades: List[Trade],
-                                        indicators: Optional[Dict] = None,
-                                        symbol: str = "CRYPTO",
-                                        timeframe: str = "1h",
-                                        show_volume: bool = True,
-                                        show_trade_lines: bool = True,
-                                        show_levels: bool = True,
-                                        chart_style: str = "professional") -> go.Figure:
+    def create_professional_trading_chart(self,
+                                          data: pd.DataFrame,
+                                          trades: List[Trade],
+                                          indicators: Optional[Dict] = None,
+                                          symbol: str = "CRYPTO",
+                                          timeframe: str = "1h",
+                                          show_volume: bool = True,
+                                          show_trade_lines: bool = True,
+                                          show_levels: bool = True,
+                                          chart_style: str = "professional",
+                                          max_candles: Optional[int] = None) -> go.Figure:
         """
         Crea un gráfico de trading profesional con control total
         
@@ -114,37 +316,69 @@ class AdvancedChartGenerator:
             show_trade_lines: Mostrar líneas de trades
             show_levels: Mostrar niveles de soporte/resistencia
             chart_style: Estilo del gráfico ('professional', 'minimal', 'detailed')
+            max_candles: Si se indica y hay más velas, el precio y el volumen se agregan
+                en como máximo max_candles velas (M4); indicadores, señales y niveles
+                siguen usando todas las velas
         """
         
         # 1. Preparar estructura de subplots
         subplot_config = self._calculate_subplot_layout(indicators, show_volume)
         
-        # 2. Crear figura con subplots
-        fig = self._create_figure_structure(subplot_config, symbol, timeframe)
-        
-        # 3. Agregar candlesticks principales
-        self._add_main_candlesticks(fig, data)
+        # 2. Figura base: estructura, candlesticks, volumen y niveles. Sólo depende
+        #    de los precios, así que se reutiliza entre llamadas (barridos)
+        fig = self._get_base_figure(data, subplot_config, symbol, timeframe,
+                                    show_volume, show_levels, max_candles)
         
-        # 4. Agregar indicadores técnicos
+        # 3. Agregar indicadores técnicos
+        traces = []
         if indicators:
-            self._add_all_indicators(fig, data, indicators, subplot_config)
+            self._add_all_indicators(fig, traces, data, indicators, subplot_config)
         
-        # 5. Agregar volumen si se solicita
-        if show_volume and 'volume' in data.columns:
-            self._add_volume_analysis(fig, data, subplot_config.get('volume_row'))
+        # 4. Agregar señales de trading detalladas
+        self._add_detailed_trading_signals(traces, trades, show_trade_lines)
+        fig = with_traces(fig, traces)
         
-        # 6. Agregar señales de trading detalladas
-        self._add_detailed_trading_signals(fig, trades, show_trade_lines)
-        
-        # 7. Agregar niveles técnicos
-        if show_levels:
-            self._add_technical_levels(fig, data)
-        
-        # 8. Configurar layout final
+        # 5. Configurar layout final
         self._apply_final_styling(fig, trades, data, chart_style, subplot_config)
         
         return fig
     
+    def _get_base_figure(self, data: pd.DataFrame, subplot_config: Dict, symbol: str,
+                         timeframe: str, show_volume: bool, show_levels: bool,
+                         max_candles: Optional[int] = None) -> go.Figure:
+        """
+        Copia de la figura con las capas que sólo dependen de los precios
+        
+        La figura se arma una vez por combinación de datos, subplots, estilo y
+        opciones, y se guarda en una caché LRU; cada llamada recibe su propia copia.
+        """
+        if max_candles is not None and len(data) <= max_candles:
+            max_candles = None
+        key = (data_fingerprint(data), symbol, timeframe, show_volume, show_levels, max_candles,
+               tuple(subplot_config['titles']), tuple(subplot_config['heights']),
+               subplot_config['volume_row'], tuple(self.config.colors.items()),
+               self._layout_json())
+        base = _base_figure_cache.get(key)
+        if base is not None:
+            _base_figure_cache.move_to_end(key)
+        else:
+            base = self._create_figure_structure(subplot_config, symbol, timeframe)
+            candles = data if max_candles is None else downsample_ohlcv(data, max_candles)
+            traces = []
+            self._add_main_candlesticks(traces, candles)
+            if show_volume and 'volume' in data.columns:
+                self._add_volume_analysis(base, traces, candles, subplot_config.get('volume_row'))
+            base = with_traces(base, traces)
+            if show_levels:
+                self._add_technical_levels(base, data)
+            
+            _base_figure_cache[key] = base
+            if len(_base_figure_cache) > BASE_FIGURE_CACHE_SIZE:
+                _base_figure_cache.popitem(last=False)
+        
+        # La copia sin validación sólo duplica las propiedades ya validadas
+        return go.Figure(base, _validate=False)
+    
     def _calculate_subplot_layout(self, indicators: Optional[Dict], show_volume: bool) -> Dict[str, Any]:
         """Calcula la disposición óptima de subplots"""
         layout = {
@@ -177,7 +411,7 @@ class AdvancedChartGenerator:
             self._adjust_heights(layout, 'rsi')
         
         # MACD  
-        if indicators and any(k in ['macd', 'macd_signal', 'macd_histogram'] for k in indicators.keys()):
+        if indicators and not _MACD_KEYS.isdisjoint(indicators):
             current_row += 1
             layout['macd_row'] = current_row
             layout['total_rows'] = current_row
@@ -201,40 +435,29 @@ class AdvancedChartGenerator:
             layout['heights'] = [0.45] + [0.55 / total_indicators] * total_indicators
     
     def _create_figure_structure(self, config: Dict, symbol: str, timeframe: str) -> go.Figure:
-        """Crea la estructura base de la figura"""
+        """Crea la estructura base de la figura (copia del esqueleto de su topología)"""
         title = f"⚡ {symbol} ({timeframe.upper()}) - Análisis Profesional de Trading"
-        
-        fig = sp.make_subplots(
-            rows=config['total_rows'],
-            cols=1,
-            subplot_titles=config['titles'],
-            vertical_spacing=0.03,
-            row_heights=config['heights'],
-            shared_xaxes=True
-        )
-        
-        # Configurar tema base
-        fig.update_layout(
-            title=dict(
-                text=title,
-                x=0.5,
-                font=dict(size=22, weight='bold', color=self.config.colors['text'])
-            ),
-            plot_bgcolor=self.config.colors['background'],
-            paper_bgcolor=self.config.colors['paper'],
-            **self.config.layout_config
-        )
-        
-        return fig
+        colors = self.config.colors
+        skeleton = _figure_skeleton(tuple(config['titles']), tuple(config['heights']), title,
+                                    colors['text'], colors['background'], colors['paper'],
+                                    self._layout_json())
+        return go.Figure(skeleton, _validate=False)
+    
+    def _layout_json(self) -> str:
+        """layout_config de la configuración serializado (clave de las cachés de figuras)"""
+        return json.dumps(self.config.layout_config, sort_keys=True, default=dict)
     
-    def _add_main_candlesticks(self, fig: go.Figure, data: pd.DataFrame):
+    def _add_main_candlesticks(self, traces: List, data: pd.DataFrame):
         """Agrega candlesticks con estilo profesional"""
-        fig.add_trace(go.Candlestick(
+        # Arrays de NumPy una vez; plotly los serializa sin pasar por pandas
+        open_, high, low, close = (compact_floats(data[column]) for column in _OHLC)
+        
+        traces.append(go.Candlestick(
             x=data.index,
-            open=data['open'],
-            high=data['high'],
-            low=data['low'],
-            close=data['close'],
+            open=open_,
+            high=high,
+            low=low,
+            close=close,
             name="💰 Precio",
             increasing_line_color=self.config.colors['candle_up'],
             decreasing_line_color=self.config.colors['candle_down'],
@@ -242,14 +465,12 @@ class AdvancedChartGenerator:
             decreasing_fillcolor=self.config.colors['candle_down'],
             line=dict(width=1.2),
             showlegend=True,
-            text=[f'📅 {idx}<br>� Open: ${row["open"]:,.4f}<br>⬆️ High: ${row["high"]:,.4f}<br>⬇️ Low: ${row["low"]:,.4f}<br>🔒 Close: ${row["close"]:,.4f}'
-                  for idx, row in data.iterrows()],
-            hovertext=[f'� {idx}<br>�🔓 Open: ${row["open"]:,.4f}<br>⬆️ High: ${row["high"]:,.4f}<br>⬇️ Low: ${row["low"]:,.4f}<br>🔒 Close: ${row["close"]:,.4f}'
-                      for idx, row in data.iterrows()],
-            hoverinfo='text'
-        ), row=1, col=1)
+            hovertemplate=_CANDLE_HOVERTEMPLATE,
+            **_subplot_axes(1),
+            _validate=False
+        ))
     
-    def _add_all_indicators(self, fig: go.Figure, data: pd.DataFrame, 
+    def _add_all_indicators(self, fig: go.Figure, traces: List, data: pd.DataFrame, 
                            indicators: Dict, config: Dict):
         """Agrega todos los indicadores técnicos con estilo mejorado"""
         
@@ -264,9 +485,9 @@ class AdvancedChartGenerator:
         
         for key, values in indicators.items():
             if 'ema' in key.lower() and values is not None:
-                fig.add_trace(go.Scatter(
+                traces.append(go.Scatter(
                     x=data.index,
-                    y=values,
+                    y=compact_floats(values),
                     mode='lines',
                     name=f"📊 {key.upper().replace('_', ' ')}",
                     line=dict(
@@ -274,274 +495,262 @@ class AdvancedChartGenerator:
                         width=2.5 if '200' in key else 2
                     ),
                     opacity=0.9,
-                    hovertemplate=f'<b>{key.upper()}</b><br>Valor: %{{y:,.4f}}<extra></extra>'
-                ), row=1, col=1)
+                    hovertemplate=f'<b>{key.upper()}</b><br>Valor: %{{y:,.4f}}<extra></extra>',
+                    **_subplot_axes(1),
+                    _validate=False
+                ))
         
         # Bollinger Bands
         if 'bb_upper' in indicators and 'bb_lower' in indicators:
             # Banda superior
-            fig.add_trace(go.Scatter(
+            traces.append(go.Scatter(
                 x=data.index,
-                y=indicators['bb_upper'],
+                y=compact_floats(indicators['bb_upper']),
                 mode='lines',
                 name='📈 BB Superior',
                 line=dict(color=self.config.colors['bb'], width=1, dash='dash'),
                 opacity=0.7,
-                showlegend=True
-            ), row=1, col=1)
+                showlegend=True,
+                **_subplot_axes(1),
+                _validate=False
+            ))
             
             # Banda inferior con relleno
-            fig.add_trace(go.Scatter(
+            traces.append(go.Scatter(
                 x=data.index,
-                y=indicators['bb_lower'],
+                y=compact_floats(indicators['bb_lower']),
                 mode='lines',
                 name='📉 BB Inferior',
                 line=dict(color=self.config.colors['bb'], width=1, dash='dash'),
                 fill='tonexty',
-                fillcolor=f"rgba({int(self.config.colors['bb'][1:3], 16)}, "
-                         f"{int(self.config.colors['bb'][3:5], 16)}, "
-                         f"{int(self.config.colors['bb'][5:7], 16)}, 0.1)",
-                opacity=0.7
-            ), row=1, col=1)
+                fillcolor=self.config.colors['bb_fill'],
+                opacity=0.7,
+                **_subplot_axes(1),
+                _validate=False
+            ))
         
         # RSI en subplot dedicado
         if config.get('rsi_row') and 'rsi' in indicators:
-            fig.add_trace(go.Scatter(
+            traces.append(go.Scatter(
                 x=data.index,
-                y=indicators['rsi'],
+                y=compact_floats(indicators['rsi'], decimals=2),
                 mode='lines',
                 name='📊 RSI',
                 line=dict(color=self.config.colors['rsi'], width=2.5),
-                hovertemplate='<b>RSI</b><br>Valor: %{y:.2f}<extra></extra>'
-            ), row=config['rsi_row'], col=1)
+                hovertemplate='<b>RSI</b><br>Valor: %{y:.2f}<extra></extra>',
+                **_subplot_axes(config['rsi_row']),
+                _validate=False
+            ))
             
-            # Líneas de referencia RSI
+            # Líneas de referencia RSI (la traza se agrega al final, así que la
+            # fila todavía figura vacía)
             fig.add_hline(
                 y=70, line_dash="dash", line_color="rgba(255,75,75,0.8)",
                 annotation_text="⚠️ Sobrecompra (70)", annotation_position="right",
-                row=config['rsi_row'], col=1
+                row=config['rsi_row'], col=1, exclude_empty_subplots=False
             )
             fig.add_hline(
                 y=30, line_dash="dash", line_color="rgba(0,200,150,0.8)", 
                 annotation_text="💡 Sobreventa (30)", annotation_position="right",
-                row=config['rsi_row'], col=1
+                row=config['rsi_row'], col=1, exclude_empty_subplots=False
             )
             fig.add_hline(
                 y=50, line_dash="dot", line_color="rgba(46,46,46,0.4)",
-                row=config['rsi_row'], col=1
+                row=config['rsi_row'], col=1, exclude_empty_subplots=False
             )
             
             fig.update_yaxes(range=[0, 100], title_text="RSI", row=config['rsi_row'], col=1)
         
         # MACD en subplot dedicado
         if config.get('macd_row'):
-            self._add_macd_subplot(fig, data, indicators, config['macd_row'])
+            self._add_macd_subplot(fig, traces, data, indicators, config['macd_row'])
     
-    def _add_macd_subplot(self, fig: go.Figure, data: pd.DataFrame, 
+    def _add_macd_subplot(self, fig: go.Figure, traces: List, data: pd.DataFrame, 
                          indicators: Dict, macd_row: int):
         """Agrega subplot de MACD con histograma"""
         if 'macd' in indicators:
-            fig.add_trace(go.Scatter(
+            traces.append(go.Scatter(
                 x=data.index,
-                y=indicators['macd'],
+                y=compact_floats(indicators['macd']),
                 mode='lines',
                 name='📊 MACD',
-                line=dict(color=self.config.colors['macd'], width=2)
-            ), row=macd_row, col=1)
+                line=dict(color=self.config.colors['macd'], width=2),
+                **_subplot_axes(macd_row),
+                _validate=False
+            ))
         
         if 'macd_signal' in indicators:
-            fig.add_trace(go.Scatter(
+            traces.append(go.Scatter(
                 x=data.index,
-                y=indicators['macd_signal'],
+                y=compact_floats(indicators['macd_signal']),
                 mode='lines',
                 name='📈 Señal',
-                line=dict(color=self.config.colors['macd_signal'], width=2)
-            ), row=macd_row, col=1)
+                line=dict(color=self.config.colors['macd_signal'], width=2),
+                **_subplot_axes(macd_row),
+                _validate=False
+            ))
         
         if 'macd_histogram' in indicators:
-            colors = ['rgba(76,175,80,0.8)' if val >= 0 else 'rgba(244,67,54,0.8)' 
-                     for val in indicators['macd_histogram']]
+            histogram = np.asarray(indicators['macd_histogram'], dtype=np.float64)
+            colors = _pick_colors(histogram >= 0, 'rgba(76,175,80,0.8)', 'rgba(244,67,54,0.8)')
             
-            fig.add_trace(go.Bar(
+            traces.append(go.Bar(
                 x=data.index,
-                y=indicators['macd_histogram'],
+                y=compact_floats(histogram),
                 name='📊 Histograma',
                 marker_color=colors,
-                opacity=0.7
-            ), row=macd_row, col=1)
+                opacity=0.7,
+                **_subplot_axes(macd_row),
+                _validate=False
+            ))
         
-        fig.add_hline(y=0, line_color="rgba(46,46,46,0.5)", line_width=1, 
-                     row=macd_row, col=1)
+        fig.add_hline(y=0, line_color="rgba(46,46,46,0.5)", line_width=1,
+                      row=macd_row, col=1, exclude_empty_subplots=False)
         fig.update_yaxes(title_text="MACD", row=macd_row, col=1)
     
-    def _add_volume_analysis(self, fig: go.Figure, data: pd.DataFrame, volume_row: Optional[int]):
+    def _add_volume_analysis(self, fig: go.Figure, traces: List, data: pd.DataFrame,
+                             volume_row: Optional[int]):
         """Agrega análisis de volumen avanzado"""
         if volume_row is None:
             return
         
-        # Colores según la dirección del precio
-        colors = []
-        for i in range(len(data)):
-            if data.iloc[i]['close'] >= data.iloc[i]['open']:
-                colors.append(self.config.colors['volume_up'])
-            else:
-                colors.append(self.config.colors['volume_down'])
+        # Colores según la dirección del precio (una comparación sobre todo el array)
+        up = data['close'].to_numpy() >= data['open'].to_numpy()
+        colors = _pick_colors(up, self.config.colors['volume_up'],
+                              self.config.colors['volume_down'])
         
-        fig.add_trace(go.Bar(
+        volume = data['volume'].to_numpy()
+        traces.append(go.Bar(
             x=data.index,
-            y=data['volume'],
+            y=compact_floats(volume, decimals=0),
             name='📊 Volumen',
             marker_color=colors,
             opacity=0.8,
             hovertemplate='<b>📊 Volumen</b><br>' +
                          'Fecha: %{x}<br>' +
                          'Volumen: %{y:,.0f}<br>' +
-                         '<extra></extra>'
-        ), row=volume_row, col=1)
+                         '<extra></extra>',
+            **_subplot_axes(volume_row),
+            _validate=False
+        ))
         
         # Agregar línea de promedio móvil del volumen
         if len(data) > 20:
-            vol_ma = data['volume'].rolling(20).mean()
-            fig.add_trace(go.Scatter(
+            vol_ma = rolling_mean_nb(volume.astype(np.float64, copy=False), 20)
+            traces.append(go.Scatter(
                 x=data.index,
-                y=vol_ma,
+                y=compact_floats(vol_ma),
                 mode='lines',
                 name='📈 Vol MA(20)',
                 line=dict(color='rgba(46,46,46,0.7)', width=1.5, dash='dash'),
-                opacity=0.8
-            ), row=volume_row, col=1)
+                opacity=0.8,
+                **_subplot_axes(volume_row),
+                _validate=False
+            ))
         
         fig.update_yaxes(title_text="Volumen", row=volume_row, col=1)
     
-    def _add_detailed_trading_signals(self, fig: go.Figure, trades: List[Trade], 
+    def _add_detailed_trading_signals(self, traces: List, trades: List[Trade], 
                                     show_trade_lines: bool):
         """Agrega señales de trading con máximo detalle"""
         
-        # Separar trades por tipo y resultado
-        long_entries, long_exits = [], []
-        short_entries, short_exits = [], []
-        profitable_trades, losing_trades = [], []
-        
+        # Una pasada: cada punto con su categoría (índice en _SIGNAL_MARKERS)
+        n_points = 2 * len(trades)
+        times = np.empty(n_points, dtype=object)
+        prices = np.empty(n_points, dtype=np.float64)
+        categories = np.empty(n_points, dtype=np.int8)
+        k = 0
         for trade in trades:
-            entry_point = (trade.entry_time, trade.entry_price)
-            exit_point = (trade.exit_time, trade.exit_price) if trade.exit_time else None
-            
-            if trade.side.lower() == 'long':
-                long_entries.append(entry_point)
-                if exit_point:
-                    long_exits.append(exit_point)
-            else:
-                short_entries.append(entry_point)  
-                if exit_point:
-                    short_exits.append(exit_point)
-            
-            # Clasificar por rentabilidad
-            if trade.pnl > 0:
-                profitable_trades.append(trade)
-            else:
-                losing_trades.append(trade)
-        
-        # Señales LONG
-        if long_entries:
-            fig.add_trace(go.Scatter(
-                x=[entry[0] for entry in long_entries],
-                y=[entry[1] for entry in long_entries],
+            base = _LONG_ENTRY if trade.side.lower() == 'long' else _SHORT_ENTRY
+            times[k] = trade.entry_time
+            prices[k] = trade.entry_price
+            categories[k] = base
+            k += 1
+            if trade.exit_time:
+                times[k] = trade.exit_time
+                prices[k] = np.nan if trade.exit_price is None else trade.exit_price
+                categories[k] = base + 1
+                k += 1
+        times, prices, categories = times[:k], prices[:k], categories[:k]
+        
+        # Señales LONG y SHORT (entradas y salidas)
+        for category, (marker_key, name, label) in enumerate(_SIGNAL_MARKERS):
+            mask = categories == category
+            if not mask.any():
+                continue
+            traces.append(go.Scatter(
+                x=times[mask].tolist(),
+                y=prices[mask],
                 mode='markers',
                 marker=dict(
-                    color=self.config.colors['long_entry'],
-                    **self.config.markers['long_entry']
+                    color=self.config.colors[marker_key],
+                    **self.config.markers[marker_key]
                 ),
-                name='🚀 Long Entry',
-                hovertemplate='<b>🟢 LONG ENTRY</b><br>' +
-                             '📅 %{x}<br>' +
-                             '💰 $%{y:,.4f}<br>' +
-                             '<extra></extra>'
-            ), row=1, col=1)
-        
-        if long_exits:
-            fig.add_trace(go.Scatter(
-                x=[exit[0] for exit in long_exits],
-                y=[exit[1] for exit in long_exits],
-                mode='markers',
-                marker=dict(
-                    color=self.config.colors['long_exit'],
-                    **self.config.markers['long_exit']
-                ),
-                name='🔻 Long Exit',
-                hovertemplate='<b>🔴 LONG EXIT</b><br>' +
-                             '📅 %{x}<br>' +
-                             '💰 $%{y:,.4f}<br>' +
-                             '<extra></extra>'
-            ), row=1, col=1)
-        
-        # Señales SHORT
-        if short_entries:
-            fig.add_trace(go.Scatter(
-                x=[entry[0] for entry in short_entries],
-                y=[entry[1] for entry in short_entries],
-                mode='markers',
-                marker=dict(
-                    color=self.config.colors['short_entry'],
-                    **self.config.markers['short_entry']
-                ),
-                name='🔻 Short Entry',
-                hovertemplate='<b>🔴 SHORT ENTRY</b><br>' +
-                             '📅 %{x}<br>' +
-                             '💰 $%{y:,.4f}<br>' +
-                             '<extra></extra>'
-            ), row=1, col=1)
-        
-        if short_exits:
-            fig.add_trace(go.Scatter(
-                x=[exit[0] for exit in short_exits],
-                y=[exit[1] for exit in short_exits],
-                mode='markers',
-                marker=dict(
-                    color=self.config.colors['short_exit'],
-                    **self.config.markers['short_exit']
-                ),
-                name='🚀 Short Exit',
-                hovertemplate='<b>🟢 SHORT EXIT</b><br>' +
-                             '📅 %{x}<br>' +
-                             '💰 $%{y:,.4f}<br>' +
-                             '<extra></extra>'
-            ), row=1, col=1)
+                name=name,
+                hovertemplate=(f'<b>{label}</b><br>'
+                               + '📅 %{x}<br>'
+                               + '💰 $%{y:,.4f}<br>'
+                               + '<extra></extra>'),
+                **_subplot_axes(1),
+                _validate=False
+            ))
         
         # Líneas de conexión de trades
         if show_trade_lines:
-            for trade in trades:
-                if trade.exit_time and trade.exit_price:
-                    # Estilo según rentabilidad
-                    line_color = self.config.colors['profit_line'] if trade.pnl > 0 else self.config.colors['loss_line']
-                    line_width = 3 if abs(trade.pnl) > 50 else 2
-                    line_dash = 'solid' if trade.pnl > 0 else 'dot'
-                    
-                    # Calcular retorno porcentual
-                    return_pct = (trade.pnl / trade.entry_price) * 100 if trade.entry_price > 0 else 0
-                    
-                    fig.add_trace(go.Scatter(
-                        x=[trade.entry_time, trade.exit_time],
-                        y=[trade.entry_price, trade.exit_price],
-                        mode='lines',
-                        line=dict(color=line_color, width=line_width, dash=line_dash),
-                        opacity=0.7,
-                        showlegend=False,
-                        hovertemplate=f'<b>{trade.side.upper()} TRADE</b><br>' +
-                                     f'💰 P&L: ${trade.pnl:,.2f}<br>' +
-                                     f'📊 Return: {return_pct:.2f}%<br>' +
-                                     f'⏱️ Duración: {trade.exit_time - trade.entry_time}<br>' +
-                                     '<extra></extra>'
-                    ), row=1, col=1)
+            self._add_trade_lines(traces, trades)
+    
+    def _add_trade_lines(self, traces: List, trades: List[Trade]):
+        """
+        Une entrada y salida de cada trade cerrado
+        
+        Los segmentos con el mismo estilo (rentabilidad y grosor) van en una sola
+        traza separados por None, en lugar de una traza por trade.
+        """
+        segments: Dict[Tuple[bool, int], Tuple[list, list, list]] = {}
+        for trade in trades:
+            if trade.exit_time and trade.exit_price:
+                # Calcular retorno porcentual
+                return_pct = (trade.pnl / trade.entry_price) * 100 if trade.entry_price > 0 else 0
+                hover = (f'<b>{trade.side.upper()} TRADE</b><br>'
+                         f'💰 P&L: ${trade.pnl:,.2f}<br>'
+                         f'📊 Return: {return_pct:.2f}%<br>'
+                         f'⏱️ Duración: {trade.exit_time - trade.entry_time}<br>')
+                
+                style = (trade.pnl > 0, 3 if abs(trade.pnl) > 50 else 2)
+                if style not in segments:
+                    segments[style] = ([], [], [])
+                xs, ys, hovers = segments[style]
+                xs += (trade.entry_time, trade.exit_time, None)
+                ys += (trade.entry_price, trade.exit_price, None)
+                hovers += (hover, hover, None)
+        
+        for (profitable, line_width), (xs, ys, hovers) in segments.items():
+            # Estilo según rentabilidad
+            line_color = self.config.colors['profit_line' if profitable else 'loss_line']
+            line_dash = 'solid' if profitable else 'dot'
+            traces.append(go.Scatter(
+                x=xs,
+                y=ys,
+                mode='lines',
+                line=dict(color=line_color, width=line_width, dash=line_dash),
+                opacity=0.7,
+                showlegend=False,
+                connectgaps=False,
+                customdata=hovers,
+                hovertemplate='%{customdata}<extra></extra>',
+                **_subplot_axes(1),
+                _validate=False
+            ))
     
     def _add_technical_levels(self, fig: go.Figure, data: pd.DataFrame):
         """Agrega niveles de soporte y resistencia"""
         if len(data) < 50:
             return
         
-        # Calcular niveles de soporte y resistencia básicos
-        recent_data = data.tail(50)
-        resistance = recent_data['high'].max()
-        support = recent_data['low'].min()
+        # Calcular niveles de soporte y resistencia básicos (últimas 50 velas);
+        # fmax/fmin ignoran los NaN como pandas, sin copiar el DataFrame
+        resistance = np.fmax.reduce(data['high'].to_numpy()[-50:])
+        support = np.fmin.reduce(data['low'].to_numpy()[-50:])
         
         # Agregar líneas horizontales
         fig.add_hline(
@@ -569,9 +778,15 @@ class AdvancedChartGenerator:
         """Aplica el estilo final al gráfico"""
         
         # Calcular estadísticas para el título
+        # Una sola pasada (la suma sigue el mismo orden que sum())
         total_trades = len(trades)
-        winning_trades = sum(1 for t in trades if t.pnl > 0)
-        total_pnl = sum(t.pnl for t in trades)
+        winning_trades = 0
+        total_pnl = 0
+        for trade in trades:
+            pnl = trade.pnl
+            total_pnl += pnl
+            if pnl > 0:
+                winning_trades += 1
         win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
         
         # Actualizar título con métricas
@@ -580,34 +795,22 @@ class AdvancedChartGenerator:
                       f"💰 ${total_pnl:,.2f} P&L")
         
         current_title = fig.layout.title.text
-        fig.update_layout(title_text=current_title + title_stats)
         
-        # Configurar grid y ejes para todos los subplots
+        # Grid de todos los subplots (fila i -> xaxis{i}/yaxis{i}, la 1 sin sufijo)
         total_rows = subplot_config.get('total_rows', 1)
-        
+        grid = dict(gridcolor=self.config.colors['grid'], gridwidth=0.5, showgrid=True)
+        axes = {}
         for i in range(1, total_rows + 1):
-            fig.update_xaxes(
-                gridcolor=self.config.colors['grid'],
-                gridwidth=0.5,
-                showgrid=True,
-                row=i, col=1
-            )
-            fig.update_yaxes(
-                gridcolor=self.config.colors['grid'],
-                gridwidth=0.5,
-                showgrid=True,
-                row=i, col=1
-            )
+            suffix = str(i) if i > 1 else ''
+            axes['xaxis' + suffix] = grid
+            axes['yaxis' + suffix] = grid
         
-        # Configurar zoom y interactividad
+        # Título, ejes, zoom/interactividad y botones en un único update
         fig.update_layout(
-            xaxis_rangeslider_visible=False,
+            title_text=current_title + title_stats,
+            **axes,
             hovermode='x unified',
-            dragmode='zoom'
-        )
-        
-        # Agregar botones de control
-        fig.update_layout(
+            dragmode='zoom',
             updatemenus=[
                 dict(
                     type="buttons",
@@ -636,14 +839,17 @@ class AdvancedChartGenerator:
         )
 
 
+# Generador de las funciones de compatibilidad: sólo lee su configuración
+_DEFAULT_GENERATOR = AdvancedChartGenerator()
+
+
 # Función de compatibilidad con la API existente
 def plot_trading_signals_advanced(data: pd.DataFrame, trades: List[Trade], 
                                 indicators: Optional[Dict] = None,
                                 symbol: str = "CRYPTO", 
                                 title: Optional[str] = None) -> go.Figure:
     """Función de compatibilidad que usa el nuevo generador avanzado"""
-    generator = AdvancedChartGenerator()
-    return generator.create_professional_trading_chart(
+    return _DEFAULT_GENERATOR.create_professional_trading_chart(
         data=data,
         trades=trades,
         indicators=indicators,
@@ -657,25 +863,25 @@ def plot_trading_signals_advanced(data: pd.DataFrame, trades: List[Trade],
 
 def plot_trade_analysis(results: BacktestResults, data: pd.DataFrame) -> go.Figure:
     """Gráfico de análisis de rendimiento mejorado"""
-    generator = AdvancedChartGenerator()
-    
     # Crear gráfico simple de rendimiento
-    fig = go.Figure()
+    fig = go.Figure(_validate=False)
     
-    # Equity curve
-    fig.add_trace(go.Scatter(
-        x=list(range(len(results.trades))),
-        y=[sum(t.pnl for t in results.trades[:i+1]) for i in range(len(results.trades))],
+    # Equity curve: P&L acumulado en O(N) (mismo orden de sumas que sum())
+    pnls = np.fromiter((t.pnl for t in results.trades), dtype=np.float64, count=len(results.trades))
+    fig.add_trace(line_trace_class(len(pnls))(
+        x=np.arange(len(pnls)),
+        y=np.cumsum(pnls),
         mode='lines+markers',
         name='💰 Equity Curve',
         line=dict(color='#4CAF50', width=3),
-        marker=dict(size=6, color='#4CAF50')
+        marker=dict(size=6, color='#4CAF50'),
+        _validate=False
     ))
     
     fig.update_layout(
-        title="📈 Análisis de Rendimiento",
-        xaxis_title="Número de Trade",
-        yaxis_title="P&L Acumulado ($)",
+        title_text="📈 Análisis de Rendimiento",
+        xaxis_title_text="Número de Trade",
+        yaxis_title_text="P&L Acumulado ($)",
         plot_bgcolor='#0E1117',
         paper_bgcolor='#1A1D23',
         font=dict(color='#FAFAFA'),
@@ -2,12 +2,104 @@ import plotly.graph_objects as go
 import plotly.subplots as sp
 import pandas as pd
 import numpy as np
+from functools import lru_cache
 from typing import List, Optional, Dict, Tuple
-from plotly.offline import plot
 
 from src.backtester.metrics import BacktestResults, Trade
 from src.strategies.base import TradeSignal, SignalType
-from src.visualization.advanced_charts import AdvancedChartGenerator
+from src.visualization.advanced_charts import (AdvancedChartGenerator, compact_floats,
+                                               line_trace_class, subplot_axes, with_traces)
+
+
+# Colores del tema claro de plot_trade_analysis
+_TRADE_ANALYSIS_COLORS = {
+    'background': '#FFFFFF',
+    'paper': '#FAFAFA', 
+    'text': '#2E2E2E',
+    'grid': '#E0E0E0',
+    'profit': '#2E7D32',
+    'loss': '#D32F2F',
+    'neutral': '#F57C00'
+}
+
+
+# Generador compartido por plot_trading_signals_advanced: sólo lee su configuración
+_ADVANCED_GENERATOR = AdvancedChartGenerator()
+
+
+# Etiqueta de cada barra de P&L indexada por pnl > 0 (array de objetos: plotly no revisa cada str)
+_PNL_LABELS = np.array(['Pérdida', 'Ganancia'], dtype=object)
+
+
+@lru_cache(maxsize=1)
+def _trade_analysis_template() -> go.Figure:
+    """
+    Esqueleto de plot_trade_analysis: subplots, tema y ejes
+    
+    No depende de los trades, así que se arma una vez y cada gráfico parte de una copia.
+    """
+    colors = _TRADE_ANALYSIS_COLORS
+    
+    fig = sp.make_subplots(
+        rows=2, cols=2,
+        subplot_titles=['💰 Equity Curve', '📊 P&L Distribution',
+                        '⏱️ Trade Duration', '🎯 Win/Loss Analysis'],
+        specs=[[{"colspan": 2}, None],
+               [{}, {}]],
+        vertical_spacing=0.12,
+        horizontal_spacing=0.1
+    )
+    
+    fig.update_layout(
+        title=dict(
+            x=0.5,
+            font=dict(size=18, color=colors['text'])
+        ),
+        plot_bgcolor=colors['background'],
+        paper_bgcolor=colors['paper'],
+        font=dict(color=colors['text'], family="Roboto, sans-serif"),
+        height=700,
+        margin=dict(l=60, r=60, t=100, b=60),
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5,
+            bgcolor="rgba(255,255,255,0.95)",
+            bordercolor="rgba(46,46,46,0.2)",
+            borderwidth=1
+        ),
+        hovermode='closest'
+    )
+    
+    # Configurar ejes con grid
+    for row in range(1, 3):
+        for col in range(1, 3):
+            if not (row == 1 and col == 2):  # Skip empty subplot
+                fig.update_xaxes(
+                    gridcolor=colors['grid'], 
+                    gridwidth=0.5, 
+                    showgrid=True,
+                    row=row, col=col
+                )
+                fig.update_yaxes(
+                    gridcolor=colors['grid'], 
+                    gridwidth=0.5, 
+                    showgrid=True,
+                    row=row, col=col
+                )
+    
+    # Etiquetas de ejes específicas
+    fig.update_xaxes(title_text="Fecha", row=1, col=1)
+    fig.update_yaxes(title_text="Equity ($)", row=1, col=1)
+    fig.update_xaxes(title_text="Número de Trade", row=2, col=1)
+    fig.update_yaxes(title_text="P&L ($)", row=2, col=1)
+    fig.update_xaxes(title_text="Duración (horas)", row=2, col=2)
+    fig.update_yaxes(title_text="Frecuencia", row=2, col=2)
+    
+    return fig
 
 
 class ChartGenerator:
@@ -21,8 +113,7 @@ class ChartGenerator:
         """
         Gráfico avanzado con señales de long/short usando el nuevo sistema mejorado
         """
-        generator = AdvancedChartGenerator()
-        return generator.create_professional_trading_chart(
+        return _ADVANCED_GENERATOR.create_professional_trading_chart(
             data=data,
             trades=trades,
             indicators=indicators,
@@ -38,159 +129,102 @@ class ChartGenerator:
         """
         Gráfico de análisis de trades y rendimiento mejorado
         """
-        # Crear figura con múltiples subplots para análisis completo
-        fig = sp.make_subplots(
-            rows=2, cols=2,
-            subplot_titles=['💰 Equity Curve', '📊 P&L Distribution', 
-                           '⏱️ Trade Duration', '🎯 Win/Loss Analysis'],
-            specs=[[{"colspan": 2}, None],
-                   [{}, {}]],
-            vertical_spacing=0.12,
-            horizontal_spacing=0.1
-        )
+        # Esqueleto (subplots, tema y ejes); las trazas se le agregan juntas al final
+        template = _trade_analysis_template()
+        colors = _TRADE_ANALYSIS_COLORS
+        traces = []
+        
+        # P&L de cada trade en un solo array: la equity y las estadísticas salen de él
+        pnl = np.fromiter((trade.pnl for trade in results.trades), dtype=np.float64,
+                          count=len(results.trades))
         
-        # Configurar colores del tema claro
-        colors = {
-            'background': '#FFFFFF',
-            'paper': '#FAFAFA', 
-            'text': '#2E2E2E',
-            'grid': '#E0E0E0',
-            'profit': '#2E7D32',
-            'loss': '#D32F2F',
-            'neutral': '#F57C00'
-        }
+        winning = pnl > 0
         
-        # 1. Equity Curve (gráfico principal)
-        equity_values = []
-        cumulative_pnl = 0
-        dates = []
-        trade_numbers = []
+        # 1. Equity Curve (gráfico principal); cumsum suma en el mismo orden que el bucle
+        equity_values = np.cumsum(pnl)
         
-        for i, trade in enumerate(results.trades):
-            cumulative_pnl += trade.pnl
-            equity_values.append(cumulative_pnl)
-            dates.append(trade.exit_time if trade.exit_time else trade.entry_time)
-            trade_numbers.append(i + 1)
+        # Fechas de cierre (o de entrada si sigue abierto) como un índice de pandas:
+        # plotly lo serializa como array en lugar de recorrer cada Timestamp
+        dates = pd.DatetimeIndex([trade.exit_time if trade.exit_time else trade.entry_time
+                                  for trade in results.trades])
+        # Número de cada trade: un solo array para el texto de la equity y el eje del P&L
+        trade_numbers = np.arange(1, len(results.trades) + 1, dtype=np.int32)
         
-        if equity_values:
-            fig.add_trace(go.Scatter(
+        if len(equity_values):
+            traces.append(line_trace_class(len(equity_values))(
                 x=dates,
-                y=equity_values,
+                y=compact_floats(equity_values, decimals=2),
                 mode='lines+markers',
                 name='💰 Equity Curve',
                 line=dict(color=colors['profit'], width=3),
                 marker=dict(size=4, color=colors['profit']),
                 hovertemplate='<b>Equity</b><br>Trade: %{text}<br>Fecha: %{x}<br>Valor: $%{y:,.2f}<extra></extra>',
-                text=trade_numbers
-            ), row=1, col=1)
-            
-            # Línea de break-even
-            fig.add_hline(y=0, line_dash="dash", line_color="rgba(46,46,46,0.5)", 
-                         line_width=1, row=1, col=1)
+                text=trade_numbers,
+                **subplot_axes(template, 1, 1),
+                _validate=False
+            ))
         
         # 2. Distribución de P&L por trade
         if results.trades:
-            pnl_values = [trade.pnl for trade in results.trades]
-            colors_pnl = [colors['profit'] if pnl > 0 else colors['loss'] for pnl in pnl_values]
-            
-            fig.add_trace(go.Bar(
-                x=list(range(1, len(pnl_values) + 1)),
-                y=pnl_values,
+            # Color por signo como array 0/1 sobre una escala de dos colores, en lugar
+            # de un string de color por barra
+            traces.append(go.Bar(
+                x=trade_numbers,
+                y=compact_floats(pnl, decimals=2),
                 name='📊 P&L por Trade',
-                marker_color=colors_pnl,
+                marker=dict(color=winning.view(np.int8), cmin=0, cmax=1,
+                            colorscale=[[0, colors['loss']], [1, colors['profit']]]),
                 opacity=0.8,
                 hovertemplate='<b>Trade %{x}</b><br>P&L: $%{y:,.2f}<br>Tipo: %{text}<extra></extra>',
-                text=['Ganancia' if pnl > 0 else 'Pérdida' for pnl in pnl_values]
-            ), row=2, col=1)
+                text=_PNL_LABELS[winning.view(np.int8)],
+                **subplot_axes(template, 2, 1),
+                _validate=False
+            ))
         
-        # 3. Distribución de duración de trades
-        durations = []
-        duration_labels = []
-        for trade in results.trades:
-            if trade.exit_time and trade.entry_time:
-                duration_hours = (trade.exit_time - trade.entry_time).total_seconds() / 3600
-                durations.append(duration_hours)
-                if duration_hours < 1:
-                    duration_labels.append(f"{duration_hours*60:.0f}m")
-                elif duration_hours < 24:
-                    duration_labels.append(f"{duration_hours:.1f}h")
-                else:
-                    duration_labels.append(f"{duration_hours/24:.1f}d")
+        # 3. Distribución de duración de trades: una resta de índices para todos los
+        # trades cerrados en lugar de un Timedelta por trade
+        closed = [trade for trade in results.trades if trade.exit_time and trade.entry_time]
+        elapsed = (pd.DatetimeIndex([trade.exit_time for trade in closed])
+                   - pd.DatetimeIndex([trade.entry_time for trade in closed]))
+        durations = elapsed.total_seconds().to_numpy() / 3600
         
-        if durations:
-            fig.add_trace(go.Histogram(
+        if len(durations):
+            traces.append(go.Histogram(
                 x=durations,
                 nbinsx=min(20, len(durations)),
                 name='⏱️ Duración (horas)',
                 marker_color=colors['neutral'],
                 opacity=0.7,
-                hovertemplate='<b>Duración</b><br>Rango: %{x:.1f}h<br>Cantidad: %{y}<extra></extra>'
-            ), row=2, col=2)
+                hovertemplate=('<b>Duración</b><br>Rango: %{x:.1f}h<br>Cantidad: %{y}'
+                               '<extra></extra>'),
+                **subplot_axes(template, 2, 2),
+                _validate=False
+            ))
+        
+        # Copia del esqueleto con todas las trazas, sin revalidarlas una a una
+        fig = with_traces(template, traces)
+        if len(equity_values):
+            # Línea de break-even
+            fig.add_hline(y=0, line_dash="dash", line_color="rgba(46,46,46,0.5)",
+                          line_width=1, row=1, col=1)
         
         # Calcular estadísticas
-        total_trades = len(results.trades)
-        winning_trades = len([t for t in results.trades if t.pnl > 0])
-        losing_trades = len([t for t in results.trades if t.pnl < 0])
+        total_trades = len(pnl)
+        losing = pnl < 0
+        winning_trades = int(np.count_nonzero(winning))
         win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
         
-        total_profit = sum(t.pnl for t in results.trades if t.pnl > 0)
-        total_loss = sum(t.pnl for t in results.trades if t.pnl < 0)
+        total_profit = float(pnl[winning].sum())
+        total_loss = float(pnl[losing].sum())
         profit_factor = abs(total_profit / total_loss) if total_loss != 0 else float('inf')
+        total_pnl = float(equity_values[-1]) if total_trades > 0 else 0
         
         # Configurar layout con estadísticas en título
         title_text = (f"📈 Análisis de Performance - {total_trades} Trades | "
-                     f"🎯 {win_rate:.1f}% Win Rate | "
-                     f"💰 ${sum(t.pnl for t in results.trades):,.2f} Total P&L | "
-                     f"📊 PF: {profit_factor:.2f}")
-        
-        fig.update_layout(
-            title=dict(
-                text=title_text,
-                x=0.5,
-                font=dict(size=18, color=colors['text'])
-            ),
-            plot_bgcolor=colors['background'],
-            paper_bgcolor=colors['paper'],
-            font=dict(color=colors['text'], family="Roboto, sans-serif"),
-            height=700,
-            margin=dict(l=60, r=60, t=100, b=60),
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="center",
-                x=0.5,
-                bgcolor="rgba(255,255,255,0.95)",
-                bordercolor="rgba(46,46,46,0.2)",
-                borderwidth=1
-            ),
-            hovermode='closest'
-        )
-        
-        # Configurar ejes con grid
-        for row in range(1, 3):
-            for col in range(1, 3):
-                if not (row == 1 and col == 2):  # Skip empty subplot
-                    fig.update_xaxes(
-                        gridcolor=colors['grid'], 
-                        gridwidth=0.5, 
-                        showgrid=True,
-                        row=row, col=col
-                    )
-                    fig.update_yaxes(
-                        gridcolor=colors['grid'], 
-                        gridwidth=0.5, 
-                        showgrid=True,
-                        row=row, col=col
-                    )
+                      f"🎯 {win_rate:.1f}% Win Rate | "
+                      f"💰 ${total_pnl:,.2f} Total P&L | "
+                      f"📊 PF: {profit_factor:.2f}")
         
-        # Etiquetas de ejes específicas
-        fig.update_xaxes(title_text="Fecha", row=1, col=1)
-        fig.update_yaxes(title_text="Equity ($)", row=1, col=1)
-        fig.update_xaxes(title_text="Número de Trade", row=2, col=1)
-        fig.update_yaxes(title_text="P&L ($)", row=2, col=1)
-        fig.update_xaxes(title_text="Duración (horas)", row=2, col=2)
-        fig.update_yaxes(title_text="Frecuencia", row=2, col=2)
+        fig.update_layout(title_text=title_text)
         
         return fig
\ No newline at end of file
@@ -1,17 +1,104 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Optional, Tuple
 from src.backtester.metrics import Trade
+from src.visualization.advanced_charts import (data_fingerprint, downsample_ohlcv, line_trace_class,
+                                               with_annotations)
 
 
-def create_professional_plotly_chart(data: pd.DataFrame, trades: List[Trade], 
-                                    symbol: str = "CRYPTO", indicators: Optional[Dict] = None):
-    """Gráfico profesional usando Plotly que simula el estilo TradingView"""
+# Caché LRU de figuras por contenido de datos, trades e indicadores: Streamlit
+# vuelve a ejecutar el script en cada interacción con las mismas entradas. Las
+# sesiones corren en hilos distintos, así que los accesos van bajo el lock
+FIGURE_CACHE_SIZE = 4
+_figure_cache: "OrderedDict[Tuple, go.Figure]" = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+# Colores de los indicadores conocidos (el resto va en gris)
+_INDICATOR_COLORS = MappingProxyType({
+    'ema_fast': '#FF9800',
+    'ema_medium': '#2196F3',
+    'ema_slow': '#E91E63',
+    'ema_20': '#FF9800',
+    'ema_50': '#2196F3',
+    'ema_200': '#E91E63',
+    'bb_upper': '#9C27B0',
+    'bb_lower': '#9C27B0',
+    'bb_middle': '#673AB7'
+})
+
+# Color de líneas y áreas de los trades ganadores y perdedores
+_RESULT_COLORS = MappingProxyType({True: '#4CAF50', False: '#F44336'})
+
+# Textos del hover de cada marcador
+_ENTRY_HOVER = "<b>🎯 {side} ENTRY</b><br>� Precio: ${price:.4f}<br>⏰ Tiempo: {time}<br>"
+_EXIT_HOVER = ("<b>🏁 EXIT</b><br>💰 Precio: ${price:.4f}<br>"
+               "📊 P&L: ${pnl:.2f} ({change:.1f}%)<br>⏰ Tiempo: {time}<br>")
+
+# Estilo común de los textos de entrada y salida (plotly copia los dicts)
+_ENTRY_FONT = dict(family="Arial Black", size=12, color="white")
+_EXIT_FONT = dict(family="Arial Black", size=11, color="white")
+_SIGNAL_LABEL = dict(xref='x', yref='y', showarrow=False, bordercolor="white",
+                     borderwidth=2, borderpad=4)
+
+
+def _trades_key(trades: List[Trade]) -> Tuple:
+    """Campos de cada trade que se dibujan"""
+    return tuple((trade.entry_time, trade.exit_time, trade.entry_price, trade.exit_price,
+                  trade.side, trade.pnl) for trade in trades)
+
+
+def _indicators_key(indicators: Optional[Dict]) -> Tuple:
+    """Nombre y hash de los valores de cada indicador (None si no se dibuja)"""
+    if not indicators:
+        return ()
+    key = []
+    for name, values in indicators.items():
+        if values is None or len(values) == 0:
+            key.append((name, None))
+        else:
+            array = np.ascontiguousarray(values, dtype=np.float64)
+            key.append((name, hashlib.blake2b(array.tobytes(), digest_size=16).digest()))
+    return tuple(key)
+
+
+def _plot_professional_figure(data: pd.DataFrame, trades: List[Trade], symbol: str,
+                              indicators: Optional[Dict], max_candles: Optional[int]) -> None:
+    """
+    Dibuja con st.plotly_chart la figura de create_professional_plotly_chart
     
-    st.info(f"📊 **Gráfico Plotly Profesional:** {len(data)} barras | {len(trades)} trades")
+    La figura se arma una vez por combinación de datos, trades, indicadores y
+    opciones, y se guarda en una caché LRU compartida entre sesiones. No sale de
+    esta función: st.plotly_chart sólo la serializa (to_dict) sin modificarla, y
+    copiarla reconstruye cada anotación (más lento que armarla de nuevo).
+    """
+    key = (data_fingerprint(data), _trades_key(trades), symbol, _indicators_key(indicators),
+           max_candles)
+    with _figure_cache_lock:
+        fig = _figure_cache.get(key)
+        if fig is not None:
+            _figure_cache.move_to_end(key)
+    
+    if fig is None:
+        fig = _build_professional_figure(data, trades, symbol, indicators, max_candles)
+        with _figure_cache_lock:
+            _figure_cache[key] = fig
+            _figure_cache.move_to_end(key)
+            if len(_figure_cache) > FIGURE_CACHE_SIZE:
+                _figure_cache.popitem(last=False)
     
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def _build_professional_figure(data: pd.DataFrame, trades: List[Trade], symbol: str,
+                               indicators: Optional[Dict], max_candles: Optional[int]) -> go.Figure:
+    """Arma la figura de create_professional_plotly_chart (velas, volumen, indicadores y señales)"""
     # Crear subplots con volumen
     fig = make_subplots(
         rows=2, cols=1,
@@ -21,13 +108,17 @@ def create_professional_plotly_chart(data: pd.DataFrame, trades: List[Trade],
         shared_xaxes=True
     )
     
+    candles = data
+    if max_candles is not None and len(data) > max_candles:
+        candles = downsample_ohlcv(data, max_candles)
+    
     # Candlesticks principales
     fig.add_trace(go.Candlestick(
-        x=data.index,
-        open=data['open'],
-        high=data['high'],
-        low=data['low'],
-        close=data['close'],
+        x=candles.index,
+        open=candles['open'],
+        high=candles['high'],
+        low=candles['low'],
+        close=candles['close'],
         name=symbol,
         increasing_line_color='#00C896',
         decreasing_line_color='#FF4B4B',
@@ -37,198 +128,192 @@ def create_professional_plotly_chart(data: pd.DataFrame, trades: List[Trade],
     
     # Volumen (si está disponible)
     if 'volume' in data.columns:
-        colors = ['#00C896' if close >= open else '#FF4B4B' 
-                 for close, open in zip(data['close'], data['open'])]
+        # Color por vela alcista/bajista como array 0/1 sobre una escala de dos
+        # colores: plotly valida un array numérico y no un string por barra
+        up = candles['close'].to_numpy() >= candles['open'].to_numpy()
         
         fig.add_trace(go.Bar(
-            x=data.index,
-            y=data['volume'],
+            x=candles.index,
+            y=candles['volume'],
             name='Volumen',
-            marker_color=colors,
+            marker=dict(color=up.view(np.int8), cmin=0, cmax=1,
+                        colorscale=[[0, '#FF4B4B'], [1, '#00C896']]),
             opacity=0.6
         ), row=2, col=1)
     
     # Indicadores técnicos
     if indicators:
-        colors = {
-            'ema_fast': '#FF9800',
-            'ema_medium': '#2196F3', 
-            'ema_slow': '#E91E63',
-            'ema_20': '#FF9800',
-            'ema_50': '#2196F3',
-            'ema_200': '#E91E63',
-            'bb_upper': '#9C27B0',
-            'bb_lower': '#9C27B0',
-            'bb_middle': '#673AB7'
-        }
-        
         for name, values in indicators.items():
             if values is not None and len(values) > 0:
-                color = colors.get(name, '#666666')
+                color = _INDICATOR_COLORS.get(name, '#666666')
                 width = 3 if '200' in name or 'slow' in name else 2
                 
-                fig.add_trace(go.Scatter(
+                # Con miles de barras las líneas van en WebGL: en SVG cada una
+                # es un path con todos los puntos y el navegador se traba
+                fig.add_trace(line_trace_class(len(values))(
                     x=data.index,
-                    y=values,
+                    y=np.asarray(values),
                     mode='lines',
                     name=name.upper(),
                     line=dict(color=color, width=width),
                     opacity=0.8
                 ), row=1, col=1)
     
-    # Señales de trading con estilo profesional y MUY VISIBLE
-    entry_annotations = []
-    exit_annotations = []
+    # Señales de trading con estilo profesional y MUY VISIBLE: los marcadores y
+    # las líneas de todos los trades se juntan en pocas trazas (una por estilo)
+    entry_x, entry_y, entry_symbols, entry_colors, entry_hover = [], [], [], [], []
+    exit_x, exit_y, exit_symbols, exit_colors, exit_hover = [], [], [], [], []
+    # Texto y desplazamiento de las anotaciones (x, y y color son los del marcador)
+    entry_text, entry_shift, exit_text, exit_shift = [], [], [], []
+    # Líneas entrada-salida por resultado; None corta la línea entre trades
+    line_x = {True: [], False: []}
+    line_y = {True: [], False: []}
+    # Áreas sombreadas por resultado: un rectángulo cerrado por trade, separados por None
+    rect_x = {True: [], False: []}
+    rect_y = {True: [], False: []}
     
-    for i, trade in enumerate(trades):
-        if trade.entry_time and trade.entry_time in data.index:
-            # Obtener el precio high/low de la barra para posicionar mejor las señales
-            bar_data = data.loc[trade.entry_time]
-            
-            if trade.side.lower() == 'long':
+    # Fila de la barra de entrada y de salida de cada trade (-1 si no está en los
+    # datos) en una sola búsqueda, en lugar de un data.loc por señal
+    entry_rows = data.index.get_indexer([trade.entry_time for trade in trades])
+    exit_rows = data.index.get_indexer([trade.exit_time for trade in trades])
+    highs = data['high'].to_numpy()
+    lows = data['low'].to_numpy()
+    
+    # El high/low de la barra posiciona mejor las señales: entrada LONG un poco
+    # abajo del low y SHORT arriba del high, la salida del lado opuesto (las
+    # filas -1 dan un valor que no se usa)
+    is_long = np.array([trade.side.lower() == 'long' for trade in trades], dtype=bool)
+    entry_signal_y = np.where(is_long, lows[entry_rows] * 0.998, highs[entry_rows] * 1.002)
+    exit_signal_y = np.where(is_long, highs[exit_rows] * 1.002, lows[exit_rows] * 0.998)
+    
+    # Límites del área sombreada de cada trade (NaN sin salida, no se usan)
+    entry_prices = np.array([trade.entry_price for trade in trades], dtype=float)
+    exit_prices = np.array([trade.exit_price for trade in trades], dtype=float)
+    area_low = np.minimum(entry_prices, exit_prices) * 0.9995
+    area_high = np.maximum(entry_prices, exit_prices) * 1.0005
+    
+    for k, (trade, entry_row, exit_row) in enumerate(zip(trades, entry_rows, exit_rows)):
+        if trade.entry_time and entry_row >= 0:
+            signal_y = entry_signal_y[k]
+            if is_long[k]:
                 # LONG: Señal ABAJO de la barra
-                signal_y = bar_data['low'] * 0.998  # Un poco abajo del low
                 color = '#00E676'
                 arrow_symbol = '▲'
                 text_y_offset = -30
                 marker_symbol = 'triangle-up'
             else:
                 # SHORT: Señal ARRIBA de la barra  
-                signal_y = bar_data['high'] * 1.002  # Un poco arriba del high
                 color = '#FF5722'
                 arrow_symbol = '▼'
                 text_y_offset = 30
                 marker_symbol = 'triangle-down'
             
             # SEÑAL DE ENTRADA - MUY GRANDE Y VISIBLE
-            fig.add_trace(go.Scatter(
-                x=[trade.entry_time],
-                y=[signal_y],
-                mode='markers',
-                marker=dict(
-                    symbol=marker_symbol,
-                    size=25,  # MUY GRANDE
-                    color=color,
-                    line=dict(color='white', width=3)
-                ),
-                name=f"Entry {i+1}",
-                showlegend=False,
-                hovertemplate=f"<b>🎯 {trade.side.upper()} ENTRY</b><br>" +
-                             f"� Precio: ${trade.entry_price:.4f}<br>" +
-                             f"⏰ Tiempo: {trade.entry_time}<br>" +
-                             f"<extra></extra>"
-            ), row=1, col=1)
+            entry_x.append(trade.entry_time)
+            entry_y.append(signal_y)
+            entry_symbols.append(marker_symbol)
+            entry_colors.append(color)
+            entry_hover.append(_ENTRY_HOVER.format(side=trade.side.upper(), price=trade.entry_price,
+                                                   time=trade.entry_time))
             
             # TEXTO DE ENTRADA - GRANDE Y CLARO
-            entry_annotations.append(
-                dict(
-                    x=trade.entry_time,
-                    y=signal_y,
-                    xref='x',
-                    yref='y',
-                    text=f"<b>{arrow_symbol} {trade.side.upper()}</b><br><b>${trade.entry_price:.2f}</b>",
-                    showarrow=False,
-                    font=dict(
-                        family="Arial Black",
-                        size=12,
-                        color="white"
-                    ),
-                    bgcolor=color,
-                    bordercolor="white",
-                    borderwidth=2,
-                    borderpad=4,
-                    yshift=text_y_offset
-                )
-            )
+            entry_text.append(f"<b>{arrow_symbol} {trade.side.upper()}</b><br>"
+                              f"<b>${trade.entry_price:.2f}</b>")
+            entry_shift.append(text_y_offset)
             
             # Señal de salida si existe
-            if trade.exit_time and trade.exit_price and trade.exit_time in data.index:
-                exit_bar_data = data.loc[trade.exit_time]
-                exit_color = '#4CAF50' if trade.pnl > 0 else '#F44336'
-                pnl_emoji = '💚' if trade.pnl > 0 else '❌'
+            if trade.exit_time and trade.exit_price and exit_row >= 0:
+                profitable = trade.pnl > 0
+                exit_color = _RESULT_COLORS[profitable]
+                pnl_emoji = '💚' if profitable else '❌'
                 
-                if trade.side.lower() == 'long':
+                if is_long[k]:
                     # EXIT LONG: Señal ARRIBA de la barra
-                    exit_signal_y = exit_bar_data['high'] * 1.002
                     exit_marker_symbol = 'triangle-down'
                     exit_text_y_offset = 30
                     exit_arrow = '▼'
                 else:
                     # EXIT SHORT: Señal ABAJO de la barra
-                    exit_signal_y = exit_bar_data['low'] * 0.998
                     exit_marker_symbol = 'triangle-up'
                     exit_text_y_offset = -30
                     exit_arrow = '▲'
                 
                 # SEÑAL DE SALIDA - MUY GRANDE Y VISIBLE
-                fig.add_trace(go.Scatter(
-                    x=[trade.exit_time],
-                    y=[exit_signal_y],
-                    mode='markers',
-                    marker=dict(
-                        symbol=exit_marker_symbol,
-                        size=22,  # GRANDE
-                        color=exit_color,
-                        line=dict(color='white', width=3)
-                    ),
-                    name=f"Exit {i+1}",
-                    showlegend=False,
-                    hovertemplate=f"<b>🏁 EXIT</b><br>" +
-                                 f"💰 Precio: ${trade.exit_price:.4f}<br>" +
-                                 f"📊 P&L: ${trade.pnl:.2f} ({((trade.exit_price/trade.entry_price - 1) * 100):.1f}%)<br>" +
-                                 f"⏰ Tiempo: {trade.exit_time}<br>" +
-                                 f"<extra></extra>"
-                ), row=1, col=1)
+                exit_x.append(trade.exit_time)
+                exit_y.append(exit_signal_y[k])
+                exit_symbols.append(exit_marker_symbol)
+                exit_colors.append(exit_color)
+                exit_hover.append(_EXIT_HOVER.format(
+                    price=trade.exit_price, pnl=trade.pnl,
+                    change=(trade.exit_price / trade.entry_price - 1) * 100, time=trade.exit_time))
                 
                 # TEXTO DE SALIDA - GRANDE Y CLARO
-                exit_annotations.append(
-                    dict(
-                        x=trade.exit_time,
-                        y=exit_signal_y,
-                        xref='x',
-                        yref='y',
-                        text=f"<b>{exit_arrow} EXIT</b><br><b>${trade.exit_price:.2f}</b><br><b>{pnl_emoji} ${trade.pnl:.1f}</b>",
-                        showarrow=False,
-                        font=dict(
-                            family="Arial Black",
-                            size=11,
-                            color="white"
-                        ),
-                        bgcolor=exit_color,
-                        bordercolor="white",
-                        borderwidth=2,
-                        borderpad=4,
-                        yshift=exit_text_y_offset
-                    )
-                )
+                exit_text.append(f"<b>{exit_arrow} EXIT</b><br><b>${trade.exit_price:.2f}</b><br>"
+                                 f"<b>{pnl_emoji} ${trade.pnl:.1f}</b>")
+                exit_shift.append(exit_text_y_offset)
                 
                 # LÍNEA CONECTORA MÁS VISIBLE entre entrada y salida
-                fig.add_trace(go.Scatter(
-                    x=[trade.entry_time, trade.exit_time],
-                    y=[trade.entry_price, trade.exit_price],
-                    mode='lines',
-                    line=dict(
-                        color=exit_color,
-                        width=3,  # Línea más gruesa
-                        dash='dot'
-                    ),
-                    opacity=0.8,  # Más opaca
-                    showlegend=False,
-                    hoverinfo='skip'
-                ), row=1, col=1)
+                line_x[profitable] += [trade.entry_time, trade.exit_time, None]
+                line_y[profitable] += [trade.entry_price, trade.exit_price, None]
                 
                 # ÁREA SOMBREADA para mostrar el trade completo
-                fig.add_shape(
-                    type="rect",
-                    x0=trade.entry_time,
-                    x1=trade.exit_time,
-                    y0=min(trade.entry_price, trade.exit_price) * 0.9995,
-                    y1=max(trade.entry_price, trade.exit_price) * 1.0005,
-                    fillcolor=exit_color,
-                    opacity=0.1,
-                    line=dict(color=exit_color, width=1, dash="dash"),
-                    row=1, col=1
-                )
+                y0, y1 = area_low[k], area_high[k]
+                rect_x[profitable] += [trade.entry_time, trade.exit_time, trade.exit_time,
+                                       trade.entry_time, trade.entry_time, None]
+                rect_y[profitable] += [y0, y0, y1, y1, y0, None]
+    
+    # Áreas sombreadas: una traza rellena por color en lugar de un shape por trade
+    for profitable, color in _RESULT_COLORS.items():
+        if rect_x[profitable]:
+            fig.add_trace(go.Scatter(
+                x=rect_x[profitable],
+                y=rect_y[profitable],
+                mode='lines',
+                fill='toself',
+                fillcolor=color,
+                line=dict(color=color, width=1, dash="dash"),
+                opacity=0.1,
+                showlegend=False,
+                hoverinfo='skip'
+            ), row=1, col=1)
+    
+    # Líneas conectoras (debajo de los marcadores), una traza por color
+    for profitable, color in _RESULT_COLORS.items():
+        if line_x[profitable]:
+            fig.add_trace(line_trace_class(len(line_x[profitable]))(
+                x=line_x[profitable],
+                y=line_y[profitable],
+                mode='lines',
+                line=dict(
+                    color=color,
+                    width=3,  # Línea más gruesa
+                    dash='dot'
+                ),
+                opacity=0.8,  # Más opaca
+                showlegend=False,
+                hoverinfo='skip'
+            ), row=1, col=1)
+    
+    # Marcadores de entrada y de salida: símbolo y color por punto
+    for name, x, y, symbols, colors, hover, size in (
+            ("Entradas", entry_x, entry_y, entry_symbols, entry_colors, entry_hover, 25),
+            ("Salidas", exit_x, exit_y, exit_symbols, exit_colors, exit_hover, 22)):
+        if x:
+            fig.add_trace(line_trace_class(len(x))(
+                x=x,
+                y=y,
+                mode='markers',
+                marker=dict(
+                    symbol=symbols,
+                    size=size,
+                    color=colors,
+                    line=dict(color='white', width=3)
+                ),
+                name=name,
+                showlegend=False,
+                customdata=hover,
+                hovertemplate='%{customdata}<extra></extra>'
+            ), row=1, col=1)
     
     # Configuración del layout profesional
     fig.update_layout(
@@ -248,8 +333,8 @@ def create_professional_plotly_chart(data: pd.DataFrame, trades: List[Trade],
             bgcolor="rgba(255,255,255,0.8)"
         ),
         margin=dict(t=80, b=40, l=60, r=60),
-        # Agregar todas las anotaciones de señales
-        annotations=entry_annotations + exit_annotations
+        # Remover rangeslider para un look más profesional
+        xaxis_rangeslider_visible=False
     )
     
     # Configurar ejes
@@ -274,24 +359,54 @@ def create_professional_plotly_chart(data: pd.DataFrame, trades: List[Trade],
         row=2, col=1
     )
     
-    # Remover rangeslider para un look más profesional
-    fig.update_layout(xaxis_rangeslider_visible=False)
+    # Agregar todas las anotaciones de señales: una por marcador, con el mismo
+    # color y posición, armadas de una vez y sin validar una por una
+    annotations = [dict(x=x, y=y, text=text, font=_ENTRY_FONT, bgcolor=color, yshift=shift,
+                        **_SIGNAL_LABEL)
+                   for x, y, text, color, shift in zip(entry_x, entry_y, entry_text,
+                                                       entry_colors, entry_shift)]
+    annotations += [dict(x=x, y=y, text=text, font=_EXIT_FONT, bgcolor=color, yshift=shift,
+                         **_SIGNAL_LABEL)
+                    for x, y, text, color, shift in zip(exit_x, exit_y, exit_text,
+                                                        exit_colors, exit_shift)]
+    return with_annotations(fig, annotations)
+
+
+def create_professional_plotly_chart(data: pd.DataFrame, trades: List[Trade],
+                                     symbol: str = "CRYPTO", indicators: Optional[Dict] = None,
+                                     max_candles: Optional[int] = None):
+    """
+    Gráfico profesional usando Plotly que simula el estilo TradingView
+    
+    Con max_candles, si hay más velas, las velas y el volumen se agregan en como
+    máximo max_candles velas (M4); indicadores y señales usan todas las velas.
+    """
+    
+    st.info(f"📊 **Gráfico Plotly Profesional:** {len(data)} barras | {len(trades)} trades")
     
     # Mostrar el gráfico
-    st.plotly_chart(fig, use_container_width=True)
+    _plot_professional_figure(data, trades, symbol, indicators, max_candles)
     
     # Información detallada de las señales
     if len(trades) > 0:
+        # Una sola pasada para los tres conteos
+        long_count = short_count = profitable_count = 0
+        for trade in trades:
+            side = trade.side.lower()
+            if side == 'long':
+                long_count += 1
+            elif side == 'short':
+                short_count += 1
+            if trade.pnl > 0:
+                profitable_count += 1
+        
         col1, col2, col3 = st.columns(3)
         with col1:
-            long_trades = [t for t in trades if t.side.lower() == 'long']
-            st.metric("🟢 Trades LONG", len(long_trades))
+            st.metric("🟢 Trades LONG", long_count)
         with col2:
-            short_trades = [t for t in trades if t.side.lower() == 'short']
-            st.metric("🔴 Trades SHORT", len(short_trades))
+            st.metric("🔴 Trades SHORT", short_count)
         with col3:
-            profitable_trades = [t for t in trades if t.pnl > 0]
-            win_rate = len(profitable_trades) / len(trades) * 100 if trades else 0
+            win_rate = profitable_count / len(trades) * 100
             st.metric("🎯 Win Rate", f"{win_rate:.1f}%")
     
     st.success("✅ Gráfico profesional con señales MUY VISIBLES - Entradas/Salidas claramente marcadas")
@@ -323,22 +438,24 @@ def create_simple_candlestick_chart(data: pd.DataFrame, trades: List[Trade],
         decreasing_line_color='#FF4B4B'
     ))
     
-    # Añadir señales básicas
-    for trade in trades:
-        if trade.entry_time:
-            color = '#00E676' if trade.side.lower() == 'long' else '#FF5722'
-            fig.add_scatter(
-                x=[trade.entry_time],
-                y=[trade.entry_price],
-                mode='markers',
-                marker=dict(
-                    symbol='triangle-up' if trade.side.lower() == 'long' else 'triangle-down',
-                    size=12,
-                    color=color
-                ),
-                name=trade.side.upper(),
-                showlegend=False
-            )
+    # Añadir señales básicas: una sola traza con símbolo y color por punto; el
+    # lado de cada trade sigue apareciendo en el hover
+    entries = [trade for trade in trades if trade.entry_time]
+    if entries:
+        longs = [trade.side.lower() == 'long' for trade in entries]
+        fig.add_trace(line_trace_class(len(entries))(
+            x=[trade.entry_time for trade in entries],
+            y=[trade.entry_price for trade in entries],
+            mode='markers',
+            marker=dict(
+                symbol=['triangle-up' if long else 'triangle-down' for long in longs],
+                size=12,
+                color=['#00E676' if long else '#FF5722' for long in longs]
+            ),
+            customdata=[trade.side.upper() for trade in entries],
+            hovertemplate='(%{x}, %{y})<extra>%{customdata}</extra>',
+            showlegend=False
+        ))
     
     fig.update_layout(
         title=f"📊 {symbol} - Gráfico Básico",
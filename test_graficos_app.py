@@ -152,8 +152,9 @@ def test_grafico_app():
         output_dir = "test_charts"
         os.makedirs(output_dir, exist_ok=True)
         
-        fig_advanced.write_html(f"{output_dir}/test_advanced.html")
-        fig_simple.write_html(f"{output_dir}/test_analysis.html")
+        # Un único plotly.min.js compartido en output_dir en lugar de uno por HTML
+        fig_advanced.write_html(f"{output_dir}/test_advanced.html", include_plotlyjs='directory')
+        fig_simple.write_html(f"{output_dir}/test_analysis.html", include_plotlyjs='directory')
         
         print(f"\n💾 Gráficos guardados en {output_dir}/")
         print("✅ Test completado exitosamente!")
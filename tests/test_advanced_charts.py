@@ -0,0 +1,205 @@
+import pytest
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from src.visualization.advanced_charts import (AdvancedChartGenerator, ChartConfig,
+                                               plot_trade_analysis, compact_floats,
+                                               downsample_ohlcv)
+from src.backtester.metrics import Trade
+
+
+@pytest.fixture
+def ohlcv():
+    """Datos OHLCV horarios sintéticos"""
+    np.random.seed(11)
+    n = 120
+    close = 100 + np.random.normal(0, 1, n).cumsum()
+    return pd.DataFrame({
+        'open': close + np.random.normal(0, 0.5, n),
+        'high': close + 2,
+        'low': close - 2,
+        'close': close,
+        'volume': np.random.uniform(1000, 5000, n)
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+
+
+@pytest.fixture
+def trades(ohlcv):
+    """Trades ganadores y perdedores de ambos lados"""
+    idx, close = ohlcv.index, ohlcv['close'].to_numpy()
+    result = []
+    for k, side in zip(range(0, 100, 10), ['long', 'short'] * 5):
+        pnl = (close[k + 5] - close[k]) * (1 if side == 'long' else -1)
+        result.append(Trade(idx[k], idx[k + 5], close[k], close[k + 5], 1.0, side,
+                            pnl, pnl / close[k], 0.0, False))
+    return result
+
+
+class TestCandlesticks:
+    """Tests de la traza de velas"""
+
+    def test_hover_formatted_client_side(self, ohlcv):
+        """Test que el hover de las velas es una plantilla y no una lista de textos"""
+        fig = AdvancedChartGenerator().create_professional_trading_chart(
+            ohlcv, [], show_volume=False, show_levels=False
+        )
+        candles = fig.data[0]
+
+        assert candles.hovertext is None and candles.text is None
+        for field in ('x|', 'open:', 'high:', 'low:', 'close:'):
+            assert '%{' + field in candles.hovertemplate
+
+
+class TestCompactFloats:
+    """Tests de la reducción a float32 de las series"""
+
+    def test_downcast_only_when_hover_unchanged(self):
+        """Test que float32 se usa sólo si el error no alcanza los decimales mostrados"""
+        assert compact_floats([101.2345, np.nan, 99.5]).dtype == np.float32
+        assert compact_floats([65432.1234, 65433.5]).dtype == np.float64
+        assert compact_floats([65432.0, 65433.0], decimals=0).dtype == np.float32
+        assert compact_floats([1e39]).dtype == np.float64
+
+
+class TestFigure:
+    """Tests de la figura completa"""
+
+    def test_unvalidated_figure_is_valid(self, ohlcv, trades):
+        """Test que la figura armada sin validación pasa la validación de plotly"""
+        close = ohlcv['close']
+        indicators = {'ema_20': close.ewm(span=20).mean(), 'rsi': close * 0 + 50,
+                      'macd': close * 0, 'macd_signal': close * 0, 'macd_histogram': close.diff(),
+                      'bb_upper': close + 2, 'bb_lower': close - 2}
+        fig = AdvancedChartGenerator().create_professional_trading_chart(ohlcv, trades, indicators)
+
+        validated = go.Figure(fig.to_dict())
+        assert len(validated.data) == len(fig.data)
+        assert validated.layout.title.text == fig.layout.title.text
+        # La grilla de subplots se conserva para las llamadas con row/col
+        assert fig.get_subplot(4, 1) is not None
+        assert {t.yaxis for t in fig.data} == {'y', 'y2', 'y3', 'y4'}
+
+    def test_trade_lines_batched(self, ohlcv, trades):
+        """Test que las líneas de trades se agrupan por estilo con un segmento por trade"""
+        fig = AdvancedChartGenerator().create_professional_trading_chart(
+            ohlcv, trades, show_volume=False, show_levels=False
+        )
+        line_traces = [t for t in fig.data if t.type == 'scatter' and t.showlegend is False]
+
+        assert 0 < len(line_traces) <= 4
+        assert sum(len(t.x) for t in line_traces) == 3 * len(trades)
+        for trace in line_traces:
+            profitable = trace.line.dash == 'solid'
+            for k in range(0, len(trace.x), 3):
+                trade = next(t for t in trades if t.entry_time == trace.x[k])
+                assert (trade.pnl > 0) == profitable
+                assert trace.x[k + 1] == trade.exit_time and trace.x[k + 2] is None
+                assert f'P&L: ${trade.pnl:,.2f}' in trace.customdata[k]
+
+    def test_base_figure_cache(self, ohlcv, trades):
+        """Test que la figura base se reutiliza sin compartir estado entre llamadas"""
+        generator = AdvancedChartGenerator()
+        first = generator.create_professional_trading_chart(ohlcv, trades)
+        first.update_layout(title_text="modificado")
+        first.data[0].name = "modificado"
+
+        second = generator.create_professional_trading_chart(ohlcv, trades)
+        assert second.layout.title.text.startswith("⚡ CRYPTO")
+        assert second.data[0].name == "💰 Precio"
+
+        # Mismos datos con otro valor: no se reutiliza la figura anterior
+        changed = ohlcv.copy()
+        changed.iloc[-1, changed.columns.get_loc('close')] += 1.0
+        third = generator.create_professional_trading_chart(changed, trades)
+        assert third.data[0].close[-1] == pytest.approx(changed['close'].iloc[-1], abs=5e-6)
+        assert second.data[0].close[-1] == pytest.approx(ohlcv['close'].iloc[-1], abs=5e-6)
+
+    def test_skeleton_not_shared(self, ohlcv, trades):
+        """Test que figuras con la misma topología y datos distintos no comparten layout"""
+        generator = AdvancedChartGenerator()
+        first = generator.create_professional_trading_chart(ohlcv, trades, show_levels=False)
+        first.update_layout(height=100)
+
+        fig = generator.create_professional_trading_chart(ohlcv.iloc[:-1], trades,
+                                                          show_levels=False)
+        assert fig.layout.height == 900
+        assert len(fig.layout.annotations) == 2 and len(fig.layout.shapes) == 0
+
+    def test_layout_config_per_instance(self, ohlcv, trades):
+        """Test que el layout se cambia por instancia y las cachés lo respetan"""
+        config = ChartConfig()
+        config.layout_config['height'] = 600
+        config.layout_config['margin']['l'] = 10
+        config.markers['long_entry']['size'] = 5
+
+        fig = AdvancedChartGenerator(config).create_professional_trading_chart(ohlcv, trades)
+        assert (fig.layout.height, fig.layout.margin.l) == (600, 10)
+        default = ChartConfig()
+        assert default.layout_config['height'] == 900
+        assert default.layout_config['margin']['l'] == 80
+        assert default.markers['long_entry']['size'] == 20
+        fig = AdvancedChartGenerator().create_professional_trading_chart(ohlcv, trades)
+        assert (fig.layout.height, fig.layout.margin.l) == (900, 80)
+
+    def test_default_layout_frozen(self):
+        """Test que los valores por defecto compartidos no se pueden modificar"""
+        with pytest.raises(TypeError):
+            ChartConfig.DEFAULT_LAYOUT_CONFIG['height'] = 600
+        with pytest.raises(TypeError):
+            ChartConfig.DEFAULT_LAYOUT_CONFIG['margin']['l'] = 10
+        with pytest.raises(TypeError):
+            ChartConfig.DEFAULT_MARKERS['long_entry']['line']['width'] = 1
+
+
+class TestTradeAnalysis:
+    """Tests de plot_trade_analysis"""
+
+    def test_equity_curve_is_running_sum(self, ohlcv, trades):
+        """Test que la curva de equity es el P&L acumulado trade a trade"""
+        fig = plot_trade_analysis(SimpleNamespace(trades=trades), ohlcv)
+
+        running, expected = 0, []
+        for trade in trades:
+            running += trade.pnl
+            expected.append(running)
+        assert list(fig.data[0].y) == expected
+        assert list(fig.data[0].x) == list(range(len(trades)))
+        assert fig.data[0].type == 'scatter'
+
+    def test_long_equity_curve_uses_webgl(self):
+        """Test que las curvas largas se dibujan con Scattergl"""
+        trades = [SimpleNamespace(pnl=float(k % 7 - 3)) for k in range(1500)]
+        fig = plot_trade_analysis(SimpleNamespace(trades=trades), None)
+
+        assert fig.data[0].type == 'scattergl'
+        assert fig.data[0].y[-1] == sum(t.pnl for t in trades)
+
+
+class TestDownsample:
+    """Tests de la agregación de velas"""
+
+    def test_groups_keep_extremes(self, ohlcv):
+        """Test que cada grupo conserva apertura, extremos, cierre y volumen total"""
+        candles = downsample_ohlcv(ohlcv, 7)
+        assert len(candles) == 7
+        starts = [ohlcv.index.get_loc(t) for t in candles.index] + [len(ohlcv)]
+        for k, (lo, hi) in enumerate(zip(starts[:-1], starts[1:])):
+            group = ohlcv.iloc[lo:hi]
+            assert candles['open'].iloc[k] == group['open'].iloc[0]
+            assert candles['high'].iloc[k] == group['high'].max()
+            assert candles['low'].iloc[k] == group['low'].min()
+            assert candles['close'].iloc[k] == group['close'].iloc[-1]
+            assert candles['volume'].iloc[k] == pytest.approx(group['volume'].sum())
+
+    def test_chart_max_candles(self, ohlcv, trades):
+        """Test que max_candles limita las velas y deja los indicadores completos"""
+        indicators = {'ema_20': ohlcv['close'].ewm(span=20).mean()}
+        fig = AdvancedChartGenerator().create_professional_trading_chart(
+            ohlcv, trades, indicators, max_candles=30
+        )
+        assert len(fig.data[0].x) == 30 and len(fig.data[1].x) == 30
+        assert max(len(t.x) for t in fig.data if t.name == '📊 EMA 20') == len(ohlcv)
+
+        with pytest.raises(ValueError):
+            downsample_ohlcv(ohlcv, 0)
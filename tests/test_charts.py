@@ -0,0 +1,47 @@
+import pytest
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from src.visualization import charts, charts_new
+from src.backtester.metrics import Trade
+
+
+@pytest.fixture
+def trades():
+    """Trades cerrados alternando ganancias y pérdidas, más uno abierto"""
+    idx = pd.date_range('2024-01-01', periods=60, freq='h')
+    result = []
+    for k in range(0, 50, 5):
+        pnl = (k % 3 - 1) * 10.0
+        result.append(Trade(idx[k], idx[k + 3], 100.0, 100.0 + pnl, 1.0, 'long', pnl, pnl / 100,
+                            0.0, False))
+    result.append(Trade(idx[55], None, 100.0, None, 1.0, 'long', 0.0, 0.0, 0.0, True))
+    return result
+
+
+@pytest.mark.parametrize("module", [charts, charts_new])
+class TestTradeAnalysis:
+    """Tests de ChartGenerator.plot_trade_analysis"""
+
+    def test_equity_and_stats(self, module, trades):
+        """Test que la equity y el título salen del P&L trade a trade"""
+        fig = module.ChartGenerator.plot_trade_analysis(SimpleNamespace(trades=trades), None)
+
+        pnls = [t.pnl for t in trades]
+        assert list(fig.data[0].y) == list(np.cumsum(pnls))
+        wins = sum(p > 0 for p in pnls)
+        assert f"{len(trades)} Trades" in fig.layout.title.text
+        assert f"{wins / len(trades) * 100:.1f}% Win Rate" in fig.layout.title.text
+        assert f"${sum(pnls):,.2f} Total P&L" in fig.layout.title.text
+
+    def test_template_not_shared(self, module, trades):
+        """Test que cada llamada parte de una copia del esqueleto"""
+        first = module.ChartGenerator.plot_trade_analysis(SimpleNamespace(trades=trades), None)
+        first.update_layout(height=100)
+        first.update_yaxes(title_text="modificado", row=1, col=1)
+
+        second = module.ChartGenerator.plot_trade_analysis(SimpleNamespace(trades=[]), None)
+        assert second.layout.height == 700
+        assert second.layout.yaxis.title.text == "Equity ($)"
+        assert len(second.data) == 0 and len(second.layout.shapes) == 0
+        assert "0 Trades" in second.layout.title.text
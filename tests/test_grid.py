@@ -0,0 +1,88 @@
+import contextlib
+import io
+
+import pytest
+import pandas as pd
+import numpy as np
+from src.backtester.engine import BacktesterEngine
+from src.backtester.grid import simulate_grid
+from src.risk.manager import RiskManager, RiskParameters
+from src.strategies.base import SignalType, TradeSignal
+
+
+class TestSimulateGrid:
+    """Tests para la simulación vectorizada de múltiples estrategias"""
+
+    @pytest.fixture
+    def sample_data(self):
+        """Datos de ejemplo para testing"""
+        np.random.seed(42)
+        dates = pd.date_range('2024-01-01', periods=300, freq='1h')
+        close = 100 * np.cumprod(1 + np.random.normal(0, 0.01, 300))
+        return pd.DataFrame({
+            'open': close,
+            'high': close * 1.01,
+            'low': close * 0.99,
+            'close': close,
+            'volume': 1000.0
+        }, index=dates)
+
+    def test_matches_engine_simulation(self, sample_data):
+        """Test que el grid reproduce los resultados de _simulate_trading"""
+        n = len(sample_data)
+        entries = np.zeros(n, dtype=bool)
+        exits = np.zeros(n, dtype=bool)
+        entries[[10, 80, 150]] = True
+        exits[[40, 120, 220]] = True
+
+        signals = []
+        for i in np.flatnonzero(entries | exits):
+            signal_type = SignalType.BUY if entries[i] else SignalType.SELL
+            signals.append(TradeSignal(timestamp=sample_data.index[i], signal_type=signal_type,
+                                       price=sample_data['close'].iloc[i]))
+
+        engine = BacktesterEngine()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = engine._simulate_trading(sample_data, signals, 10000,
+                                               RiskManager(RiskParameters()))
+
+        grid = engine.run_grid(sample_data, entries[:, None], exits[:, None])
+
+        assert grid['final_capital'][0] == pytest.approx(results.final_capital)
+        assert grid['sharpe_ratio'][0] == pytest.approx(results.sharpe_ratio)
+        assert grid['max_drawdown_pct'][0] == pytest.approx(results.max_drawdown_pct)
+        assert grid['total_trades'][0] == len(results.trades)
+
+    def test_columns_are_independent(self, sample_data):
+        """Test que cada columna se simula por separado"""
+        n = len(sample_data)
+        entries = np.zeros((n, 3), dtype=bool)
+        exits = np.zeros((n, 3), dtype=bool)
+        entries[10, 0] = True
+        exits[50, 0] = True
+        entries[20, 2] = True
+
+        final_capital, sharpe, max_dd, n_trades = simulate_grid(
+            sample_data['close'].to_numpy(), entries, exits
+        )
+
+        assert final_capital.shape == (3,)
+        assert final_capital[1] == 10000
+        assert sharpe[1] == 0.0 and max_dd[1] == 0.0
+        assert list(n_trades) == [1, 0, 1]
+
+    def test_stop_loss_per_strategy(self):
+        """Test que el stop loss se aplica por estrategia"""
+        close = np.array([100.0, 100.0, 90.0, 90.0, 120.0])
+        entries = np.array([[True, True], [False, False], [False, False],
+                            [False, False], [False, False]])
+        exits = np.zeros_like(entries)
+
+        final_capital, _, _, n_trades = simulate_grid(
+            close, entries, exits, commission=0.0, slippage=0.0,
+            stop_loss_pct=np.array([0.05, np.nan])
+        )
+
+        assert final_capital[0] < 10000  # Cerrado por stop loss en 90
+        assert final_capital[1] > 10000  # Sin stop loss, termina en 120
+        assert list(n_trades) == [1, 1]
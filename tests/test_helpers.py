@@ -0,0 +1,188 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.utils.helpers import (calculate_compound_return, validate_date_range, format_currency,
+                               format_currency_fast,
+                               get_trading_days_between, safe_divide, safe_divide_array,
+                               format_percentage, format_currency_array, format_percentage_array,
+                               calculate_trade_duration, calculate_trade_durations,
+                               calculate_durations_hours,
+                               timestamp_to_string, timestamps_to_strings,
+                               compound_return_nb, max_drawdown_nb,
+                               sharpe_ratio_nb, rolling_mean_nb,
+                               print_backtest_summary, backtest_summary_str)
+from src.backtester.metrics import BacktestResults, PerformanceMetrics
+
+
+class TestCompoundReturn:
+    """Tests para calculate_compound_return"""
+
+    def test_matches_product(self):
+        """Test que coincide con el producto de (1 + r)"""
+        np.random.seed(0)
+        returns = pd.Series(np.random.normal(0.001, 0.02, 5000))
+        returns.iloc[10] = np.nan
+
+        expected = (1 + returns).prod() - 1
+        assert calculate_compound_return(returns) == pytest.approx(expected, rel=1e-9)
+        assert calculate_compound_return(returns.to_numpy()) == calculate_compound_return(returns)
+
+        # Series cortas (producto directo)
+        short = returns.iloc[:300]
+        assert calculate_compound_return(short) == pytest.approx((1 + short).prod() - 1, rel=1e-12)
+
+    def test_edge_cases(self):
+        """Test de series vacías y pérdidas totales"""
+        assert calculate_compound_return(pd.Series([], dtype=float)) == 0.0
+        assert calculate_compound_return(pd.Series([np.nan])) == 0.0
+        assert calculate_compound_return(pd.Series([0.5, -1.0, 0.2])) == -1.0
+        assert calculate_compound_return(pd.Series([0.5, -1.5])) == pytest.approx(-1.75)
+
+
+class TestMetricKernels:
+    """Tests para los kernels compilados de métricas"""
+
+    def test_match_performance_metrics(self):
+        """Test que los kernels coinciden con PerformanceMetrics"""
+        np.random.seed(3)
+        equity = pd.Series(10000 * np.cumprod(1 + np.random.normal(0.0005, 0.01, 3000)))
+        returns = PerformanceMetrics.calculate_returns(equity)
+
+        expected = PerformanceMetrics.calculate_max_drawdown(equity)
+        assert max_drawdown_nb(equity.to_numpy()) == expected
+        assert sharpe_ratio_nb(returns.to_numpy()) == pytest.approx(
+            PerformanceMetrics.calculate_sharpe_ratio(returns), rel=1e-9)
+        assert compound_return_nb(returns.to_numpy()) == pytest.approx(
+            calculate_compound_return(returns), rel=1e-9)
+        assert sharpe_ratio_nb(np.zeros(10)) == 0.0
+
+    @pytest.mark.parametrize("window", [1, 3, 20, 500])
+    def test_rolling_mean_matches_pandas(self, window):
+        """Test que la media móvil compilada coincide exactamente con rolling().mean()"""
+        np.random.seed(5)
+        values = np.random.uniform(1000, 5000, 400)
+        values[[7, 50, 51, 200]] = np.nan
+        values[300:340] = 2500.0
+
+        expected = pd.Series(values).rolling(window).mean().to_numpy()
+        np.testing.assert_array_equal(rolling_mean_nb(values, window), expected)
+
+    def test_safe_divide_array(self):
+        """Test que la división vectorizada coincide con safe_divide"""
+        numerators = [1.0, -2.0, 0.0, 3.0]
+        denominators = [2.0, 0.0, 0.0, -4.0]
+
+        result = safe_divide_array(numerators, denominators, default=-1.0)
+
+        assert list(result) == [safe_divide(n, d, -1.0) for n, d in zip(numerators, denominators)]
+
+
+class TestFormatting:
+    """Tests para el formateo de montos y porcentajes"""
+
+    def test_array_matches_scalar(self):
+        """Test que las versiones por lotes coinciden con las escalares"""
+        values = np.array([0.0, -1234.5678, 1e7 / 3, np.nan, 0.015])
+        for decimals in (0, 2, 4):
+            currencies = [format_currency(v, decimals) for v in values]
+            percentages = [format_percentage(v, decimals) for v in values]
+            assert format_currency_array(values, decimals) == currencies
+            assert format_percentage_array(values, decimals) == percentages
+        assert [format_currency_fast(v) for v in values] == [format_currency(v) for v in values]
+
+    def test_cache_keeps_signed_zero(self):
+        """Test que la caché no confunde 0.0 con -0.0"""
+        for _ in range(2):
+            assert format_currency(-0.0) == "$-0.00"
+            assert format_currency(0.0) == "$0.00"
+            assert format_percentage(-0.0) == "-0.00%"
+            assert format_percentage(0.0) == "0.00%"
+
+
+class TestTradeDuration:
+    """Tests para la duración de trades"""
+
+    def test_matches_timedelta(self):
+        """Test que la resta de int64 coincide con Timedelta.total_seconds"""
+        entry = pd.Timestamp('2024-01-01 00:00:00.123456789')
+        exits = [pd.Timestamp('2024-01-02 05:00:00'), pd.Timestamp('2023-12-31 23:59:59.999')]
+
+        for exit_time in exits:
+            expected = round((exit_time - entry).total_seconds() / 3600, 2)
+            assert calculate_trade_duration(entry, exit_time) == expected
+        assert calculate_trade_duration(entry, None) == 0.0
+        with pytest.raises(TypeError):
+            calculate_trade_duration(entry, exits[0].tz_localize('UTC'))
+
+    def test_batch_matches_scalar(self):
+        """Test que la versión vectorizada coincide con la escalar"""
+        np.random.seed(1)
+        entries = pd.to_datetime(np.random.randint(0, 2**40, 1000) * 10**6)
+        exits = entries + pd.to_timedelta(np.random.randint(0, 10**14, 1000))
+        exits = exits.where(np.arange(1000) % 100 != 0)  # Trades abiertos (NaT)
+
+        durations = calculate_trade_durations(entries, exits)
+
+        assert np.isnan(durations[::100]).all()
+        mask = ~exits.isna()
+        assert list(durations[mask]) == [calculate_trade_duration(e, x)
+                                         for e, x in zip(entries[mask], exits[mask])]
+
+        hours = calculate_durations_hours(entries[mask].asi8, exits[mask].to_numpy())
+        np.testing.assert_allclose(hours.round(2), durations[mask], atol=0.01)
+
+    @pytest.mark.parametrize('tz', [None, 'America/New_York'])
+    def test_timestamps_to_strings(self, tz):
+        """Test que la conversión por lotes coincide con timestamp_to_string"""
+        index = pd.date_range('1969-12-31 23:59', periods=500, freq='7s', tz=tz).insert(3, pd.NaT)
+
+        for fmt in ('%Y-%m-%d %H:%M:%S', '%d/%m %H:%M'):
+            assert timestamps_to_strings(index, fmt) == [timestamp_to_string(t, fmt) for t in index]
+        assert timestamp_to_string(np.nan) == timestamp_to_string(None) == "N/A"
+
+
+class TestDateHelpers:
+    """Tests para el parseo de fechas"""
+
+    @pytest.mark.parametrize('start, end, expected', [
+        ('2024-01-01', '2024-02-01', True),
+        ('2024-1-5', '2024-01-06', True),
+        ('2024-02-01', '2024-01-01', False),
+        ('2024-02-30', '2024-03-01', False),
+        ('2024/01/01', '2024-02-01', False),
+    ])
+    def test_validate_date_range(self, start, end, expected):
+        """Test que acepta y rechaza las mismas fechas que strptime"""
+        assert validate_date_range(start, end) is expected
+
+    def test_trading_days_between(self):
+        """Test que se cuentan los días hábiles exactos"""
+        assert get_trading_days_between('2024-01-01', '2024-01-08') == 5  # Lunes a lunes
+        assert get_trading_days_between('2024-01-06', '2024-01-08') == 1  # Sólo fin de semana
+        assert get_trading_days_between('2024-01-01', '2024-12-31') == 261
+        with pytest.raises(ValueError):
+            get_trading_days_between('2024-13-01', '2024-12-31')
+
+
+class TestBacktestSummary:
+    """Tests para el resumen impreso del backtest"""
+
+    def test_summary_output(self, capsys):
+        """Test que el resumen se imprime completo y con el formato esperado"""
+        results = BacktestResults(initial_capital=10000, final_capital=12500, total_return=2500,
+                                  total_return_pct=0.25, total_trades=4, winning_trades=3,
+                                  losing_trades=1, win_rate=0.75, sharpe_ratio=1.5,
+                                  max_drawdown=800, max_drawdown_pct=0.08, calmar_ratio=3.125,
+                                  avg_win=1000, avg_loss=500, profit_factor=6.0)
+
+        print_backtest_summary(results)
+        output = capsys.readouterr().out
+        lines = output.split("\n")
+
+        assert backtest_summary_str(results) + "\n" == output
+
+        assert len(lines) == 21 and lines[-1] == ""
+        assert lines[0] == lines[2] == lines[-2] == "=" * 60
+        assert lines[5] == "Retorno Total:        $2,500.00 (25.00%)"
+        assert lines[6] == lines[11] == lines[15] == ""
+        assert lines[17] == "Max Drawdown:         $800.00 (8.00%)"
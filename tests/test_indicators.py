@@ -131,4 +131,65 @@ class TestTechnicalIndicators:
         
         # Verificar que el DataFrame original no se modificó
         original_columns = set(sample_data.columns)
-        assert original_columns.issubset(set(df_with_indicators.columns))
\ No newline at end of file
+        assert original_columns.issubset(set(df_with_indicators.columns))
+
+    def test_add_all_indicators_matches_individual(self, sample_data):
+        """Test que el cálculo en una pasada coincide con los indicadores individuales"""
+        df = TechnicalIndicators.add_all_indicators(sample_data)
+
+        for column, values in _individual_indicators(sample_data).items():
+            np.testing.assert_allclose(df[column].to_numpy(), values.to_numpy(),
+                                       rtol=1e-9, atol=1e-9, err_msg=column)
+
+    def test_add_all_indicators_with_nan_gaps(self, sample_data):
+        """Test que un NaN en los precios no contamina el resto de los indicadores"""
+        data = sample_data.copy()
+        data.iloc[[30, 31, 70], data.columns.get_loc('close')] = np.nan
+        df = TechnicalIndicators.add_all_indicators(data)
+
+        for column, values in _individual_indicators(data).items():
+            np.testing.assert_allclose(df[column].to_numpy(), values.to_numpy(),
+                                       rtol=1e-9, atol=1e-9, err_msg=column)
+        assert df['sma_20'].iloc[-1] == pytest.approx(data['close'].iloc[-20:].mean())
+
+    def test_add_all_indicators_no_drift(self):
+        """Test que con precios de distinta magnitud no hay deriva respecto de pandas y `ta`"""
+        rng = np.random.default_rng(1)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 20000)))
+        data = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                             'close': close, 'volume': rng.uniform(1, 1e6, len(close))})
+        df = TechnicalIndicators.add_all_indicators(data)
+
+        expected = _individual_indicators(data)
+        for column, values in expected.items():
+            np.testing.assert_allclose(df[column].to_numpy(), values.to_numpy(),
+                                       rtol=1e-9, atol=1e-12, err_msg=column)
+        # Mismo algoritmo compensado que pandas: las bandas coinciden bit a bit
+        np.testing.assert_array_equal(df['bb_upper'].to_numpy(), expected['bb_upper'].to_numpy())
+
+
+def _individual_indicators(data: pd.DataFrame) -> dict:
+    """Indicadores de add_all_indicators calculados uno por uno con pandas y `ta`"""
+    close, high, low = data['close'], data['high'], data['low']
+    macd_data = TechnicalIndicators.macd(close)
+    bb_data = TechnicalIndicators.bollinger_bands(close)
+    stoch_data = TechnicalIndicators.stochastic(high, low, close)
+
+    return {
+        'sma_20': TechnicalIndicators.sma(close, 20),
+        'sma_50': TechnicalIndicators.sma(close, 50),
+        'ema_12': TechnicalIndicators.ema(close, 12),
+        'ema_26': TechnicalIndicators.ema(close, 26),
+        'rsi': TechnicalIndicators.rsi(close),
+        'macd': macd_data['macd'],
+        'macd_signal': macd_data['signal'],
+        'macd_histogram': macd_data['histogram'],
+        'bb_upper': bb_data['upper'],
+        'bb_middle': bb_data['middle'],
+        'bb_lower': bb_data['lower'],
+        'stoch_k': stoch_data['k_percent'],
+        'stoch_d': stoch_data['d_percent'],
+        'atr': TechnicalIndicators.atr(high, low, close),
+        'adx': TechnicalIndicators.adx(high, low, close),
+        'volume_sma': TechnicalIndicators.volume_sma(data['volume'])
+    }
@@ -0,0 +1,177 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+import numpy as np
+import pandas as pd
+from src.visualization import plotly_professional
+from src.backtester.metrics import Trade
+
+
+@pytest.fixture
+def ohlcv():
+    """Datos OHLCV horarios sintéticos"""
+    np.random.seed(5)
+    n = 80
+    close = 100 + np.random.normal(0, 1, n).cumsum()
+    return pd.DataFrame({
+        'open': close + np.random.normal(0, 0.5, n),
+        'high': close + 2,
+        'low': close - 2,
+        'close': close,
+        'volume': np.random.uniform(1000, 5000, n)
+    }, index=pd.date_range('2024-01-01', periods=n, freq='h'))
+
+
+@pytest.fixture
+def trades(ohlcv):
+    """Trades cerrados de ambos lados y uno abierto"""
+    idx, close = ohlcv.index, ohlcv['close'].to_numpy()
+    result = []
+    for k, side in zip(range(0, 60, 6), ['long', 'short'] * 5):
+        pnl = (close[k + 4] - close[k]) * (1 if side == 'long' else -1)
+        result.append(Trade(idx[k], idx[k + 4], close[k], close[k + 4], 1.0, side,
+                            pnl, pnl / close[k], 0.0, False))
+    result.append(Trade(idx[70], None, close[70], None, 1.0, 'long', 0.0, 0.0, 0.0, True))
+    return result
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Figuras que la función entrega a Streamlit (sin mostrar nada)"""
+    figures = []
+    monkeypatch.setattr(plotly_professional.st, 'plotly_chart',
+                        lambda fig, **kwargs: figures.append(fig))
+    for name in ('info', 'success'):
+        monkeypatch.setattr(plotly_professional.st, name, lambda *args, **kwargs: None)
+    monkeypatch.setattr(plotly_professional.st, 'columns',
+                        lambda n, **kwargs: [nullcontext() for _ in range(n)])
+    monkeypatch.setattr(plotly_professional.st, 'metric',
+                        lambda label, value, **kwargs: figures.append((label, value)))
+    return figures
+
+
+class TestProfessionalChart:
+    """Tests de create_professional_plotly_chart"""
+
+    def test_signals_batched(self, ohlcv, trades, rendered):
+        """Test que las entradas y salidas van en una traza cada una, con un punto por trade"""
+        plotly_professional.create_professional_plotly_chart(ohlcv, trades, "BTC")
+        fig = rendered[0]
+
+        entries = next(t for t in fig.data if t.name == "Entradas")
+        exits = next(t for t in fig.data if t.name == "Salidas")
+        assert list(entries.x) == [t.entry_time for t in trades]
+        assert list(exits.x) == [t.exit_time for t in trades if t.exit_time]
+        for k, trade in enumerate(trades):
+            long = trade.side == 'long'
+            assert entries.marker.symbol[k] == ('triangle-up' if long else 'triangle-down')
+            bar = ohlcv.loc[trade.entry_time]
+            assert entries.y[k] == (bar['low'] * 0.998 if long else bar['high'] * 1.002)
+            assert f"{trade.side.upper()} ENTRY" in entries.customdata[k]
+
+        lines = [t for t in fig.data
+                 if t.type == 'scatter' and t.hoverinfo == 'skip' and t.fill is None]
+        assert sum(len(t.x) for t in lines) == 3 * len(exits.x)
+
+        # Un rectángulo cerrado por trade cerrado y ningún shape suelto
+        areas = [t for t in fig.data if t.type == 'scatter' and t.fill == 'toself']
+        assert sum(len(t.x) for t in areas) == 6 * len(exits.x)
+        assert len(fig.layout.shapes) == 0
+
+        # Títulos de los subplots y un texto por marcador, sin perder los primeros
+        labels = [a for a in fig.layout.annotations if a.xref == 'x']
+        assert len(fig.layout.annotations) == 2 + len(entries.x) + len(exits.x)
+        assert [a.x for a in labels] == list(entries.x) + list(exits.x)
+        assert labels[0].bgcolor == entries.marker.color[0] and labels[0].font.size == 12
+        assert len(fig.data) == 1 + 1 + len(areas) + len(lines) + 2
+
+    def test_volume_colors(self, ohlcv, rendered):
+        """Test que cada barra de volumen toma el color de su vela"""
+        plotly_professional.create_professional_plotly_chart(ohlcv, [], "BTC")
+        volume = next(t for t in rendered[-1].data if t.name == 'Volumen')
+
+        scale = dict(volume.marker.colorscale)
+        colors = [scale[v] for v in volume.marker.color]
+        expected = ['#00C896' if c >= o else '#FF4B4B'
+                    for c, o in zip(ohlcv['close'], ohlcv['open'])]
+        assert colors == expected
+
+    def test_max_candles(self, ohlcv, trades, rendered):
+        """Test que max_candles agrega velas y volumen sin mover las señales"""
+        plotly_professional.create_professional_plotly_chart(ohlcv, trades, "BTC")
+        plotly_professional.create_professional_plotly_chart(ohlcv, trades, "BTC", max_candles=20)
+        full, reduced = rendered[0], rendered[4]
+
+        assert len(reduced.data[0].x) == 20 and len(reduced.data[1].x) == 20
+        assert reduced.data[0].high.max() == ohlcv['high'].max()
+        assert reduced.data[1].y.sum() == pytest.approx(ohlcv['volume'].sum())
+        assert reduced.data[2:] == full.data[2:]
+
+    def test_long_indicators_use_webgl(self, ohlcv, trades, rendered):
+        """Test que los indicadores largos se dibujan con Scattergl y los cortos con Scatter"""
+        long_data = pd.concat([ohlcv] * 15)
+        long_data.index = pd.date_range('2024-01-01', periods=len(long_data), freq='h')
+        for data in (ohlcv, long_data):
+            ema = data['close'].ewm(span=20).mean()
+            plotly_professional.create_professional_plotly_chart(data, trades, "BTC",
+                                                                 {'ema_20': ema})
+        short, long = (next(t for t in fig.data if t.name == 'EMA_20') for fig in rendered[::4])
+
+        assert short.type == 'scatter' and long.type == 'scattergl'
+        assert list(long.y) == list(long_data['close'].ewm(span=20).mean())
+        assert long.line.color == '#FF9800' and long.line.width == 2
+
+    def test_figure_cache(self, ohlcv, trades, rendered):
+        """Test que una re-ejecución con las mismas entradas reutiliza la figura armada"""
+        plotly_professional._figure_cache.clear()
+        plotly_professional.create_professional_plotly_chart(ohlcv, trades, "BTC")
+        plotly_professional.create_professional_plotly_chart(ohlcv, trades, "BTC")
+        assert len(plotly_professional._figure_cache) == 1
+        assert rendered[4] is rendered[0]
+
+        # Otro P&L en un trade: la figura se vuelve a armar
+        changed = list(trades)
+        changed[0] = Trade(**{**vars(trades[0]), 'pnl': -trades[0].pnl})
+        plotly_professional.create_professional_plotly_chart(ohlcv, changed, "BTC")
+        assert len(plotly_professional._figure_cache) == 2
+
+    def test_figure_cache_threads(self, ohlcv, trades, rendered):
+        """Test que sesiones concurrentes comparten la caché sin exceder su tamaño"""
+        plotly_professional._figure_cache.clear()
+        symbols = [f"S{k % 6}" for k in range(24)]
+        # Cada sesión trae su propio DataFrame (el índice de pandas no es seguro entre hilos)
+        frames = [ohlcv.set_axis(pd.DatetimeIndex(ohlcv.index.to_numpy())) for _ in symbols]
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(lambda args: plotly_professional.create_professional_plotly_chart(
+                args[0], trades, args[1]), zip(frames, symbols)))
+
+        figures = [fig for fig in rendered if not isinstance(fig, tuple)]
+        assert len(figures) == len(symbols)
+        assert len(plotly_professional._figure_cache) == plotly_professional.FIGURE_CACHE_SIZE
+
+    def test_trade_metrics(self, ohlcv, trades, rendered):
+        """Test de los conteos de longs, shorts y win rate bajo el gráfico"""
+        plotly_professional.create_professional_plotly_chart(ohlcv, trades, "BTC")
+
+        wins = sum(t.pnl > 0 for t in trades)
+        assert rendered[1:] == [("🟢 Trades LONG", 6), ("🔴 Trades SHORT", 5),
+                                ("🎯 Win Rate", f"{wins / len(trades) * 100:.1f}%")]
+
+
+class TestSimpleChart:
+    """Tests de create_simple_candlestick_chart"""
+
+    def test_entries_batched(self, ohlcv, trades, rendered):
+        """Test que las entradas van en una sola traza con símbolo y color por trade"""
+        plotly_professional.create_simple_candlestick_chart(ohlcv, trades, "BTC")
+        fig = rendered[0]
+
+        assert len(fig.data) == 2
+        entries = fig.data[1]
+        assert list(entries.x) == [t.entry_time for t in trades]
+        assert list(entries.y) == [t.entry_price for t in trades]
+        expected = ['triangle-up' if t.side == 'long' else 'triangle-down' for t in trades]
+        assert list(entries.marker.symbol) == expected
+        assert list(entries.marker.color) == ['#00E676' if t.side == 'long' else '#FF5722'
+                                              for t in trades]
+        assert list(entries.customdata) == [t.side.upper() for t in trades]
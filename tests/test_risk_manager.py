@@ -0,0 +1,135 @@
+import contextlib
+import io
+
+import pytest
+import numpy as np
+from src.backtester.engine import BacktesterEngine
+from src.risk.manager import (RiskManager, RiskParameters, KellyMode, SIDE_LONG, SIDE_SHORT,
+                              EXIT_NONE, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT)
+from src.strategies.base import BaseStrategy, SignalType, TradeSignal
+
+
+class _AlternatingStrategy(BaseStrategy):
+    """Compra y vende cada 10 barras"""
+
+    def generate_signals(self, data):
+        return [TradeSignal(data.index[i], SignalType.BUY if i % 20 == 10 else SignalType.SELL,
+                            data['close'].iloc[i])
+                for i in range(10, len(data), 10)]
+
+    def get_strategy_name(self):
+        return "Alternating"
+
+
+class TestRiskManager:
+    """Tests para el gestor de riesgo"""
+
+    @pytest.fixture
+    def risk_manager(self):
+        """Gestor con stop loss y take profit"""
+        return RiskManager(RiskParameters(stop_loss_pct=0.05, take_profit_pct=0.1))
+
+    def test_exit_batch_matches_scalar(self, risk_manager):
+        """Test que la versión vectorizada coincide con should_exit_trade"""
+        np.random.seed(7)
+        n = 200
+        entry = np.random.uniform(90, 110, n)
+        current = entry * np.random.uniform(0.85, 1.15, n)
+        sides = np.where(np.random.rand(n) < 0.5, SIDE_LONG, SIDE_SHORT).astype(np.int8)
+        stop_loss = np.where(sides == SIDE_LONG, entry * 0.95, entry * 1.05)
+        take_profit = np.where(sides == SIDE_LONG, entry * 1.1, entry * 0.9)
+        stop_loss[::7] = np.nan  # Algunas posiciones sin stop
+
+        exit_mask, reasons = risk_manager.should_exit_trade_batch(
+            current, entry, sides, stop_loss, take_profit
+        )
+
+        codes = {"": EXIT_NONE, "stop_loss": EXIT_STOP_LOSS, "take_profit": EXIT_TAKE_PROFIT}
+        for k in range(n):
+            should_exit, reason = risk_manager.should_exit_trade(
+                current[k], entry[k], "long" if sides[k] == SIDE_LONG else "short",
+                None if np.isnan(stop_loss[k]) else stop_loss[k], take_profit[k]
+            )
+            assert exit_mask[k] == should_exit
+            assert reasons[k] == codes[reason]
+
+    def test_exit_batch_without_levels(self, risk_manager):
+        """Test que sin niveles no se cierra ninguna posición"""
+        exit_mask, reasons = risk_manager.should_exit_trade_batch(
+            np.array([50.0, 150.0]), np.array([100.0, 100.0]),
+            np.array([SIDE_LONG, SIDE_SHORT], dtype=np.int8)
+        )
+
+        assert not exit_mask.any()
+        assert (reasons == EXIT_NONE).all()
+
+    def test_stop_levels_batch_matches_scalar(self, risk_manager):
+        """Test que los niveles vectorizados coinciden con los escalares"""
+        entry = np.array([100.0, 250.0, 80.0])
+        signs = np.array([SIDE_LONG, SIDE_SHORT, SIDE_LONG], dtype=np.int8)
+        sides = ["long", "short", "long"]
+
+        stop_loss = risk_manager.calculate_stop_loss_batch(entry, signs)
+        take_profit = risk_manager.calculate_take_profit_batch(entry, signs)
+
+        pairs = list(zip(entry, sides))
+        assert list(stop_loss) == [risk_manager.calculate_stop_loss(p, s) for p, s in pairs]
+        assert list(take_profit) == [risk_manager.calculate_take_profit(p, s) for p, s in pairs]
+        assert risk_manager.calculate_stop_loss(100.0, "short") == pytest.approx(105.0)
+        assert risk_manager.calculate_take_profit(100.0, "long") == pytest.approx(110.0)
+
+    def test_kelly_position_size(self):
+        """Test que Kelly reemplaza a max_position_size una vez calculado"""
+        risk_manager = RiskManager(RiskParameters(kelly_mode=KellyMode.HALF))
+
+        # Sin estadísticas se usa max_position_size
+        assert risk_manager.calculate_position_size(10000, 100) == pytest.approx(10.0)
+
+        # f* = 0.6 - 0.4 / 2 = 0.4 → media Kelly = 0.2
+        assert risk_manager.update_kelly_stats(0.6, 2.0) == pytest.approx(0.2)
+        assert risk_manager.calculate_position_size(10000, 100) == pytest.approx(20.0)
+
+        # Expectativa negativa: no se opera
+        assert risk_manager.update_kelly_stats(0.3, 1.0) == 0.0
+        assert risk_manager.calculate_position_size(10000, 100) == 0.0
+
+    def test_kelly_applied_by_engine(self):
+        """Test que el motor actualiza Kelly con cada trade cerrado"""
+        engine = BacktesterEngine()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = engine.run_backtest(_AlternatingStrategy('BTC-USDT'), '2024-01-01',
+                                          '2024-02-01', risk_params=RiskParameters(
+                                              kelly_mode=KellyMode.HALF))
+
+        equity = results.equity_curve
+        pnls = []
+        sized_by_kelly = 0
+        for trade in results.trades:
+            wins = [pnl for pnl in pnls if pnl > 0]
+            losses = [-pnl for pnl in pnls if pnl < 0]
+            fraction = 0.1
+            if wins and losses:
+                manager = RiskManager(RiskParameters(kelly_mode=KellyMode.HALF))
+                ratio = (sum(wins) / len(wins)) / (sum(losses) / len(losses))
+                fraction = manager.update_kelly_stats(len(wins) / len(pnls), ratio)
+                sized_by_kelly += 1
+
+            # Capital antes de entrar: equity de la barra anterior (sin posición abierta)
+            capital = equity.iloc[equity.index.get_loc(trade.entry_time) - 1]
+            close = trade.entry_price / (1 + engine.slippage)
+            assert trade.quantity * close == pytest.approx(capital * fraction)
+            pnls.append(trade.pnl)
+
+        assert sized_by_kelly > 0
+
+    def test_drawdown_uses_running_peak(self):
+        """Test que el drawdown se mide desde el pico de equity"""
+        risk_manager = RiskManager(RiskParameters(max_drawdown=0.1))
+        equity = np.array([10000.0, 12000.0, 11500.0, 10500.0, 12500.0])
+
+        scalar = [risk_manager.should_enter_trade(10000, e) for e in equity]
+        batch = RiskManager(RiskParameters(max_drawdown=0.1)).should_enter_trade_batch(equity)
+
+        # 10500 sigue por encima del capital inicial pero está un 12.5% bajo el pico
+        assert scalar == [True, True, True, False, True]
+        assert list(batch) == scalar
@@ -0,0 +1,315 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.strategies._state_machine import (ENTER_LONG, ENTER_SHORT, EXIT_LONG,
+                                           resolve_signals)
+from src.strategies.base import ReasonCode, SignalType, TradeSignal, _indicator_cache
+from src.strategies.signal_buffer import SignalBuffer
+from src.strategies.ema_strategy import EMAStrategy, EMAGoldenCrossStrategy, _make_ema_kernel
+from src.strategies.sweep import sweep_ema
+from src.strategies.fused_kernel import compute_all, prime_indicator_cache
+from src.strategies.rsi_strategy import (RSIStrategy, MACDStrategy,
+                                         BollingerBandsStrategy)
+from src.indicators.technical import TechnicalIndicators
+
+
+class TestStateMachine:
+    """Tests para la resolución de señales a partir de máscaras"""
+
+    def test_alternates_entries_and_exits(self):
+        """Test que no se emiten entradas consecutivas sin salida"""
+        entry = np.array([True, True, False, True, False])
+        exit_ = np.array([False, False, True, False, True])
+        no_shorts = np.zeros(5, dtype=bool)
+
+        indices, actions = resolve_signals(entry, entry, no_shorts, no_shorts, exit_, no_shorts)
+
+        assert list(indices) == [0, 2, 3, 4]
+        assert list(actions) == [ENTER_LONG, EXIT_LONG, ENTER_LONG, EXIT_LONG]
+
+    def test_unconfirmed_trigger_blocks_exit(self):
+        """Test que un disparador sin confirmación no evalúa la salida en esa barra"""
+        long_trigger = np.array([True, False, False])
+        short_trigger = np.array([False, True, False])
+        short_ok = np.zeros(3, dtype=bool)
+        long_exit = np.array([False, True, True])
+        no_signal = np.zeros(3, dtype=bool)
+
+        indices, actions = resolve_signals(long_trigger, long_trigger, short_trigger, short_ok,
+                                           long_exit, no_signal)
+
+        assert list(indices) == [0, 2]
+        assert list(actions) == [ENTER_LONG, EXIT_LONG]
+        assert ENTER_SHORT not in actions
+
+
+class TestSignalBuffer:
+    """Tests para el buffer columnar de señales"""
+
+    def test_from_actions_roundtrip(self):
+        """Test que el buffer produce las mismas señales y resumen que la lista"""
+        index = pd.date_range('2024-01-01', periods=6, freq='1h')
+        close = np.arange(100.0, 106.0)
+        indices = np.array([1, 4], dtype=np.int64)
+        actions = np.array([ENTER_LONG, EXIT_LONG], dtype=np.int8)
+
+        buffer = SignalBuffer.from_actions(
+            index, indices, actions, close,
+            reasons={ENTER_LONG: ReasonCode.MACD_BULL_CROSS, EXIT_LONG: ReasonCode.MACD_BEAR_CROSS},
+            confidences=np.array([0.5, 0.9])
+        )
+        signals = buffer.to_trade_signals()
+
+        assert [s.timestamp for s in signals] == [index[1], index[4]]
+        assert [s.signal_type for s in signals] == [SignalType.BUY, SignalType.SELL]
+        assert [s.price for s in signals] == [101.0, 104.0]
+        assert signals[1].reason_text == "MACD bearish crossover"
+        assert signals[1].reason == "MACD bearish crossover"
+        assert buffer.summary() == {'total_signals': 2, 'buy_signals': 1,
+                                    'sell_signals': 1, 'avg_confidence': pytest.approx(0.7)}
+
+    def test_prices_exact(self):
+        """Test que precio y confianza de cada señal conservan los valores float64"""
+        np.random.seed(3)
+        dates = pd.date_range('2024-01-01', periods=500, freq='1h')
+        close = 100 * np.cumprod(1 + np.random.normal(0, 0.02, 500))
+        data = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                             'close': close, 'volume': 1000.0}, index=dates)
+        signals = EMAStrategy('BTC-USDT', 10, 30, 90).generate_signals(data)
+
+        assert len(signals) > 0
+        for signal in signals:
+            assert signal.price == data['close'].iloc[dates.get_loc(signal.timestamp)]
+
+        index = pd.date_range('2024-01-01', periods=3, freq='1h')
+        buffer = SignalBuffer.from_actions(index, np.array([1]), np.array([ENTER_LONG]),
+                                           np.array([100.1, 100.2, 100.3]),
+                                           {ENTER_LONG: ReasonCode.CUSTOM}, 0.8)
+        signal, = buffer.to_trade_signals()
+        assert (signal.price, signal.confidence) == (100.2, 0.8)
+
+    def test_free_text_reason(self):
+        """Test que reason sigue aceptando texto libre como argumento"""
+        signal = TradeSignal(pd.Timestamp('2024-01-01'), SignalType.BUY, 100.0, 0.5, 'manual')
+
+        assert signal.reason == signal.reason_text == 'manual'
+        signal.reason = 'editado'
+        assert signal == TradeSignal(pd.Timestamp('2024-01-01'), SignalType.BUY, 100.0,
+                                     confidence=0.5, reason='editado')
+
+    def test_summary_without_buffer(self):
+        """Test que el resumen sobre la lista coincide con el del buffer"""
+        np.random.seed(4)
+        dates = pd.date_range('2024-01-01', periods=500, freq='1h')
+        close = 100 * np.cumprod(1 + np.random.normal(0, 0.02, 500))
+        data = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                             'close': close, 'volume': 1000.0}, index=dates)
+        strategy = RSIStrategy('BTC-USDT')
+        strategy.generate_signals(data)
+        expected = strategy.get_signal_summary()
+
+        strategy.signal_buffer = None
+        summary = strategy.get_signal_summary()
+
+        assert summary == {**expected, 'avg_confidence': pytest.approx(expected['avg_confidence'])}
+
+    @pytest.mark.parametrize('tz', [None, 'UTC', 'America/New_York'])
+    def test_filter_by_time_matches_comparison(self, tz):
+        """Test que la búsqueda binaria coincide con comparar cada timestamp"""
+        np.random.seed(2)
+        dates = pd.date_range('2024-01-01', periods=800, freq='1h', tz=tz)
+        close = 100 * np.cumprod(1 + np.random.normal(0, 0.02, 800))
+        data = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                             'close': close, 'volume': 1000.0}, index=dates)
+        strategy = RSIStrategy('BTC-USDT')
+        signals = strategy.generate_signals(data)
+
+        bounds = [(dates[0], dates[-1]), (dates[100], dates[100]), (dates[-1], dates[0])]
+        bounds += [(signals[2].timestamp, signals[5].timestamp),
+                   (dates[50] + pd.Timedelta('30min'), dates[600] - pd.Timedelta('1ns'))]
+        for start, end in bounds:
+            expected = [s for s in signals if start <= s.timestamp <= end]
+            assert strategy.filter_signals_by_time(start, end) == expected
+            lo, hi = strategy.signal_buffer.time_range(start, end)
+            assert strategy.signal_buffer.slice(lo, hi).to_trade_signals() == expected
+
+
+class TestRSIStrategy:
+    """Tests para RSIStrategy"""
+
+    def test_signals_alternate(self):
+        """Test que las señales alternan compra/venta"""
+        np.random.seed(0)
+        dates = pd.date_range('2024-01-01', periods=500, freq='1h')
+        close = 100 * np.cumprod(1 + np.random.normal(0, 0.02, 500))
+        data = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                             'close': close, 'volume': 1000.0}, index=dates)
+
+        signals = RSIStrategy('BTC-USDT').generate_signals(data)
+
+        assert len(signals) > 0
+        types = [s.signal_type for s in signals]
+        assert all(t == (SignalType.BUY if k % 2 == 0 else SignalType.SELL)
+                   for k, t in enumerate(types))
+        assert all(0.1 <= s.confidence <= 1.0 for s in signals)
+        assert signals[0].reason_text.startswith('RSI oversold: ')
+        assert 'rsi' not in data.columns  # No modifica los datos de entrada
+
+
+class TestIndicatorCache:
+    """Tests para la caché de indicadores entre llamadas"""
+
+    @pytest.fixture
+    def sample_data(self):
+        """Datos de ejemplo para testing"""
+        np.random.seed(1)
+        dates = pd.date_range('2024-01-01', periods=400, freq='1h')
+        close = 100 * np.cumprod(1 + np.random.normal(0, 0.01, 400))
+        return pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                             'close': close, 'volume': 1000.0}, index=dates)
+
+    def test_ema_computed_once_per_series(self, sample_data, monkeypatch):
+        """Test que un barrido de parámetros reutiliza las EMAs de la misma serie"""
+        calls = []
+        original_ema = TechnicalIndicators.ema
+
+        def counting_ema(data, period):
+            calls.append(period)
+            return original_ema(data, period)
+
+        monkeypatch.setattr(TechnicalIndicators, 'ema', staticmethod(counting_ema))
+
+        for strength in (0.0005, 0.001, 0.002):
+            strategy = EMAStrategy('BTC-USDT', 21, 55, 120, min_trend_strength=strength)
+            strategy.generate_signals(sample_data)
+        assert sorted(calls) == [21, 55, 120]
+
+        # Otra serie no reutiliza resultados
+        other = sample_data.copy()
+        other['close'] = other['close'] * 2
+        EMAStrategy('BTC-USDT', 21, 55, 120).generate_signals(other)
+        assert len(calls) == 6
+
+    def test_inplace_edit_invalidates(self, sample_data):
+        """Test que modificar un cierre en el lugar no devuelve indicadores viejos"""
+        _indicator_cache.clear()
+        data = sample_data.copy()
+        RSIStrategy('BTC-USDT').generate_signals(data)
+
+        data.loc[data.index[200], 'close'] = data['close'].iloc[200] * 0.7
+        cached = RSIStrategy('BTC-USDT').generate_signals(data)
+        _indicator_cache.clear()
+        assert cached == RSIStrategy('BTC-USDT').generate_signals(data)
+
+    def test_specialized_kernel_matches(self, sample_data):
+        """Test que el kernel especializado reproduce las señales y se comparte"""
+        expected = EMAStrategy('BTC-USDT', 10, 30, 90).generate_signals(sample_data.copy())
+        specialized = EMAStrategy('BTC-USDT', 10, 30, 90, specialize=True)
+
+        assert specialized.generate_signals(sample_data.copy()) == expected
+        assert EMAStrategy('BTC-USDT', 10, 30, 90, specialize=True)._kernel is specialized._kernel
+
+    def test_specialized_kernel_nan_gaps(self, sample_data):
+        """Test que el kernel especializado trata los NaN igual que pandas"""
+        data = sample_data.copy()
+        data.iloc[[0, 40, 41, 90], data.columns.get_loc('close')] = np.nan
+        close = data['close'].to_numpy()
+
+        for period, values in zip((10, 30, 90), _make_ema_kernel((10, 30, 90))(close)):
+            expected = TechnicalIndicators.ema(data['close'], period).to_numpy()
+            np.testing.assert_array_equal(values, expected)
+
+        # El resultado especializado queda en la caché compartida de EMAs
+        _indicator_cache.clear()
+        EMAStrategy('BTC-USDT', 20, 55, 200, specialize=True).generate_signals(data)
+        cached = EMAStrategy('BTC-USDT').generate_signals(data)
+        _indicator_cache.clear()
+        assert cached == EMAStrategy('BTC-USDT').generate_signals(data)
+
+
+class TestFusedKernel:
+    """Tests para el cálculo fusionado de indicadores"""
+
+    @pytest.fixture
+    def sample_data(self):
+        """Datos de ejemplo para testing"""
+        np.random.seed(5)
+        dates = pd.date_range('2024-01-01', periods=600, freq='1h')
+        close = 100 * np.cumprod(1 + np.random.normal(0, 0.01, 600))
+        return pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                             'close': close, 'volume': 1000.0}, index=dates)
+
+    def test_matches_technical_indicators(self, sample_data):
+        """Test que el kernel reproduce bit a bit los indicadores de referencia"""
+        close = sample_data['close']
+        result = compute_all(close.to_numpy(), (20, 55), 14, (12, 26, 9), (20, 2.0))
+        macd = TechnicalIndicators.macd(close, 12, 26, 9)
+        bollinger = TechnicalIndicators.bollinger_bands(close, 20, 2.0)
+
+        for ema, period in zip(result.emas, (20, 55)):
+            np.testing.assert_array_equal(ema, TechnicalIndicators.ema(close, period))
+        np.testing.assert_array_equal(result.rsi, TechnicalIndicators.rsi(close, 14))
+        np.testing.assert_array_equal(result.macd, macd['macd'])
+        np.testing.assert_array_equal(result.macd_signal, macd['signal'])
+        np.testing.assert_array_equal(result.macd_histogram, macd['histogram'])
+        np.testing.assert_array_equal(result.bb_upper, bollinger['upper'])
+        np.testing.assert_array_equal(result.bb_middle, bollinger['middle'])
+        np.testing.assert_array_equal(result.bb_lower, bollinger['lower'])
+
+    def test_primed_cache_skips_indicators(self, sample_data, monkeypatch):
+        """Test que tras precalcular, las estrategias no recalculan indicadores"""
+        strategies = [EMAStrategy('BTC-USDT', 20, 55, 200),
+                      EMAGoldenCrossStrategy('BTC-USDT', 50, 200),
+                      RSIStrategy('BTC-USDT'), MACDStrategy('BTC-USDT'),
+                      BollingerBandsStrategy('BTC-USDT')]
+        expected = [s.generate_signals(sample_data.copy()) for s in strategies]
+
+        prime_indicator_cache(sample_data, strategies)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("indicador recalculado")
+
+        for name in ('ema', 'rsi', 'macd', 'bollinger_bands'):
+            monkeypatch.setattr(TechnicalIndicators, name, staticmethod(fail))
+        for strategy, signals in zip(strategies, expected):
+            assert strategy.generate_signals(sample_data) == signals
+
+    def test_nan_close_skips_priming(self, sample_data):
+        """Test que con NaN en el cierre no se precalcula y las señales no cambian"""
+        data = sample_data.copy()
+        data.iloc[300, data.columns.get_loc('close')] = np.nan
+        strategies = [EMAStrategy('BTC-USDT', 20, 55, 200), BollingerBandsStrategy('BTC-USDT')]
+        _indicator_cache.clear()
+        expected = [s.generate_signals(data.copy()) for s in strategies]
+
+        _indicator_cache.clear()
+        assert prime_indicator_cache(data, strategies) is None
+        assert len(_indicator_cache) == 0
+        assert [s.generate_signals(data) for s in strategies] == expected
+        with pytest.raises(ValueError):
+            compute_all(data['close'].to_numpy())
+
+
+class TestSweepEMA:
+    """Tests para el barrido paralelo de EMAs"""
+
+    def test_matches_golden_cross_strategy(self):
+        """Test que cada columna del barrido coincide con la estrategia"""
+        np.random.seed(3)
+        dates = pd.date_range('2024-01-01', periods=1500, freq='1h')
+        close = 100 * np.cumprod(1 + np.random.normal(0, 0.01, 1500))
+        data = pd.DataFrame({'open': close, 'high': close, 'low': close,
+                             'close': close, 'volume': 1000.0}, index=dates)
+        fast_grid = np.array([5, 10, 20])
+        slow_grid = np.array([30, 50, 100])
+
+        entries, exits = sweep_ema(close, fast_grid, slow_grid)
+
+        assert entries.shape == exits.shape == (1500, 3)
+        for k, (fast, slow) in enumerate(zip(fast_grid, slow_grid)):
+            strategy = EMAGoldenCrossStrategy('BTC-USDT', int(fast), int(slow))
+            signals = strategy.generate_signals(data)
+            buys = [s.timestamp for s in signals if s.signal_type == SignalType.BUY]
+            sells = [s.timestamp for s in signals if s.signal_type == SignalType.SELL]
+            assert list(dates[entries[:, k]]) == buys
+            assert list(dates[exits[:, k]]) == sells